@@ -9,7 +9,8 @@ from harmony.app.core.exceptions import (
     ConflictError,
     ValidationError,
     LimitExceededError,
-    InternalServerError
+    InternalServerError,
+    ServiceUnavailableError
 )
 
 logger = structlog.get_logger(__name__)
@@ -47,6 +48,14 @@ def register_exception_handlers(app: FastAPI):
     @app.exception_handler(InternalServerError)
     async def internal_server_error_handler(request: Request, exc: InternalServerError):
         return JSONResponse(status_code=500, content={"detail": exc.message})
+
+    @app.exception_handler(ServiceUnavailableError)
+    async def service_unavailable_handler(request: Request, exc: ServiceUnavailableError):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": exc.message},
+            headers=exc.headers
+        )
     
     @app.exception_handler(Exception)
     async def unhandled_exception_handler(request: Request, exc: Exception):
@@ -1,13 +1,34 @@
 from contextlib import asynccontextmanager, AsyncExitStack
 from fastapi import FastAPI
-from harmony.app.core import get_api_settings
+from harmony.app.core import get_api_settings, PasswordHasher, TokenVerifier
+from harmony.app.services import (
+    SingleFlight,
+    BackgroundTaskQueue,
+    CacheService,
+    AuthService,
+    PubSubService,
+    UserCommands, UserQueries,
+    ChatCommands, ChatQueries,
+    MessageCommands, MessageQueries,
+    ChatActivityTracker,
+)
+from harmony.app.repositories import (
+    ChatHistoryRepository,
+    UserChatRepository,
+    ChatDataRepository,
+    UserDataRepository,
+    AuthRepository
+)
+from harmony.app.db import DynamoWriteScheduler, ScopedSession
 import structlog
 
 from harmony.app.init import (
     cache_connector,
+    local_cache_connector,
     dynamodb_connector,
     kafka_connector,
-    postgres_connector
+    kafka_publisher,
+    postgres_connector,
 )
 
 logger = structlog.get_logger(__name__)
@@ -16,35 +37,195 @@ async def init_cache(app, stack):
     settings = get_api_settings()
     if not settings.features.cache_redis:
         app.state.redis_cache_client = None
+        app.state.local_cache = None
         return
 
     redis_client = await stack.enter_async_context(cache_connector(settings.redis))
     app.state.redis_cache_client = redis_client
 
+    # Optional in-process L1 cache, kept coherent by CDC-driven invalidations
+    if not settings.features.cache_local:
+        app.state.local_cache = None
+        return
+
+    local_cache = await stack.enter_async_context(local_cache_connector(redis_client, settings.cache))
+    app.state.local_cache = local_cache
+    app.state.stats_providers["local_cache"] = local_cache
+
+def init_single_flight(app):
+    settings = get_api_settings()
+    if not settings.features.single_flight:
+        app.state.single_flight = None
+        return
+
+    single_flight = SingleFlight(
+        redis_client=app.state.redis_cache_client,
+        lock_ttl_ms=settings.cache.loader_lock_ttl_ms,
+        lock_wait_ms=settings.cache.loader_lock_wait_ms,
+    )
+    app.state.single_flight = single_flight
+    app.state.stats_providers["single_flight"] = single_flight
+
 async def init_dynamodb(app, stack):
     settings = get_api_settings()
 
     dynamodb_client = await stack.enter_async_context(dynamodb_connector(settings.dynamodb, settings.aws))
     app.state.dynamodb = dynamodb_client
 
+    write_scheduler = DynamoWriteScheduler(dynamodb_client, settings.dynamodb)
+    app.state.dynamo_write_scheduler = write_scheduler
+    app.state.stats_providers["dynamo_writes"] = write_scheduler
+
 async def init_kafka(app, stack):
     settings = get_api_settings()
 
     producer = await stack.enter_async_context(kafka_connector(settings.kafka_producer))
     app.state.kafka_producer = producer
 
+    publisher = await stack.enter_async_context(kafka_publisher(producer, settings.kafka_producer))
+    app.state.kafka_publisher = publisher
+    app.state.stats_providers["kafka_publisher"] = publisher
+
+def init_password_hasher(app, stack):
+    settings = get_api_settings()
+
+    hasher = PasswordHasher(
+        workers=settings.auth.password_hash_workers,
+        queue_limit=settings.auth.password_hash_queue_limit,
+    )
+    stack.callback(hasher.shutdown)
+    app.state.password_hasher = hasher
+    app.state.stats_providers["password_hasher"] = hasher
+
+def init_token_verifier(app):
+    settings = get_api_settings()
+
+    verifier = TokenVerifier(settings.auth)
+    app.state.token_verifier = verifier
+    app.state.stats_providers["token_cache"] = verifier
+
 async def init_postgres(app, stack):
     settings = get_api_settings()
 
-    session_factory = await stack.enter_async_context(postgres_connector(settings.app_env == "development", settings.postgres))
+    session_factory = await stack.enter_async_context(postgres_connector(settings.app_env == "development", settings.postgres, settings.outbox))
     app.state.session_factory = session_factory
 
+    # Connection pool counters: checkouts, wait time, overflow in use (see MonitoredPool)
+    app.state.stats_providers["postgres_pool"] = session_factory.kw["bind"].pool
+
+    # Shared by the app-scoped repositories, resolves to the current request's session (see ScopedSession)
+    db = ScopedSession(session_factory)
+    app.state.db = db
+    app.state.stats_providers["db_sessions"] = db
+
+async def stop_activity_tracker(tracker: ChatActivityTracker):
+    await tracker.stop()
+    logger.info("chat_activity_tracker_stopped", **tracker.stats())
+
+def init_services(app, stack):
+    """
+    Builds the repositories and services once. They hold no per-request state:
+    Postgres access goes through the ScopedSession and background work through the app-scoped task queue.
+    """
+    settings = get_api_settings()
+    state = app.state
+
+    # Registered before the task queue, so it flushes the pending activity after the queue has drained
+    activity_tracker = ChatActivityTracker(state.session_factory, flush_interval_ms=settings.chat.activity_flush_interval_ms)
+    activity_tracker.start()
+    stack.push_async_callback(stop_activity_tracker, activity_tracker)
+    state.activity_tracker = activity_tracker
+    state.stats_providers["chat_activity"] = activity_tracker
+
+    task_queue = BackgroundTaskQueue(state.db)
+    stack.push_async_callback(task_queue.drain)
+    state.task_queue = task_queue
+    state.stats_providers["background_tasks"] = task_queue
+
+    cache_service = None
+    if state.redis_cache_client:
+        cache_service = CacheService(redis_client=state.redis_cache_client, cache_config=settings.cache, local_cache=state.local_cache)
+    state.cache_service = cache_service
+
+    # Repositories
+    chat_history_repository = ChatHistoryRepository(
+        state.dynamodb, dynamodb_config=settings.dynamodb, write_scheduler=state.dynamo_write_scheduler
+    )
+    chat_data_repository = ChatDataRepository(state.db)
+    user_data_repository = UserDataRepository(state.db)
+    user_chat_repository = UserChatRepository(state.db)
+    auth_repository = AuthRepository(state.db)
+
+    # Services
+    state.user_queries = UserQueries(
+        session=state.db,
+        user_data_repository=user_data_repository,
+        user_chat_repository=user_chat_repository,
+        cache_service=cache_service,
+        task_queue=task_queue,
+        cache_config=settings.cache,
+        single_flight=state.single_flight,
+        default_chats_limit=settings.chat.default_pagination_limit,
+        user_config=settings.user,
+    )
+    state.chat_queries = ChatQueries(
+        session=state.db,
+        chat_data_repository=chat_data_repository,
+        user_chat_repository=user_chat_repository,
+        cache_service=cache_service,
+        task_queue=task_queue,
+        cache_config=settings.cache,
+        single_flight=state.single_flight,
+    )
+    state.message_queries = MessageQueries(
+        chat_history_repository=chat_history_repository,
+        chat_queries=state.chat_queries,
+        user_queries=state.user_queries,
+        cache_config=settings.cache,
+        cache_service=cache_service,
+        task_queue=task_queue,
+    )
+    state.pubsub_service = PubSubService(chat_queries=state.chat_queries)
+    state.user_commands = UserCommands(
+        session=state.db,
+        user_data_repository=user_data_repository,
+        user_chat_repository=user_chat_repository,
+        user_config=settings.user
+    )
+    state.chat_commands = ChatCommands(
+        session=state.db,
+        chat_data_repository=chat_data_repository,
+        user_chat_repository=user_chat_repository,
+        chat_config=settings.chat,
+        user_config=settings.user
+    )
+    state.message_commands = MessageCommands(
+        chat_history_repository=chat_history_repository,
+        chat_queries=state.chat_queries,
+        user_queries=state.user_queries,
+        publisher=state.kafka_publisher,
+        chat_config=settings.chat,
+        cache_config=settings.cache,
+        cache_service=cache_service,
+        activity_tracker=state.activity_tracker,
+    )
+    state.auth_service = AuthService(
+        session=state.db,
+        user_commands=state.user_commands,
+        user_queries=state.user_queries,
+        auth_repository=auth_repository,
+        auth_config=settings.auth,
+        password_hasher=state.password_hasher,
+    )
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     async with AsyncExitStack() as stack:
         logger.info("system_startup_initiated")
 
+        # Components exposing a stats() method, reported by the /stats endpoint (if features.stats_endpoint)
+        app.state.stats_providers = {}
+
         # --------------------------- Resources Setup -------------------------- #
         
         # 1. Postgres
@@ -55,10 +236,18 @@ async def lifespan(app: FastAPI):
 
         # 3. Cache
         await init_cache(app, stack)
+        init_single_flight(app)
 
         # 4. Kafka
         await init_kafka(app, stack)
 
+        # 5. Auth (password hashing pool, token verification)
+        init_password_hasher(app, stack)
+        init_token_verifier(app)
+
+        # 6. Services (built once, shared by every request)
+        init_services(app, stack)
+
         logger.info("system_startup_complete")
         
         # ----------------------------- App Running ---------------------------- #
@@ -23,6 +23,22 @@ app = FastAPI(lifespan=lifespan, debug=(settings.app_env == "development"))
 app.include_router(api_v1_router, prefix="/api/v1")
 register_exception_handlers(app)
 
+class DBSessionScopeMiddleware:
+    """
+    Opens a database session scope (see ScopedSession) around each HTTP request.
+    A plain ASGI middleware, so the scope also covers the response body.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        async with scope["app"].state.db.scope():
+            await self.app(scope, receive, send)
+
+app.add_middleware(DBSessionScopeMiddleware)
+
 # CORS Middleware (allow all for simplicity)
 app.add_middleware(
     CORSMiddleware,
@@ -44,6 +60,14 @@ async def scalar_html():
         title=app.title
     )
 
+# Internal counters (cache hit ratios, etc.) used to size and tune the service.
+# Unauthenticated, so only routed when explicitly enabled
+if settings.features.stats_endpoint:
+    @app.get("/stats", include_in_schema=False)
+    async def stats(request: Request):
+        providers = getattr(request.app.state, "stats_providers", {})
+        return {name: provider.stats() for name, provider in providers.items()}
+
 @app.middleware("http")
 async def logging_middleware(request: Request, call_next):
     # Clear context from the previous request
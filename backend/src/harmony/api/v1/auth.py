@@ -1,8 +1,9 @@
 from typing import Annotated, List
-from fastapi import APIRouter, Depends, status, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, status, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
 from harmony.app.schemas import Token, RefreshRequest
-from .dependencies import get_auth_service
+from harmony.app.core.interfaces import TaskQueue
+from .dependencies import get_auth_service, get_task_queue
 
 router = APIRouter()
 
@@ -53,8 +54,8 @@ async def login(
 )
 async def refresh(
     refresh_token: RefreshRequest,
-    background_tasks: BackgroundTasks,
     auth_service = Depends(get_auth_service),
+    task_queue: TaskQueue = Depends(get_task_queue),
 ):
     """
     **Refresh Tokens using a Refresh Token.**
@@ -66,7 +67,7 @@ async def refresh(
 
     # TODO: shift to event driven approach
     # Schedule old refresh token for deletion after grace period
-    background_tasks.add_task(
+    task_queue.add_task(
         auth_service.background_revoke_refresh_token, 
         refresh_token=refresh_token.refresh_token
     )
@@ -6,7 +6,9 @@ from harmony.app.schemas import (
     ChatResponse, 
     MessageSendRequest, 
     ChatMessage, 
-    ChatHistoryResponse
+    ChatHistoryResponse,
+    ChatHistoryBatchRequest,
+    ChatHistoryBatchResponse
 )
 from .dependencies import get_current_user, get_chat_commands, get_chat_queries, get_message_commands, get_message_queries
 
@@ -96,23 +98,73 @@ def get_chat_pagination_limit(
         
     return limit
 
+@router.post(
+    "/history/batch",
+    response_model=ChatHistoryBatchResponse,
+    summary="Get the newest history of several chats",
+    responses={
+        401: {"description": "Authentication credentials were not provided or are invalid."},
+        422: {"description": "Too many chats requested or invalid limit."},
+    }
+)
+async def get_chat_histories(
+    data: ChatHistoryBatchRequest,
+    limit: int = Depends(get_chat_pagination_limit),
+    user_id: uuid.UUID = Depends(get_current_user),
+    message_queries_service = Depends(get_message_queries),
+    settings: APISettings = Depends(get_api_settings)
+):
+    """
+    Returns the newest page (up to **limit** messages) of every requested chat in one call,
+    e.g. to preload the chat list on app start.
+
+    - **chat_ids**: Chats to load. Chats the user is not a member of are omitted from the response.
+    - Use `GET /chats/{chat_id}` with the returned `next_cursor` to page further back.
+    """
+    if len(data.chat_ids) > settings.chat.history_batch_max_chats:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Cannot request more than {settings.chat.history_batch_max_chats} chats at once"
+        )
+
+    histories = await message_queries_service.get_chat_histories(
+        user_id=user_id,
+        chat_ids=data.chat_ids,
+        limit=limit,
+        concurrency=settings.chat.history_batch_concurrency
+    )
+    return ChatHistoryBatchResponse(histories={
+        chat_id: ChatHistoryResponse(messages=messages, next_cursor=next_cursor)
+        for chat_id, (messages, next_cursor) in histories.items()
+    })
+
 @router.get(
     "/{chat_id}", 
     response_model=ChatHistoryResponse,
     summary="Get chat history",
-    description="Retrieves all messages for a specific chat. Messages are sorted by ULID (chronologically).",
+    description=(
+        "Retrieves all messages for a specific chat. Messages are sorted by ULID (chronologically). "
+        "Without a limit, a cursor continues with the page size it was issued for."
+    ),
     responses=common_chat_errors
 )
 async def get_chat_history(
     chat_id: uuid.UUID,
-    limit: int = Depends(get_chat_pagination_limit),
+    limit: int | None = Query(default=None, ge=1, description="Number of items to return"),
     cursor: str | None = None,
+    settings: APISettings = Depends(get_api_settings),
     user_id: uuid.UUID = Depends(get_current_user),
     message_queries_service = Depends(get_message_queries)
 ):
     # Simulate timeout for testing purposes
     # await asyncio.sleep(5)
 
+    if limit is None and cursor is not None:
+        page_size = message_queries_service.cursor_page_size(cursor)
+        if page_size is not None:
+            limit = min(page_size, settings.chat.default_pagination_limit)
+    limit = get_chat_pagination_limit(limit, settings)
+
     messages, next_cursor = await message_queries_service.get_chat_history(
         user_id=user_id, 
         chat_id=chat_id, 
@@ -1,45 +1,35 @@
 import uuid
-from aiokafka import AIOKafkaProducer
 import jwt
 from starlette.requests import HTTPConnection
-from fastapi import BackgroundTasks, Depends, HTTPException, status, Request
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Depends, HTTPException, status, Request
 
 from fastapi.security import OAuth2PasswordBearer
 
-from harmony.app.repositories import (
-    ChatHistoryRepository, 
-    UserChatRepository, 
-    ChatDataRepository, 
-    UserDataRepository, 
-    AuthRepository
-)
 from harmony.app.services import (
     AuthService, 
     PubSubService, 
     UserCommands, UserQueries,
     ChatCommands, ChatQueries,
     MessageCommands, MessageQueries,
-    CacheService
 )
-from harmony.app.core import decode_access_token, get_api_settings, APISettings
+from harmony.app.core import get_api_settings, APISettings, TokenVerifier
+from harmony.app.core.interfaces import TaskQueue
 
 import structlog
 logger = structlog.get_logger(__name__)
 
 # ------------------------- Authentication Dependency ------------------------ #
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
+
+def get_token_verifier(conn: HTTPConnection) -> TokenVerifier:
+    return conn.app.state.token_verifier
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    settings: APISettings = Depends(get_api_settings)
+    verifier: TokenVerifier = Depends(get_token_verifier)
 ) -> uuid.UUID:
-    cfg = settings.auth
     try:
-        payload = decode_access_token(
-            token, 
-            secret_key=cfg.secret_key.get_secret_value(), 
-            algorithm=cfg.algorithm
-        )
+        payload = verifier.verify(token)
     except jwt.ExpiredSignatureError:
         logger.warning("token_expired", token=token)
         raise HTTPException(
@@ -68,7 +58,8 @@ async def get_current_user(
 
 async def get_user_from_cookie(
     request: Request,
-    settings: APISettings = Depends(get_api_settings)
+    settings: APISettings = Depends(get_api_settings),
+    verifier: TokenVerifier = Depends(get_token_verifier)
 ) -> str | None:
     cfg = settings.auth
     token = request.cookies.get(cfg.access_token_name)
@@ -76,156 +67,40 @@ async def get_user_from_cookie(
         return None
 
     try:
-        payload = decode_access_token(
-            token, 
-            secret_key=cfg.secret_key.get_secret_value(), 
-            algorithm=cfg.algorithm
-        )
+        payload = verifier.verify(token)
         return payload.get("sub")
     except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
         logger.warning("invalid_ws_cookie_token")
         return None
 
-# --------------------------- Database Dependencies -------------------------- #
-def get_dynamo_client(conn: HTTPConnection):
-    return conn.app.state.dynamodb
+# --------------------------- Service Dependencies --------------------------- #
+# Services are built once in lifespan (init_services) and shared by every request.
+# Their Postgres session is opened per request, on first use (see ScopedSession).
+# The getters are async so FastAPI resolves them inline instead of in its threadpool.
 
-async def get_db_session(conn: HTTPConnection):
-    async with conn.app.state.session_factory() as session:
-        yield session
+async def get_task_queue(conn: HTTPConnection) -> TaskQueue:
+    return conn.app.state.task_queue
 
-# -------------------------- Repository Dependencies ------------------------- #
-def get_chat_history_repository(dynamodb = Depends(get_dynamo_client), settings: APISettings = Depends(get_api_settings)) -> ChatHistoryRepository:
-    return ChatHistoryRepository(dynamodb, dynamodb_config=settings.dynamodb)
+async def get_user_queries(conn: HTTPConnection) -> UserQueries:
+    return conn.app.state.user_queries
 
-def get_chat_data_repository(session: AsyncSession = Depends(get_db_session)) -> ChatDataRepository:
-    return ChatDataRepository(session)
+async def get_chat_queries(conn: HTTPConnection) -> ChatQueries:
+    return conn.app.state.chat_queries
 
-def get_user_data_repository(session: AsyncSession = Depends(get_db_session)) -> UserDataRepository:
-    return UserDataRepository(session)
+async def get_message_queries(conn: HTTPConnection) -> MessageQueries:
+    return conn.app.state.message_queries
 
-def get_user_chat_repository(session: AsyncSession = Depends(get_db_session)) -> UserChatRepository:
-    return UserChatRepository(session)
+async def get_pubsub_service(conn: HTTPConnection) -> PubSubService:
+    return conn.app.state.pubsub_service
 
-def get_auth_repository(session: AsyncSession = Depends(get_db_session)) -> AuthRepository:
-    return AuthRepository(session)
+async def get_user_commands(conn: HTTPConnection) -> UserCommands:
+    return conn.app.state.user_commands
 
-# ---------------------------- Stream Dependencies --------------------------- #
-def get_redis_cache_client(conn: HTTPConnection, settings: APISettings = Depends(get_api_settings)):
-    return conn.app.state.redis_cache_client
+async def get_chat_commands(conn: HTTPConnection) -> ChatCommands:
+    return conn.app.state.chat_commands
 
-def get_kafka_producer(conn: HTTPConnection):
-    return conn.app.state.kafka_producer
+async def get_message_commands(conn: HTTPConnection) -> MessageCommands:
+    return conn.app.state.message_commands
 
-# --------------------------- Service Dependencies --------------------------- #
-
-def get_cache_service(redis_client = Depends(get_redis_cache_client)):
-    if not redis_client: return None
-    return CacheService(redis_client=redis_client)
-
-def get_user_queries(
-    background_tasks: BackgroundTasks,
-    session: AsyncSession = Depends(get_db_session),
-    user_data_repository: UserDataRepository = Depends(get_user_data_repository),
-    user_chat_repository: UserChatRepository = Depends(get_user_chat_repository),
-    cache_service: CacheService = Depends(get_cache_service),
-    settings: APISettings = Depends(get_api_settings)
-) -> UserQueries:
-    return UserQueries(
-        session=session, 
-        user_data_repository=user_data_repository, 
-        user_chat_repository=user_chat_repository, 
-        cache_service=cache_service, 
-        task_queue=background_tasks,
-        cache_config=settings.cache
-    )
-
-def get_chat_queries(
-    background_tasks: BackgroundTasks,
-    session: AsyncSession = Depends(get_db_session),
-    chat_data_repository: ChatDataRepository = Depends(get_chat_data_repository),
-    user_chat_repository: UserChatRepository = Depends(get_user_chat_repository),
-    cache_service: CacheService = Depends(get_cache_service),
-    settings: APISettings = Depends(get_api_settings)
-) -> ChatQueries:
-    return ChatQueries(
-        session=session, 
-        chat_data_repository=chat_data_repository, 
-        user_chat_repository=user_chat_repository, 
-        cache_service=cache_service, 
-        task_queue=background_tasks,
-        cache_config=settings.cache,
-    )
-
-def get_message_queries(
-    chat_history_repository: ChatHistoryRepository = Depends(get_chat_history_repository),
-    chat_queries: ChatQueries = Depends(get_chat_queries),
-    user_queries: UserQueries = Depends(get_user_queries),
-) -> MessageQueries:
-    return MessageQueries(
-        chat_history_repository=chat_history_repository, 
-        chat_queries=chat_queries, 
-        user_queries=user_queries
-    )
-
-def get_pubsub_service(
-    chat_queries: ChatQueries = Depends(get_chat_queries),
-):
-    return PubSubService(chat_queries=chat_queries)
-
-def get_user_commands(
-    session: AsyncSession = Depends(get_db_session),
-    user_data_repository: UserDataRepository = Depends(get_user_data_repository),
-    user_chat_repository: UserChatRepository = Depends(get_user_chat_repository),
-    settings: APISettings = Depends(get_api_settings)
-) -> UserCommands:
-    return UserCommands(
-        session=session, 
-        user_data_repository=user_data_repository, 
-        user_chat_repository=user_chat_repository, 
-        user_config=settings.user
-    )
-
-def get_chat_commands(
-    session: AsyncSession = Depends(get_db_session),
-    chat_data_repository: ChatDataRepository = Depends(get_chat_data_repository),
-    user_chat_repository: UserChatRepository = Depends(get_user_chat_repository),
-    settings: APISettings = Depends(get_api_settings)
-) -> ChatCommands:
-    return ChatCommands(
-        session=session, 
-        chat_data_repository=chat_data_repository, 
-        user_chat_repository=user_chat_repository, 
-        chat_config=settings.chat,
-        user_config=settings.user
-    )
-
-def get_message_commands(
-    chat_history_repository: ChatHistoryRepository = Depends(get_chat_history_repository),
-    chat_queries: ChatQueries = Depends(get_chat_queries),
-    user_queries: UserQueries = Depends(get_user_queries),
-    settings: APISettings = Depends(get_api_settings),
-    kafka_producer: AIOKafkaProducer = Depends(get_kafka_producer),
-) -> MessageCommands:
-    return MessageCommands(
-        chat_history_repository=chat_history_repository, 
-        chat_queries=chat_queries, 
-        user_queries=user_queries, 
-        publisher=kafka_producer, 
-        chat_config=settings.chat,
-    )
-
-def get_auth_service(
-    session: AsyncSession = Depends(get_db_session),
-    user_commands: UserCommands = Depends(get_user_commands),
-    user_queries: UserQueries = Depends(get_user_queries),
-    auth_repository: AuthRepository = Depends(get_auth_repository),
-    settings: APISettings = Depends(get_api_settings)
-) -> AuthService:
-    return AuthService(
-        session=session, 
-        user_commands=user_commands, 
-        user_queries=user_queries, 
-        auth_repository=auth_repository,
-        auth_config=settings.auth
-    )
\ No newline at end of file
+async def get_auth_service(conn: HTTPConnection) -> AuthService:
+    return conn.app.state.auth_service
@@ -9,6 +9,7 @@ from harmony.app.schemas import (
 )
 from harmony.app.core import get_api_settings, APISettings
 from .dependencies import get_auth_service, get_current_user, get_user_commands, get_user_queries
+from .chat import get_chat_pagination_limit
 
 router = APIRouter()
 
@@ -46,18 +47,31 @@ async def sign_up(
     response_model=UserChatsResponse,
     summary="Get my chats",
     responses={
-        401: {"description": "Authentication credentials were not provided or are invalid."}
+        401: {"description": "Authentication credentials were not provided or are invalid."},
+        422: {"description": "Invalid limit or cursor."}
     }
 )
 async def get_my_chats(
     user_id: uuid.UUID = Depends(get_current_user),
+    limit: int | None = Query(default=None, ge=1, description="Number of chats to return"),
+    cursor: str | None = None,
+    settings: APISettings = Depends(get_api_settings),
     user_query_service = Depends(get_user_queries)
 ):
     """
-    Retrieves a list of Chat IDs that the currently logged-in user participates in.
+    Retrieves the chats the currently logged-in user participates in, most recently active first.
+
+    - Without **limit** and **cursor**, returns every chat in one response (`next_cursor` is `null`).
+    - With either, returns up to **limit** chats per page (the default pagination limit if omitted).
+    - Pass the returned `next_cursor` as **cursor** to get the next page; it is `null` on the last page.
     """
-    chats = await user_query_service.get_user_chats(user_id=user_id)
-    return UserChatsResponse(chats=chats)
+    if limit is None and cursor is None:
+        chats, _ = await user_query_service.get_user_chats(user_id=user_id, limit=None)
+        return UserChatsResponse(chats=chats)
+
+    limit = get_chat_pagination_limit(limit, settings)
+    chats, next_cursor = await user_query_service.get_user_chats(user_id=user_id, limit=limit, cursor=cursor)
+    return UserChatsResponse(chats=chats, next_cursor=next_cursor)
 
 @router.delete(
     "/me", 
@@ -123,7 +137,7 @@ def get_user_search_limit(
     "/lookup", 
     response_model=List[UserResponse],
     status_code=status.HTTP_200_OK,
-    summary="Search for users by email partial match",
+    summary="Search for users by email or username partial match",
 )
 async def get_user_details_by_email(
     email: str,
@@ -131,9 +145,11 @@ async def get_user_details_by_email(
     user_query_service = Depends(get_user_queries)
 ):
     """
-    Retrieves a list of users that match the email search query.
+    Retrieves active users whose email or username contains the search term, most similar first.
+
+    - Terms shorter than the configured minimum (3 characters by default) return an empty list.
     """
-    return await user_query_service.search_users_by_email(email_query=email, limit=limit)
+    return await user_query_service.search_users(query=email, limit=limit)
 
 @router.get(
     "/{user_id}", 
@@ -1,3 +1,8 @@
 from .settings import *
-from .security import verify_password, get_password_hash, create_access_token, decode_access_token, generate_refresh_token, hash_refresh_token
-from .logging import setup_logging
\ No newline at end of file
+from .security import (
+    verify_password, get_password_hash, PasswordHasher,
+    create_access_token, decode_access_token, get_signing_key, TokenVerifier,
+    generate_refresh_token, hash_refresh_token
+)
+from .logging import setup_logging
+from .local_cache import LocalCache
\ No newline at end of file
@@ -32,4 +32,10 @@ class LimitExceededError(ValidationError):
 
 class InternalServerError(HarmonyError):
     """Raised when an unexpected server error occurs."""
-    pass
\ No newline at end of file
+    pass
+
+class ServiceUnavailableError(HarmonyError):
+    """Raised when the server is temporarily overloaded and the client should retry later."""
+    def __init__(self, message: str, retry_after_seconds: int = 1):
+        super().__init__(message)
+        self.headers = {"Retry-After": str(retry_after_seconds)}
\ No newline at end of file
@@ -0,0 +1,91 @@
+import time
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Any
+
+
+class LocalCache:
+    '''
+    A bounded, TTL-aware LRU cache held in process memory.
+
+    Entries expire after their TTL and the least recently used entry is evicted once
+    max_entries is reached. `None` is treated as "not cached", so it cannot be stored as a value.
+    Not thread-safe: it is meant to be shared by coroutines running on a single event loop.
+    '''
+
+    def __init__(self, max_entries: int, default_ttl_seconds: float):
+        self.max_entries = max_entries
+        self.default_ttl_seconds = default_ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+        # Counters (used to size the cache)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None):
+        if value is None or self.max_entries <= 0:
+            return
+        ttl = self.default_ttl_seconds if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        if self._entries.pop(key, None) is None:
+            return False
+        self.invalidations += 1
+        return True
+
+    def delete_pattern(self, pattern: str) -> int:
+        """Deletes every key matching a Redis-style glob pattern."""
+        matched = [key for key in self._entries if fnmatchcase(key, pattern)]
+        for key in matched:
+            del self._entries[key]
+        self.invalidations += len(matched)
+        return len(matched)
+
+    def clear(self):
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -1,9 +1,16 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+import time
 import jwt
 from pwdlib import PasswordHash
 import hashlib
 import secrets
 
+from .exceptions import ServiceUnavailableError
+from .local_cache import LocalCache
+from .settings import AuthConfig
+
 password_hash = PasswordHash.recommended()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -12,6 +19,56 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return password_hash.hash(password)
 
+class PasswordHasher:
+    '''
+    Runs Argon2 hashing and verification on a bounded thread pool so they don't block the event loop
+    (argon2-cffi releases the GIL while hashing).
+
+    Back-pressure:
+        At most `workers` hashes run at once and at most `queue_limit` more wait for a worker.
+        Further calls are rejected immediately with ServiceUnavailableError instead of queueing.
+    '''
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hasher")
+        self._pending = 0
+
+        # Counters
+        self.completed = 0
+        self.rejected = 0
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def _run(self, fn, *args):
+        if self._pending >= self.workers + self.queue_limit:
+            self.rejected += 1
+            raise ServiceUnavailableError("Authentication is temporarily overloaded. Please retry shortly.")
+
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+            self.completed += 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
 def create_access_token(data: dict, expires_delta: timedelta, secret_key: str, algorithm: str) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + expires_delta
@@ -19,9 +76,74 @@ def create_access_token(data: dict, expires_delta: timedelta, secret_key: str, a
     encoded_jwt = jwt.encode(to_encode, secret_key, algorithm=algorithm)
     return encoded_jwt
 
-def decode_access_token(token: str, secret_key: str, algorithm: str) -> dict:
+def decode_access_token(token: str, secret_key, algorithm: str) -> dict:
     payload = jwt.decode(token, secret_key, algorithms=[algorithm])
     return payload
+
+ASYMMETRIC_ALGORITHM_PREFIXES = ("RS", "PS", "ES", "EdDSA")
+
+def is_asymmetric_algorithm(algorithm: str) -> bool:
+    return algorithm.startswith(ASYMMETRIC_ALGORITHM_PREFIXES)
+
+def get_signing_key(cfg: AuthConfig) -> str:
+    """The key used to sign access tokens: the private key for asymmetric algorithms, else the shared secret."""
+    if not is_asymmetric_algorithm(cfg.algorithm):
+        return cfg.secret_key.get_secret_value()
+    if cfg.private_key is None:
+        raise ValueError(f"AUTH__PRIVATE_KEY is required to sign tokens with {cfg.algorithm}")
+    return cfg.private_key.get_secret_value()
+
+class TokenVerifier:
+    '''
+    Verifies access tokens and remembers the ones that passed.
+
+    Verified-token cache:
+        A bounded LRU keyed by the token's SHA-256 digest holds the decoded `sub` and `exp`.
+        An entry lives until the token expires (capped by token_cache_ttl_seconds), so a cached token
+        is never honored past its `exp`. Tokens that fail verification are never cached.
+
+    Keys:
+        With an asymmetric algorithm (RS*/PS*/ES*/EdDSA), tokens are verified with the configured public key,
+        parsed once at startup, so verifying pods don't need the signing secret (requires pyjwt[crypto]).
+    '''
+
+    def __init__(self, cfg: AuthConfig):
+        self.algorithm = cfg.algorithm
+        self.key = self._load_verification_key(cfg)
+        self.cache_ttl_seconds = cfg.token_cache_ttl_seconds
+        self.cache = LocalCache(max_entries=cfg.token_cache_max_entries, default_ttl_seconds=cfg.token_cache_ttl_seconds)
+
+    @staticmethod
+    def _load_verification_key(cfg: AuthConfig):
+        if not is_asymmetric_algorithm(cfg.algorithm):
+            return cfg.secret_key.get_secret_value()
+        if cfg.public_key is None:
+            raise ValueError(f"AUTH__PUBLIC_KEY is required to verify tokens with {cfg.algorithm}")
+        return jwt.get_algorithm_by_name(cfg.algorithm).prepare_key(cfg.public_key)
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def verify(self, token: str) -> dict:
+        """
+        Returns the token's claims ({"sub", "exp"} on a cache hit).
+        Raises jwt.ExpiredSignatureError / jwt.InvalidTokenError like jwt.decode.
+        """
+        digest = self._digest(token)
+        claims = self.cache.get(digest)
+        if claims is not None and claims["exp"] > time.time():
+            return claims
+
+        payload = decode_access_token(token, self.key, self.algorithm)
+
+        exp = payload.get("exp")
+        if payload.get("sub") is not None and exp is not None:
+            self.cache.set(digest, {"sub": payload["sub"], "exp": exp}, ttl=min(exp - time.time(), self.cache_ttl_seconds))
+        return payload
+
+    def stats(self) -> dict:
+        return self.cache.stats()
     
 def hash_refresh_token(plain_token: str) -> str:
     return hashlib.sha256(plain_token.encode()).hexdigest()
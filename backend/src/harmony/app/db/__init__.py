@@ -1 +1,8 @@
-from .dynamodb import to_dynamo_json, from_dynamo_json, process_batch, batch_request, paginate_in_batches, put_batch, delete_batch
\ No newline at end of file
+from .dynamodb import (
+    to_dynamo_json, from_dynamo_json,
+    TokenBucket, AdaptiveRateLimiter, DynamoWriteScheduler
+)
+from .purge import QueryPurge, PurgeStats
+from .codecs import ChatHistoryCodec, HistoryCursor
+from .session import ScopedSession, WRITE_DEPTH, release_connection
+from .pool import MonitoredPool
\ No newline at end of file
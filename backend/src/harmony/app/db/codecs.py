@@ -0,0 +1,201 @@
+import re
+import json
+import base64
+import binascii
+import zlib
+from dataclasses import dataclass
+from typing import Literal
+from pydantic import TypeAdapter
+from harmony.app.schemas import ChatMessage
+
+from .dynamodb import serializer, from_dynamo_json
+
+try:
+    import zstandard # Optional: pip install harmony-chat-api[zstd]
+except ImportError:
+    zstandard = None
+
+_chat_messages = TypeAdapter(list[ChatMessage])
+
+def _flatten(item: dict) -> dict | None:
+    """Unwraps an item made only of S/NULL attributes. Returns None for any other shape."""
+    flat = {}
+    for key, attr in item.items():
+        if "S" in attr:
+            flat[key] = attr["S"]
+        elif "NULL" in attr:
+            flat[key] = None
+        else:
+            return None
+    return flat
+
+_CROCKFORD = {char: value for value, char in enumerate("0123456789ABCDEFGHJKMNPQRSTVWXYZ")}
+
+def _ulid_seconds(ulid: str) -> float:
+    """Unix time (seconds, millisecond precision) of a ULID: its first 10 base32 characters."""
+    ms = 0
+    for char in ulid[:10]:
+        ms = ms * 32 + _CROCKFORD[char]
+    return ms / 1000
+
+def _binary(attr: dict) -> bytes:
+    # Binary attributes written through the Kafka sink arrive base64 encoded in a string attribute
+    return attr["B"] if "B" in attr else base64.b64decode(attr["S"])
+
+class ChatHistoryCodec:
+    '''
+    Specialized marshalling for ChatHistory items.
+
+    Item formats (both can coexist in a table; the reader picks by the "v" attribute):
+        plain (no "v"):  chat_id, ulid, timestamp, user_id, content, client_uuid as string attributes.
+        compact (v = 1): chat_id, ulid (the table key, unchanged), u = user_id and k = client_uuid as 16-byte binaries,
+                         no timestamp (derived from the ULID on read), and content either as c (string) or,
+                         above compression_threshold_bytes, compressed as c_zlib / c_zstd (binary).
+
+    Decoding unwraps the raw DynamoDB JSON directly and validates the whole page in one pydantic call,
+    instead of running TypeDeserializer and model_validate per item. Plain items with any other attribute
+    type take the generic from_dynamo_json path.
+    '''
+
+    COMPACT_VERSION = 1
+
+    def __init__(
+        self,
+        item_format: Literal["plain", "compact"] = "plain",
+        compression: Literal["zlib", "zstd"] = "zlib",
+        compression_threshold_bytes: int = 1024,
+    ):
+        if compression == "zstd" and zstandard is None:
+            raise RuntimeError("zstd compression requires the 'zstandard' package (pip install harmony-chat-api[zstd])")
+        self.item_format = item_format
+        self.compression = compression
+        self.compression_threshold_bytes = compression_threshold_bytes
+
+    # --------------------------------- Encoding --------------------------------- #
+    def encode(self, msg: ChatMessage) -> dict:
+        if self.item_format == "compact":
+            return self.encode_compact(msg)
+        return self.encode_plain(msg)
+
+    @staticmethod
+    def encode_plain(msg: ChatMessage) -> dict:
+        item = {}
+        for key, value in msg.model_dump(mode="json").items():
+            if isinstance(value, str):
+                item[key] = {"S": value}
+            elif value is None:
+                item[key] = {"NULL": True}
+            else:
+                item[key] = serializer.serialize(value)
+        return item
+
+    def encode_compact(self, msg: ChatMessage) -> dict:
+        item = {
+            "chat_id": {"S": str(msg.chat_id)},
+            "ulid": {"S": msg.ulid},
+            "v": {"N": str(self.COMPACT_VERSION)},
+            "u": {"B": msg.user_id.bytes},
+        }
+        if msg.client_uuid is not None:
+            item["k"] = {"B": msg.client_uuid.bytes}
+
+        content = msg.content.encode("utf-8")
+        if len(content) > self.compression_threshold_bytes:
+            item[f"c_{self.compression}"] = {"B": self._compress(content)}
+        else:
+            item["c"] = {"S": msg.content}
+        return item
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor().compress(data)
+        return zlib.compress(data)
+
+    # --------------------------------- Decoding --------------------------------- #
+    @classmethod
+    def decode_many(cls, items: list[dict], chat_id: str | None = None) -> list[ChatMessage]:
+        """
+        Decodes a page of items. `chat_id` overrides the items' chat_id attribute,
+        which holds the sharded partition key ("<chat_id>#<shard>") in sharded tables.
+        """
+        return _chat_messages.validate_python([cls._to_python(item, chat_id) for item in items])
+
+    @classmethod
+    def decode(cls, item: dict, chat_id: str | None = None) -> ChatMessage:
+        return cls.decode_many([item], chat_id)[0]
+
+    @classmethod
+    def _to_python(cls, item: dict, chat_id: str | None = None) -> dict:
+        if "v" in item:
+            value = cls._expand_compact(item)
+        else:
+            value = _flatten(item)
+            if value is None:
+                value = from_dynamo_json(item)
+        if chat_id is not None:
+            value["chat_id"] = chat_id
+        return value
+
+    @classmethod
+    def _expand_compact(cls, item: dict) -> dict:
+        version = int(item["v"]["N"])
+        if version != cls.COMPACT_VERSION:
+            raise ValueError(f"Unsupported ChatHistory item version: {version}")
+
+        ulid = item["ulid"]["S"]
+        if "c" in item:
+            content = item["c"]["S"]
+        elif "c_zlib" in item:
+            content = zlib.decompress(_binary(item["c_zlib"])).decode("utf-8")
+        else:
+            if zstandard is None:
+                raise RuntimeError("Reading zstd-compressed messages requires the 'zstandard' package")
+            content = zstandard.ZstdDecompressor().decompress(_binary(item["c_zstd"])).decode("utf-8")
+
+        # 16-byte UUIDs and Unix timestamps are parsed by the (single) pydantic validation pass
+        return {
+            "chat_id": item["chat_id"]["S"],
+            "ulid": ulid,
+            "client_uuid": _binary(item["k"]) if "k" in item else None,
+            "timestamp": _ulid_seconds(ulid),
+            "user_id": _binary(item["u"]),
+            "content": content,
+        }
+
+
+_ULID_PATTERN = re.compile(r"^[0-9A-HJKMNP-TV-Z]{26}$")
+
+@dataclass(frozen=True)
+class HistoryCursor:
+    '''
+    Opaque chat history cursor: url-safe base64 of {"v": version, "k": last ULID served, "n": page size}.
+
+    Bare ULIDs (the cursor format before versioning) are still accepted, without a page size.
+    '''
+
+    ulid: str
+    limit: int | None = None
+
+    VERSION = 1
+
+    def encode(self) -> str:
+        payload = json.dumps({"v": self.VERSION, "k": self.ulid, "n": self.limit}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).rstrip(b"=").decode()
+
+    @classmethod
+    def decode(cls, token: str) -> "HistoryCursor":
+        """Raises ValueError if the token is not a valid cursor."""
+        if _ULID_PATTERN.match(token):
+            return cls(ulid=token)
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError("Malformed history cursor") from e
+        if not isinstance(payload, dict) or payload.get("v") != cls.VERSION:
+            raise ValueError("Unsupported history cursor version")
+
+        ulid, limit = payload.get("k"), payload.get("n")
+        if not isinstance(ulid, str) or not _ULID_PATTERN.match(ulid) or not (limit is None or isinstance(limit, int)):
+            raise ValueError("Malformed history cursor")
+        return cls(ulid=ulid, limit=limit)
@@ -1,6 +1,10 @@
 import asyncio
+import random
+import time
 from typing import Protocol, List, Any
 from boto3.dynamodb.types import TypeSerializer, TypeDeserializer
+from botocore.exceptions import ClientError
+from harmony.app.core.settings import DynamoDBConfig
 
 # ------------------------- DynamoDB JSON Conversion ------------------------- #
 serializer = TypeSerializer()
@@ -12,56 +16,181 @@ def to_dynamo_json(python_dict: dict) -> dict:
 def from_dynamo_json(dynamo_dict: dict) -> dict:
     return {k: deserializer.deserialize(v) for k, v in dynamo_dict.items()}
 
+# ------------------------------ Rate Limiting ------------------------------- #
+class TokenBucket:
+    '''
+    Async token bucket: `rate` tokens are added per second, up to `capacity`.
+    A rate of 0 disables limiting.
+    '''
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1):
+        if self.rate <= 0:
+            return
+        tokens = min(tokens, self.capacity)
+
+        # The lock keeps waiters first-come first-served
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
+
+class AdaptiveRateLimiter(TokenBucket):
+    '''
+    Token bucket whose rate adapts to throttling (AIMD):
+    the rate is halved on throttling and grows by `increase` per successful request, within [min_rate, max_rate].
+
+    Concurrent requests are throttled together, so the rate is halved at most once per `cooldown` seconds:
+    the other throttles of the same burst do not divide it again.
+    '''
+
+    def __init__(self, max_rate: float, min_rate: float, increase: float, cooldown: float = 0):
+        super().__init__(max_rate, capacity=max_rate)
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.increase = increase
+        self.cooldown = cooldown
+        self._decreased_at: float | None = None
+
+    def on_throttle(self):
+        now = time.monotonic()
+        if self._decreased_at is not None and now - self._decreased_at < self.cooldown:
+            return
+        self._decreased_at = now
+        self._refill()
+        self.rate = max(self.min_rate, self.rate / 2)
+
+    def on_success(self):
+        self._refill()
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
 # ------------------------------ Batch Requests ------------------------------ #
-async def process_batch(client, table_name, batch, max_retries: int = 0):
-    response = await client.batch_write_item(
-        RequestItems={
-            table_name: batch
+THROTTLING_ERROR_CODES = {"ProvisionedThroughputExceededException", "ThrottlingException", "RequestLimitExceeded"}
+
+class DynamoWriteScheduler:
+    '''
+    Shared scheduler for every DynamoDB BatchWriteItem call (and the conditional PutItems of put).
+
+    - Concurrency: at most write_max_concurrency requests in flight.
+    - Rate: requests draw one token per write request from an adaptive limiter that halves its rate
+      on throttling (UnprocessedItems or a throttling error, at most once per write_throttle_cooldown_ms)
+      and recovers additively on success.
+    - Retries: UnprocessedItems and throttling errors are retried with full-jitter exponential backoff,
+      at most write_max_retries times, after which the batch fails.
+    '''
+
+    def __init__(self, client, cfg: DynamoDBConfig):
+        self.client = client
+        self.max_retries = cfg.write_max_retries
+        self.backoff_base = cfg.write_backoff_base_ms / 1000
+        self.backoff_max = cfg.write_backoff_max_ms / 1000
+        self._semaphore = asyncio.Semaphore(cfg.write_max_concurrency)
+        self.limiter = AdaptiveRateLimiter(
+            max_rate=cfg.write_max_capacity_per_second,
+            min_rate=cfg.write_min_capacity_per_second,
+            increase=cfg.write_min_capacity_per_second,
+            cooldown=cfg.write_throttle_cooldown_ms / 1000,
+        )
+
+        # Counters
+        self.requests = 0
+        self.items_written = 0
+        self.throttles = 0
+        self.retries = 0
+        self.failed_batches = 0
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt)) # Full jitter
+
+    async def write(self, table_name: str, write_requests: List[dict]):
+        """Writes up to 25 requests as one BatchWriteItem, retrying unprocessed items."""
+        request_items = {table_name: write_requests}
+        attempt = 0
+        while True:
+            count = sum(len(reqs) for reqs in request_items.values())
+            await self.limiter.acquire(count)
+
+            async with self._semaphore:
+                self.requests += 1
+                try:
+                    response = await self.client.batch_write_item(RequestItems=request_items)
+                    unprocessed = response.get("UnprocessedItems", {})
+                except ClientError as e:
+                    if e.response.get("Error", {}).get("Code") not in THROTTLING_ERROR_CODES:
+                        raise
+                    unprocessed = request_items
+
+            done = count - sum(len(reqs) for reqs in unprocessed.values())
+            self.items_written += done
+            if not unprocessed:
+                self.limiter.on_success()
+                return
+
+            self.throttles += 1
+            self.limiter.on_throttle()
+            if attempt >= self.max_retries:
+                self.failed_batches += 1
+                raise Exception(f"Failed to process batch after {attempt} retries: {unprocessed}")
+
+            self.retries += 1
+            await asyncio.sleep(self._backoff(attempt))
+            request_items = unprocessed
+            attempt += 1
+
+    async def put(self, table_name: str, item: dict, **conditions):
+        """
+        Writes one item with PutItem under the scheduler's limits, for writes BatchWriteItem cannot express
+        (e.g. a ConditionExpression, passed through in `conditions`). Throttling errors are retried like batches;
+        any other error, including ConditionalCheckFailedException, is raised to the caller.
+        """
+        attempt = 0
+        while True:
+            await self.limiter.acquire()
+
+            async with self._semaphore:
+                self.requests += 1
+                try:
+                    await self.client.put_item(TableName=table_name, Item=item, **conditions)
+                    throttled = False
+                except ClientError as e:
+                    if e.response.get("Error", {}).get("Code") not in THROTTLING_ERROR_CODES:
+                        raise
+                    throttled = True
+
+            if not throttled:
+                self.items_written += 1
+                self.limiter.on_success()
+                return
+
+            self.throttles += 1
+            self.limiter.on_throttle()
+            if attempt >= self.max_retries:
+                self.failed_batches += 1
+                raise Exception(f"Failed to put item after {attempt} retries")
+
+            self.retries += 1
+            await asyncio.sleep(self._backoff(attempt))
+            attempt += 1
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "items_written": self.items_written,
+            "throttles": self.throttles,
+            "retries": self.retries,
+            "failed_batches": self.failed_batches,
+            "rate_per_second": round(self.limiter.rate, 1),
         }
-    )
-
-    unprocessed = response.get('UnprocessedItems', {})
-
-    retries = 0
-    while unprocessed and (max_retries == 0 or retries < max_retries):
-        await asyncio.sleep(0.5 * (2 ** retries)) # Exponential backoff: 0.5s, 1s, 2s...
-        response = await client.batch_write_item(RequestItems=unprocessed)
-        unprocessed = response.get('UnprocessedItems', {})
-        retries += 1
-
-    if unprocessed:
-        raise Exception(f"Failed to process batch after {retries} retries: {unprocessed}")
-
-async def batch_request(client, table_name, write_requests, chunk_size: int = 25, max_retries: int = 0):
-    batches = [write_requests[i:i + chunk_size] for i in range(0, len(write_requests), chunk_size)]
-
-    tasks = []
-    for batch in batches:
-        tasks.append(process_batch(client, table_name, batch, max_retries=max_retries))
-    
-    await asyncio.gather(*tasks)
-
-# Convenience functions
-async def put_batch(client, TableName: str, Items: List[dict], **kwargs):
-    await batch_request(client, TableName, [{"PutRequest": {"Item": item}} for item in Items], **kwargs)
-
-async def delete_batch(client, TableName: str, Keys: List[dict], **kwargs):
-    await batch_request(client, TableName, [{"DeleteRequest": {"Key": key}} for key in Keys], **kwargs)
-
-# ----------------------------- Pagination Helper ---------------------------- #
-async def paginate_in_batches(client, query_kwargs: dict, batch_size: int = 25):
-    paginator = client.get_paginator('query')
-    batch = []
-    
-    async for page in paginator.paginate(**query_kwargs):
-        for item in page.get("Items", []):
-            batch.append(item)
-            
-            # Yield the chunk when it reaches the desired size
-            if len(batch) == batch_size:
-                yield batch
-                batch = [] # Reset
-                
-    # Yield any remaining items
-    if batch:
-        yield batch
\ No newline at end of file
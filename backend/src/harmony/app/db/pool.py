@@ -0,0 +1,52 @@
+import time
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+class MonitoredPool(AsyncAdaptedQueuePool):
+    '''
+    The asyncio queue pool of SQLAlchemy, counting checkouts, the time spent waiting for them
+    (including opening new connections and pre-ping) and overflow connections in use.
+
+    High wait times or any timeouts mean the process needs more than pool_size + max_overflow connections
+    at peak (or holds them too long); max_overflow_in_use shows how much of the overflow is actually used.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Counters
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.max_checked_out = 0
+        self.max_overflow_in_use = 0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        wait_ms = (time.perf_counter() - start) * 1000
+
+        self.checkouts += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self.max_checked_out = max(self.max_checked_out, self.checkedout())
+        self.max_overflow_in_use = max(self.max_overflow_in_use, self.overflow())
+        return connection
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "overflow_in_use": max(self.overflow(), 0),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": self.total_wait_ms / self.checkouts if self.checkouts else 0.0,
+            "max_wait_ms": self.max_wait_ms,
+            "max_checked_out": self.max_checked_out,
+            "max_overflow_in_use": self.max_overflow_in_use,
+        }
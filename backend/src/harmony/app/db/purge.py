@@ -0,0 +1,146 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+import structlog
+
+from .dynamodb import TokenBucket, DynamoWriteScheduler
+
+logger = structlog.get_logger(__name__)
+
+@dataclass
+class PurgeStats:
+    deleted: int = 0
+    batches: int = 0
+    resumed_from: int = 0 # Items deleted by earlier, interrupted runs
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def items_per_second(self) -> float:
+        elapsed = time.monotonic() - self.started_at
+        return (self.deleted - self.resumed_from) / elapsed if elapsed > 0 else 0.0
+
+
+class QueryPurge:
+    '''
+    Deletes every item returned by a DynamoDB query.
+
+    Pipeline:
+        One task pages through the query (keys only) and queues 25-key batches while `concurrency` writers
+        issue them through the shared DynamoWriteScheduler (which handles throttling and retries).
+        Each batch first draws its write units from the purge's own token bucket, so a purge stays within its budget.
+
+    Checkpoint (optional):
+        Every checkpoint_interval_seconds the key of the last item of the longest contiguous run of deleted batches
+        is saved. A resumed purge starts its query after that key.
+    '''
+
+    BATCH_SIZE = 25
+
+    def __init__(
+        self,
+        client,
+        scheduler: DynamoWriteScheduler,
+        table_name: str,
+        query_kwargs: dict,
+        concurrency: int = 4,
+        write_capacity_per_second: float = 0,
+        checkpoint_interval_seconds: float = 5,
+        load_checkpoint: Optional[Callable[[], Awaitable[dict | None]]] = None,
+        save_checkpoint: Optional[Callable[[dict], Awaitable[None]]] = None,
+    ):
+        self.client = client
+        self.scheduler = scheduler
+        self.table_name = table_name
+        self.query_kwargs = query_kwargs
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(write_capacity_per_second, capacity=max(write_capacity_per_second, self.BATCH_SIZE))
+        self.checkpoint_interval_seconds = checkpoint_interval_seconds
+        self.load_checkpoint = load_checkpoint
+        self.save_checkpoint = save_checkpoint
+        self.stats = PurgeStats()
+
+        # Contiguous-completion watermark over batch sequence numbers
+        self._done: dict[int, dict] = {}
+        self._next_seq = 0
+        self._watermark_key: dict | None = None
+
+    async def run(self) -> PurgeStats:
+        query_kwargs = dict(self.query_kwargs)
+        checkpoint = await self.load_checkpoint() if self.load_checkpoint else None
+        if checkpoint:
+            query_kwargs["ExclusiveStartKey"] = checkpoint["last_key"]
+            self.stats.deleted = self.stats.resumed_from = checkpoint.get("deleted", 0)
+            logger.info("purge_resumed_from_checkpoint", table=self.table_name, deleted=self.stats.deleted)
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        producer = asyncio.create_task(self._produce(queue, query_kwargs))
+        writers = [asyncio.create_task(self._writer(queue)) for _ in range(self.concurrency)]
+        checkpointer = asyncio.create_task(self._checkpoint_periodically())
+        try:
+            await asyncio.gather(producer, *writers)
+        except BaseException:
+            # Remember how far we got so the next attempt resumes from there
+            await self._save_checkpoint()
+            raise
+        finally:
+            tasks = [producer, checkpointer, *writers]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        logger.info(
+            "purge_completed", table=self.table_name, deleted=self.stats.deleted,
+            items_per_second=round(self.stats.items_per_second, 1), **self.scheduler.stats()
+        )
+        return self.stats
+
+    async def _produce(self, queue: asyncio.Queue, query_kwargs: dict):
+        paginator = self.client.get_paginator("query")
+        seq, batch = 0, []
+        async for page in paginator.paginate(**query_kwargs):
+            for item in page.get("Items", []):
+                batch.append(item)
+                if len(batch) == self.BATCH_SIZE:
+                    await queue.put((seq, batch))
+                    seq, batch = seq + 1, []
+        if batch:
+            await queue.put((seq, batch))
+
+        # One stop marker per writer
+        for _ in range(self.concurrency):
+            await queue.put(None)
+
+    async def _writer(self, queue: asyncio.Queue):
+        while True:
+            entry = await queue.get()
+            if entry is None:
+                return
+            seq, keys = entry
+            await self._delete(keys)
+            self._complete(seq, keys[-1])
+
+    async def _delete(self, keys: list[dict]):
+        await self.bucket.acquire(len(keys))
+        await self.scheduler.write(self.table_name, [{"DeleteRequest": {"Key": key}} for key in keys])
+        self.stats.deleted += len(keys)
+        self.stats.batches += 1
+
+    def _complete(self, seq: int, last_key: dict):
+        self._done[seq] = last_key
+        while self._next_seq in self._done:
+            self._watermark_key = self._done.pop(self._next_seq)
+            self._next_seq += 1
+
+    async def _save_checkpoint(self):
+        if self.save_checkpoint and self._watermark_key is not None:
+            await self.save_checkpoint({"last_key": self._watermark_key, "deleted": self.stats.deleted})
+
+    async def _checkpoint_periodically(self):
+        while True:
+            await asyncio.sleep(self.checkpoint_interval_seconds)
+            await self._save_checkpoint()
+            logger.info(
+                "purge_progress", table=self.table_name, deleted=self.stats.deleted,
+                items_per_second=round(self.stats.items_per_second, 1)
+            )
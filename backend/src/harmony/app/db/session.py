@@ -0,0 +1,99 @@
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+# session.info key counting the open write blocks (Command.transaction_handler), during which connections are kept
+WRITE_DEPTH = "write_depth"
+
+class _Scope:
+    __slots__ = ("session",)
+
+    def __init__(self):
+        self.session: AsyncSession | None = None
+
+class ScopedSession:
+    '''
+    Stand-in for an AsyncSession, shared by app-scoped repositories and services.
+
+    Every attribute access is forwarded to the AsyncSession of the current scope (an HTTP request,
+    a background task), which is only created on first use and closed when the scope ends.
+    A request served entirely from cache therefore never creates a session, let alone checks out a connection.
+
+    Read-only queries hand their connection back right away (see release), so a request holds a connection
+    only while it actually talks to Postgres, not while it writes to the cache, DynamoDB or Kafka afterwards.
+
+    The scope is a mutable holder in a ContextVar, so a session created deep inside a request
+    (e.g. in a task group started by a middleware) is still the one closed by the scope.
+    '''
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self.session_factory = session_factory
+        self._scope: ContextVar[_Scope | None] = ContextVar("db_session_scope", default=None)
+
+        # Counters
+        self.scopes = 0
+        self.sessions = 0
+        self.releases = 0
+
+    @asynccontextmanager
+    async def scope(self):
+        """Opens a new scope (nested scopes get their own session) and closes its session, if any, on exit."""
+        scope = _Scope()
+        token = self._scope.set(scope)
+        self.scopes += 1
+        try:
+            yield
+        finally:
+            self._scope.reset(token)
+            if scope.session is not None:
+                await scope.session.close()
+
+    @property
+    def active(self) -> bool:
+        """Whether the current scope has created its session."""
+        scope = self._scope.get()
+        return scope is not None and scope.session is not None
+
+    def get(self) -> AsyncSession:
+        scope = self._scope.get()
+        if scope is None:
+            raise RuntimeError("No database session scope is active (see ScopedSession.scope).")
+        if scope.session is None:
+            scope.session = self.session_factory()
+            self.sessions += 1
+        return scope.session
+
+    async def release(self) -> bool:
+        """
+        Ends the current scope's read-only transaction, returning its connection to the pool.
+        The session stays usable (the next query checks out a connection again) and, with expire_on_commit=False,
+        so do the objects it loaded. A no-op inside a write block.
+        """
+        scope = self._scope.get()
+        if scope is None or scope.session is None:
+            return False
+        if not await release_connection(scope.session):
+            return False
+        self.releases += 1
+        return True
+
+    def __getattr__(self, name: str):
+        return getattr(self.get(), name)
+
+    def stats(self) -> dict:
+        return {
+            "scopes": self.scopes,
+            "sessions": self.sessions,
+            "session_ratio": self.sessions / self.scopes if self.scopes else 0.0,
+            "releases": self.releases,
+        }
+
+async def release_connection(session: AsyncSession | ScopedSession) -> bool:
+    """Releases the connection held by a read-only transaction (see ScopedSession.release). Returns whether it did."""
+    if isinstance(session, ScopedSession):
+        return await session.release()
+    if not session.in_transaction() or session.info.get(WRITE_DEPTH):
+        return False
+    # Nothing was written, so committing only ends the transaction (and keeps the loaded objects, unlike a rollback)
+    await session.commit()
+    return True
@@ -1,4 +1,4 @@
-from .cache import cache_connector
+from .cache import cache_connector, local_cache_connector
 from .dynamodb import dynamodb_connector
 from .postgres import postgres_connector
-from .kafka import kafka_connector
\ No newline at end of file
+from .kafka import kafka_connector, kafka_publisher
\ No newline at end of file
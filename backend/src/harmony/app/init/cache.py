@@ -1,8 +1,11 @@
-from contextlib import asynccontextmanager
+import asyncio
+import json
+from contextlib import asynccontextmanager, suppress
 from redis.asyncio import Redis
+from redis.exceptions import RedisError
 import structlog
 
-from harmony.app.core import RedisConfig
+from harmony.app.core import RedisConfig, CacheConfig, LocalCache
 
 logger = structlog.get_logger(__name__)
 
@@ -34,4 +37,56 @@ async def cache_connector(cfg: RedisConfig):
     finally:
         # Gracefully close the connection pool when the lifespan tears down
         await redis_client.aclose()
-        logger.info("redis_cache_disconnected")
\ No newline at end of file
+        logger.info("redis_cache_disconnected")
+
+
+async def _listen_for_invalidations(redis_client: Redis, channel: str, local_cache: LocalCache, reconnect_delay: float = 1.0):
+    """
+    Applies invalidations published on the channel to the local cache until cancelled.
+    If the subscription drops, invalidations may have been missed, so the local cache is cleared.
+    """
+    while True:
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(channel)
+            logger.info("local_cache_invalidation_listener_subscribed", channel=channel)
+
+            while True:
+                message = await pubsub.get_message(timeout=1.0)
+                if message is None:
+                    continue
+                try:
+                    data = json.loads(message["data"])
+                except (TypeError, json.JSONDecodeError):
+                    logger.warning("local_cache_invalid_invalidation_message", data=message.get("data"))
+                    continue
+
+                for key in data.get("keys") or []:
+                    local_cache.delete(key)
+                if data.get("pattern"):
+                    local_cache.delete_pattern(data["pattern"])
+        except (RedisError, OSError) as e:
+            local_cache.clear()
+            logger.warning("local_cache_invalidation_listener_disconnected", channel=channel, error=str(e))
+            await asyncio.sleep(reconnect_delay)
+        finally:
+            with suppress(Exception):
+                await pubsub.aclose()
+
+
+@asynccontextmanager
+async def local_cache_connector(redis_client: Redis, cfg: CacheConfig):
+    """
+    Context manager that yields an in-process L1 cache kept coherent through the Redis invalidation channel.
+    The listener task is cancelled when the lifespan tears down.
+    """
+    local_cache = LocalCache(max_entries=cfg.local_max_entries, default_ttl_seconds=cfg.local_ttl_seconds)
+    listener = asyncio.create_task(_listen_for_invalidations(redis_client, cfg.invalidation_channel, local_cache))
+
+    try:
+        yield local_cache
+    finally:
+        listener.cancel()
+        with suppress(asyncio.CancelledError):
+            await listener
+        logger.info("local_cache_stopped", **local_cache.stats())
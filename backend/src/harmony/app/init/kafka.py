@@ -1,6 +1,7 @@
 from contextlib import asynccontextmanager
 from aiokafka import AIOKafkaProducer
 from harmony.app.core import KafkaProducerConfig
+from harmony.app.services import KafkaBatchPublisher
 import structlog
 
 logger = structlog.get_logger(__name__)
@@ -16,6 +17,10 @@ async def kafka_connector(cfg: KafkaProducerConfig):
         acks="all",
         enable_idempotence=True,
         retry_backoff_ms=cfg.retry_backoff_ms,
+        # KafkaBatchPublisher owns the linger: a producer-side linger would be waited out again by every send_batch
+        linger_ms=0,
+        max_batch_size=cfg.batch_size, # Capacity of the record batches the publisher builds (create_batch)
+        compression_type=cfg.compression_type,
     )
 
     try:
@@ -27,4 +32,23 @@ async def kafka_connector(cfg: KafkaProducerConfig):
         raise e
     finally:
         await producer.stop()
-        logger.info("kafka_producer_stopped")
\ No newline at end of file
+        logger.info("kafka_producer_stopped")
+
+@asynccontextmanager
+async def kafka_publisher(producer: AIOKafkaProducer, cfg: KafkaProducerConfig):
+    """
+    Context manager that yields a KafkaBatchPublisher on top of a started producer.
+    Flushes buffered messages on teardown (before the producer stops).
+    """
+    publisher = KafkaBatchPublisher(
+        producer=producer,
+        linger_ms=cfg.linger_ms,
+        batch_size=cfg.batch_size,
+        max_in_flight=cfg.max_in_flight,
+    )
+
+    try:
+        yield publisher
+    finally:
+        await publisher.flush()
+        logger.info("kafka_publisher_flushed", **publisher.stats())
@@ -1,10 +1,43 @@
+import uuid
 from contextlib import asynccontextmanager
+from sqlalchemy import text, event
+from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from harmony.app.core import PostgresConfig
+from harmony.app.core import PostgresConfig, OutboxConfig
+from harmony.app.db import MonitoredPool
 from harmony.app.models import Base
+from harmony.app.services import OutboxMaintenance
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+class _TransactionTimeoutSession(Session):
+    """Sets statement_timeout (session.info) at the start of each transaction, for connections shared through PgBouncer."""
+
+@event.listens_for(_TransactionTimeoutSession, "after_begin")
+def _set_statement_timeout(session, transaction, connection):
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(session.info['statement_timeout_ms'])}")
+
+def _connect_args(cfg: PostgresConfig) -> dict:
+    if cfg.pgbouncer:
+        # PgBouncer (transaction mode) hands each transaction to any server connection and rejects unknown
+        # startup parameters: no statement caches, uniquely named statements, statement_timeout set per transaction
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+
+    connect_args = {
+        "statement_cache_size": cfg.statement_cache_size,
+        "prepared_statement_cache_size": cfg.statement_cache_size, # SQLAlchemy's cache in front of asyncpg
+    }
+    if cfg.statement_timeout_ms:
+        connect_args["server_settings"] = {"statement_timeout": str(cfg.statement_timeout_ms)}
+    return connect_args
 
 @asynccontextmanager
-async def postgres_connector(dev_mode: bool, cfg: PostgresConfig):
+async def postgres_connector(dev_mode: bool, cfg: PostgresConfig, outbox_cfg: OutboxConfig = OutboxConfig()):
     """
     Context manager that yields a SQLAlchemy session factory.
     Handles engine creation and disposal.
@@ -13,25 +46,51 @@ async def postgres_connector(dev_mode: bool, cfg: PostgresConfig):
     engine = create_async_engine(
         cfg.url,
         echo=dev_mode,
-        future=True
+        future=True,
+        poolclass=MonitoredPool,
+        pool_size=cfg.pool_size,
+        max_overflow=cfg.max_overflow,
+        pool_timeout=cfg.pool_timeout_seconds,
+        pool_recycle=cfg.pool_recycle_seconds,
+        pool_pre_ping=cfg.pool_pre_ping,
+        connect_args=_connect_args(cfg),
+    )
+    logger.info(
+        "postgres_pool_configured",
+        pool_size=cfg.pool_size,
+        max_overflow=cfg.max_overflow,
+        max_connections=cfg.pool_size + cfg.max_overflow,
+        pgbouncer=cfg.pgbouncer,
     )
 
     # 2. Create Tables (Dev Only)
     # In production, use Alembic. 
     if dev_mode:
         async with engine.begin() as conn:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm")) # User search indexes
             await conn.run_sync(Base.metadata.create_all)
 
     # 3. Create Factory
+    session_options = {}
+    if cfg.pgbouncer and cfg.statement_timeout_ms:
+        session_options = {
+            "sync_session_class": _TransactionTimeoutSession,
+            "info": {"statement_timeout_ms": cfg.statement_timeout_ms},
+        }
     session_factory = async_sessionmaker(
         engine, 
         class_=AsyncSession, 
         expire_on_commit=False,
-        autoflush=False
+        autoflush=False,
+        **session_options
     )
 
+    # 4. Create the outbox partitions and CDC publication (Dev Only, maintain_outbox does it elsewhere)
+    if dev_mode:
+        await OutboxMaintenance(session_factory, outbox_cfg).prepare()
+
     try:
         yield session_factory
     finally:
-        # 4. Cleanup
-        await engine.dispose()
\ No newline at end of file
+        # 5. Cleanup
+        await engine.dispose()
@@ -2,4 +2,5 @@ from .base import Base
 from .user import User
 from .chat import Chat
 from .user_chat import UserChat
-from .refresh_token import RefreshToken
\ No newline at end of file
+from .refresh_token import RefreshToken
+from .outbox import OutboxEvent
\ No newline at end of file
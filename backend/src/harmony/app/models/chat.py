@@ -21,6 +21,11 @@ class Chat(Base):
         server_default=func.now()
     )
 
+    # Time of the newest message, maintained in batches by ChatActivityTracker
+    last_message_at: Mapped[datetime] = mapped_column(
+        server_default=func.now()
+    )
+
     meta: Mapped[dict[str, Any]] = mapped_column(
         JSONB, 
         server_default=text("'{}'::jsonb")
@@ -7,10 +7,14 @@ from .base import Base
 
 class OutboxEvent(Base):
     __tablename__ = "outbox_events"
+    # Daily range partitions are created and dropped by OutboxRepository (see harmony.consumer.maintain_outbox).
+    # Rows are only read by the CDC pipeline (from the WAL), so there are no secondary indexes to maintain.
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
     event_id: Mapped[uuid.UUID] = mapped_column(primary_key=True, server_default=text("gen_random_uuid()"))
-    aggregate_type: Mapped[str] = mapped_column(String, index=True)
-    aggregate_id: Mapped[str] = mapped_column(String, index=True)
+    aggregate_type: Mapped[str] = mapped_column(String)
+    aggregate_id: Mapped[str] = mapped_column(String)
     event_type: Mapped[str] = mapped_column(String)
     payload: Mapped[dict] = mapped_column(JSONB)
-    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
\ No newline at end of file
+    # Part of the primary key, as required for the partition key
+    created_at: Mapped[datetime] = mapped_column(primary_key=True, server_default=func.now())
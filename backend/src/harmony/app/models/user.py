@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, text, func, String
+from sqlalchemy import Boolean, Index, text, func, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import JSONB
 
@@ -11,6 +11,18 @@ from .base import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Trigram indexes (pg_trgm) serving user search: ILIKE '%q%' filtering and nearest-first ordering (<->),
+        # which needs GiST rather than GIN; tombstoned users are left out
+        Index(
+            "ix_users_email_trgm", "email",
+            postgresql_using="gist", postgresql_ops={"email": "gist_trgm_ops"}, postgresql_where=text("NOT tombstone")
+        ),
+        Index(
+            "ix_users_username_trgm", text("(meta ->> 'username') gist_trgm_ops"),
+            postgresql_using="gist", postgresql_where=text("NOT tombstone")
+        ),
+    )
 
     user_id: Mapped[uuid.UUID] = mapped_column(
         primary_key=True, 
@@ -1,4 +1,4 @@
-from sqlalchemy import text, func, ForeignKey
+from sqlalchemy import text, func, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 import uuid
@@ -16,4 +16,13 @@ class UserChat(Base):
     chat_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("chats.chat_id", ondelete="CASCADE"), primary_key=True, index=True
     )
-    joined_at: Mapped[datetime] = mapped_column(server_default=func.now())
\ No newline at end of file
+    joined_at: Mapped[datetime] = mapped_column(server_default=func.now())
+
+    # Copy of chats.last_message_at (or the join time, if later) so a user's chat list is served by one index
+    last_message_at: Mapped[datetime] = mapped_column(server_default=func.now())
+
+# Keyset pagination of a user's chats, most recently active first
+Index(
+    "ix_user_chats_user_activity",
+    UserChat.user_id, UserChat.last_message_at.desc(), UserChat.chat_id.desc()
+)
@@ -2,4 +2,5 @@ from .chat_history import ChatHistoryRepository
 from .chat_data import ChatDataRepository
 from .user_data import UserDataRepository
 from .user_chat_data import UserChatRepository
-from .auth import AuthRepository
\ No newline at end of file
+from .auth import AuthRepository
+from .outbox import OutboxRepository, OutboxPartition
\ No newline at end of file
@@ -4,10 +4,11 @@ import uuid
 
 from harmony.app.models import Chat 
 
-from sqlalchemy import select, delete, update
+from sqlalchemy import select, delete, update, values, column, Uuid, DateTime
 from sqlalchemy.ext.asyncio import AsyncSession
 from harmony.app.schemas import ChatMetaData
 import uuid
+from datetime import datetime
 from typing import Any
 
 class ChatDataRepository:
@@ -35,6 +36,20 @@ class ChatDataRepository:
         )
         await self.session.execute(stmt)
 
+    async def touch_chats(self, activity: dict[uuid.UUID, datetime]):
+        """Moves last_message_at forward (never back) for each chat, in one UPDATE ... FROM (VALUES ...)."""
+        if not activity:
+            return
+        rows = values(column("chat_id", Uuid), column("last_message_at", DateTime), name="activity").data(
+            sorted(activity.items())
+        )
+        stmt = (
+            update(Chat)
+            .where(Chat.chat_id == rows.c.chat_id, Chat.last_message_at < rows.c.last_message_at)
+            .values(last_message_at=rows.c.last_message_at)
+        )
+        await self.session.execute(stmt)
+
     async def delete_chat(self, chat_id: uuid.UUID):
         stmt = delete(Chat).where(Chat.chat_id == chat_id)
         await self.session.execute(stmt)
\ No newline at end of file
@@ -1,6 +1,9 @@
 import uuid
+import math
+import asyncio
+from typing import Awaitable, Callable, Optional
 from harmony.app.schemas import ChatMessage
-from harmony.app.db import to_dynamo_json, from_dynamo_json, paginate_in_batches, delete_batch
+from harmony.app.db import to_dynamo_json, QueryPurge, PurgeStats, DynamoWriteScheduler, ChatHistoryCodec
 from harmony.app.core.settings import DynamoDBConfig
 
 class ChatHistoryRepository:
@@ -8,14 +11,62 @@ class ChatHistoryRepository:
     Key:
         - Partition Key: chat_id (string)
         - Sort Key: ulid (string, ULID timestamp for ordering)
+
+    Items are written in DynamoDBConfig.chat_history_item_format and read in either format (see ChatHistoryCodec).
+
+    Sharding (optional, DynamoDBConfig.chat_history_partition_shards > 1):
+        A chat's messages are spread over "<chat_id>#<shard>" partitions, the shard being derived from the ULID's
+        random suffix, so a busy chat's writes and reads are not capped by one partition's throughput.
+        A history page queries every shard concurrently, each for a share of the page (SHARD_OVERREAD x limit / shards),
+        and merges them newest-first. A shard that returned a full share may hold newer items than what the others
+        returned, so the merge is only trusted down to the oldest ULID such shards returned (the frontier);
+        while fewer than `limit` items are above it, those shards are read again from where they stopped.
+        The cursor stays the last ULID.
+
+        Messages written before sharding was enabled stay in the unsharded "<chat_id>" partition. It is only read
+        when chat_history_unsharded_before (the ULID at which sharding was enabled) is set, and only by pages that
+        reach below it: every sharded message is newer, so those pages come after the shards are exhausted.
     '''
-    
-    def __init__(self, client, dynamodb_config: DynamoDBConfig):
+
+    _CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+    # Share of a page read from each shard, relative to an even split (ULID suffixes spread messages uniformly)
+    SHARD_OVERREAD = 1.5
+
+    @staticmethod
+    def _partition_key(chat_id: str, shard: int) -> str:
+        return f"{chat_id}#{shard}"
+
+    def __init__(self, client, dynamodb_config: DynamoDBConfig, write_scheduler: Optional[DynamoWriteScheduler] = None):
         self.client = client
+        self.cfg = dynamodb_config
+        self.write_scheduler = write_scheduler or DynamoWriteScheduler(client, dynamodb_config)
         self.table_name = dynamodb_config.chat_history_table_name
+        self.shards = dynamodb_config.chat_history_partition_shards
+        self.unsharded_before = (dynamodb_config.chat_history_unsharded_before or None) if self.shards > 1 else None
+        self.codec = ChatHistoryCodec(
+            item_format=dynamodb_config.chat_history_item_format,
+            compression=dynamodb_config.chat_history_compression,
+            compression_threshold_bytes=dynamodb_config.chat_history_compression_threshold_bytes,
+        )
+
+    def _shard_of(self, ulid: str) -> int:
+        # The last two characters are random (10 bits); the sink mapping computes the same value
+        return (self._CROCKFORD.index(ulid[-2]) * 32 + self._CROCKFORD.index(ulid[-1])) % self.shards
+
+    def _shard_partitions(self, chat_id: str) -> list[str]:
+        return [self._partition_key(chat_id, shard) for shard in range(self.shards)]
+
+    def _partitions(self, chat_id: str) -> list[str]:
+        if self.shards <= 1:
+            return [chat_id]
+        legacy = [chat_id] if self.unsharded_before else []
+        return legacy + self._shard_partitions(chat_id)
 
     async def create_message(self, item: ChatMessage):
-        dynamo_item = to_dynamo_json(item.model_dump(mode="json"))
+        dynamo_item = self.codec.encode(item)
+        if self.shards > 1:
+            dynamo_item["chat_id"] = {"S": self._partition_key(str(item.chat_id), self._shard_of(item.ulid))}
         
         await self.client.put_item(
             TableName=self.table_name,
@@ -25,39 +76,114 @@ class ChatHistoryRepository:
 
     async def get_chat_history(self, chat_id: uuid.UUID, limit: int = 50, cursor: str | None = None):
         chat_id = str(chat_id)
+        if self.shards <= 1:
+            items, has_more = await self._query_partition(chat_id, limit, cursor)
+        else:
+            items, has_more = await self._get_sharded_page(chat_id, limit, cursor)
+
+        messages = self.codec.decode_many(items, chat_id=chat_id)
+        next_cursor = messages[-1].ulid if messages and has_more else None
         
+        return messages, next_cursor
+
+    async def _get_sharded_page(self, chat_id: str, limit: int, cursor: str | None) -> tuple[list[dict], bool]:
+        items, open_shards = [], {}
+
+        # Sharded messages are all newer than unsharded_before, so older pages only live in the unsharded partition
+        if not (cursor and self.unsharded_before and cursor <= self.unsharded_before):
+            share = min(limit, math.ceil(limit * self.SHARD_OVERREAD / self.shards))
+            to_read = {pk: cursor for pk in self._shard_partitions(chat_id)}
+            while to_read:
+                pages = await asyncio.gather(*(self._query_partition(pk, share, bound) for pk, bound in to_read.items()))
+                for pk, (page_items, more) in zip(to_read, pages):
+                    items.extend(page_items)
+                    open_shards.pop(pk, None)
+                    if more and page_items:
+                        open_shards[pk] = page_items[-1]["ulid"]["S"]
+
+                # Items at or above the frontier are final; read on only while they don't fill the page
+                if not open_shards:
+                    break
+                frontier = max(open_shards.values())
+                if sum(1 for item in items if item["ulid"]["S"] >= frontier) >= limit:
+                    break
+                to_read = dict(open_shards)
+            items.sort(key=lambda item: item["ulid"]["S"], reverse=True)
+
+        if len(items) >= limit or open_shards:
+            return items[:limit], len(items) > limit or bool(open_shards) or self.unsharded_before is not None
+
+        # The shards are exhausted: fill the page from the unsharded partition
+        if self.unsharded_before:
+            legacy_items, more = await self._query_partition(chat_id, limit - len(items), cursor)
+            return items + legacy_items, more
+        return items, False
+
+    async def _query_partition(self, partition_key: str, limit: int, cursor: str | None) -> tuple[list[dict], bool]:
+        """Newest `limit` items of one partition older than the cursor, and whether the partition has more."""
         query_kwargs = {
             "TableName": self.table_name,
             "KeyConditionExpression": "chat_id = :cid",
-            "ExpressionAttributeValues": to_dynamo_json({":cid": chat_id}),
+            "ExpressionAttributeValues": to_dynamo_json({":cid": partition_key}),
             "Limit": limit,
             "ScanIndexForward": False # Fetches newest messages (highest ULID) first
         }
         
+        # The cursor ULID may live in another shard, so bound the sort key instead of using ExclusiveStartKey
         if cursor:
-            query_kwargs["ExclusiveStartKey"] = to_dynamo_json({"chat_id": chat_id, "ulid": cursor})
+            query_kwargs["KeyConditionExpression"] = "chat_id = :cid AND ulid < :cursor"
+            query_kwargs["ExpressionAttributeValues"] = to_dynamo_json({":cid": partition_key, ":cursor": cursor})
             
         response = await self.client.query(**query_kwargs)
-        
-        items = [from_dynamo_json(item) for item in response.get("Items", [])]
-        messages = [ChatMessage.model_validate(item) for item in items]
-        
-        last_evaluated_key = response.get("LastEvaluatedKey")
-        next_cursor = from_dynamo_json(last_evaluated_key).get("ulid") if last_evaluated_key else None
-        
-        return messages, next_cursor
+        return response.get("Items", []), "LastEvaluatedKey" in response
+
+    async def delete_chat_history(
+        self,
+        chat_id: uuid.UUID,
+        load_checkpoint: Optional[Callable[[], Awaitable[dict | None]]] = None,
+        save_checkpoint: Optional[Callable[[dict], Awaitable[None]]] = None,
+    ) -> PurgeStats:
+        """Purges every partition of the chat in order. A checkpoint resumes from the partition it was saved in."""
+        partitions = self._partitions(str(chat_id))
+        checkpoint = await load_checkpoint() if load_checkpoint else None
+
+        start = 0
+        if checkpoint:
+            checkpoint_partition = checkpoint["last_key"]["chat_id"]["S"]
+            start = partitions.index(checkpoint_partition) if checkpoint_partition in partitions else 0
 
-    async def delete_chat_history(self, chat_id: uuid.UUID):
-        async for batch in paginate_in_batches(
+        async def resume_checkpoint():
+            return checkpoint
+
+        stats = PurgeStats()
+        for i, partition_key in enumerate(partitions[start:]):
+            partition_stats = await self._purge_partition(
+                partition_key,
+                load_checkpoint=resume_checkpoint if i == 0 and checkpoint else None,
+                save_checkpoint=save_checkpoint,
+            )
+            stats.deleted += partition_stats.deleted
+            stats.batches += partition_stats.batches
+            stats.resumed_from += partition_stats.resumed_from
+        return stats
+
+    async def _purge_partition(self, partition_key: str, load_checkpoint, save_checkpoint) -> PurgeStats:
+        purge = QueryPurge(
             client=self.client,
+            scheduler=self.write_scheduler,
+            table_name=self.table_name,
             query_kwargs={
                 "TableName": self.table_name,
                 "KeyConditionExpression": "chat_id = :cid",
                 "ExpressionAttributeValues": to_dynamo_json({
-                    ":cid": str(chat_id)
+                    ":cid": partition_key
                 }),
                 "ProjectionExpression": "chat_id, ulid"
             },
-            batch_size=25,
-        ):
-            await delete_batch(self.client, TableName=self.table_name, Keys=batch)
\ No newline at end of file
+            concurrency=self.cfg.purge_concurrency,
+            write_capacity_per_second=self.cfg.purge_write_capacity_per_second,
+            checkpoint_interval_seconds=self.cfg.purge_checkpoint_interval_seconds,
+            load_checkpoint=load_checkpoint,
+            save_checkpoint=save_checkpoint,
+        )
+        return await purge.run()
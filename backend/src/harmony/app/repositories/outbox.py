@@ -0,0 +1,118 @@
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from sqlalchemy import text, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from harmony.app.models import OutboxEvent
+
+_PARTITION_NAME = re.compile(r"_p(\d{8})$")
+_SEALED_LSN = re.compile(r"^sealed_lsn=([0-9A-F]+/[0-9A-F]+)$")
+
+@dataclass
+class OutboxPartition:
+    name: str
+    day: date | None # None for the default partition
+    size_bytes: int
+    sealed_lsn: str | None # WAL position recorded once the partition expired
+
+    @property
+    def is_default(self) -> bool:
+        return self.day is None
+
+class OutboxRepository:
+    '''
+    Writes and partition management for outbox_events, which is range-partitioned by created_at into one partition per day
+    (outbox_events_pYYYYMMDD) plus a default partition catching rows outside every range.
+
+    An expired partition is first sealed: the current WAL position is stored as its comment. Every row in it was
+    committed before that position, so once the CDC replication slot has confirmed it, the partition is safe to drop.
+    '''
+
+    TABLE = OutboxEvent.__tablename__
+    DEFAULT_PARTITION = f"{TABLE}_default"
+
+    # Rows per multi-row INSERT (4 parameters each, well below the 32767 bind parameters of a statement)
+    INSERT_CHUNK_SIZE = 1000
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @classmethod
+    def _partition_name(cls, day: date) -> str:
+        return f"{cls.TABLE}_p{day:%Y%m%d}"
+
+    async def insert_events(self, events: list[dict]):
+        """Writes outbox events (aggregate_type, aggregate_id, event_type, payload) with one INSERT per chunk."""
+        for start in range(0, len(events), self.INSERT_CHUNK_SIZE):
+            await self.session.execute(insert(OutboxEvent).values(events[start:start + self.INSERT_CHUNK_SIZE]))
+
+    async def list_partitions(self) -> list[OutboxPartition]:
+        stmt = text("""
+            SELECT c.relname, obj_description(c.oid, 'pg_class') AS comment, pg_total_relation_size(c.oid) AS size
+            FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = CAST(:table AS regclass)
+            ORDER BY c.relname
+        """)
+        result = await self.session.execute(stmt, {"table": self.TABLE})
+
+        partitions = []
+        for name, comment, size in result.all():
+            day = _PARTITION_NAME.search(name)
+            sealed = _SEALED_LSN.match(comment or "")
+            partitions.append(OutboxPartition(
+                name=name,
+                day=datetime.strptime(day.group(1), "%Y%m%d").date() if day else None,
+                size_bytes=size,
+                sealed_lsn=sealed.group(1) if sealed else None,
+            ))
+        return partitions
+
+    async def create_default_partition(self):
+        await self.session.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{self.DEFAULT_PARTITION}" PARTITION OF "{self.TABLE}" DEFAULT'
+        ))
+
+    async def create_partition(self, day: date):
+        """Fails if the default partition holds rows of that day (see count_default_rows)."""
+        await self.session.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{self._partition_name(day)}" PARTITION OF "{self.TABLE}" '
+            f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+        ))
+
+    async def seal_partition(self, name: str) -> str:
+        """Records the current WAL position on the partition and returns it."""
+        lsn = (await self.session.execute(text("SELECT pg_current_wal_lsn()::text"))).scalar_one()
+        await self.session.execute(text(f"COMMENT ON TABLE \"{name}\" IS 'sealed_lsn={lsn}'"))
+        return lsn
+
+    async def slot_confirmed(self, slot: str, lsn: str) -> bool | None:
+        """Whether the replication slot has confirmed the WAL position. None if the slot does not exist."""
+        stmt = text("SELECT confirmed_flush_lsn >= CAST(:lsn AS pg_lsn) FROM pg_replication_slots WHERE slot_name = :slot")
+        result = await self.session.execute(stmt, {"slot": slot, "lsn": lsn})
+        return result.scalar_one_or_none()
+
+    async def drop_partition(self, name: str):
+        await self.session.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+
+    async def count_default_rows(self, day: date | None = None) -> int:
+        """Rows in the default partition, only those whose created_at falls on `day` if given."""
+        if day is None:
+            return (await self.session.execute(text(f'SELECT count(*) FROM "{self.DEFAULT_PARTITION}"'))).scalar_one()
+        stmt = text(f'SELECT count(*) FROM "{self.DEFAULT_PARTITION}" WHERE created_at >= :start AND created_at < :end')
+        return (await self.session.execute(stmt, {"start": day, "end": day + timedelta(days=1)})).scalar_one()
+
+    async def ensure_publication(self, publication: str):
+        """
+        Publishes changes of every partition as outbox_events, which is the only table the CDC pipeline streams.
+        Must run before the pipeline creates the publication itself (without publish_via_partition_root).
+        """
+        exists = (await self.session.execute(
+            text("SELECT 1 FROM pg_publication WHERE pubname = :name"), {"name": publication}
+        )).first()
+        if exists:
+            await self.session.execute(text(f'ALTER PUBLICATION "{publication}" SET (publish_via_partition_root = true)'))
+        else:
+            await self.session.execute(text(
+                f'CREATE PUBLICATION "{publication}" FOR TABLE "{self.TABLE}" WITH (publish_via_partition_root = true)'
+            ))
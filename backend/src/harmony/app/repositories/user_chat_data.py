@@ -1,6 +1,7 @@
 import uuid
+from datetime import datetime
 from typing import List
-from sqlalchemy import select, delete, exists, insert
+from sqlalchemy import select, delete, exists, insert, update, tuple_, values, column, Uuid, DateTime
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from harmony.app.models import UserChat, Chat
@@ -36,14 +37,49 @@ class UserChatRepository:
         result = await self.session.execute(stmt)
         return result.first() is not None
 
-    async def get_user_chats(self, user_id: uuid.UUID) -> List[uuid.UUID]:
+    async def get_member_chat_ids(self, user_id: uuid.UUID, chat_ids: List[uuid.UUID]) -> set[uuid.UUID]:
+        """Returns the subset of chat_ids the user is a member of."""
+        if not chat_ids:
+            return set()
+        stmt = select(UserChat.chat_id).where(
+            UserChat.user_id == user_id,
+            UserChat.chat_id.in_(chat_ids)
+        )
+        result = await self.session.execute(stmt)
+        return set(result.scalars().all())
+
+    async def get_user_chats(self, user_id: uuid.UUID, limit: int | None, before: tuple[datetime, uuid.UUID] | None = None):
+        """
+        One page of the user's chats, most recently active first (served by ix_user_chats_user_activity).
+        `before` is the (last_message_at, chat_id) of the last row of the previous page.
+        A limit of None returns every remaining chat.
+        """
         stmt = (
-            select(Chat.chat_id, Chat.meta)
+            select(Chat.chat_id, Chat.meta, UserChat.last_message_at)
             .join(UserChat, UserChat.chat_id == Chat.chat_id)
             .where(UserChat.user_id == user_id)
+            .order_by(UserChat.last_message_at.desc(), UserChat.chat_id.desc())
+            .limit(limit)
         )
+        if before is not None:
+            stmt = stmt.where(tuple_(UserChat.last_message_at, UserChat.chat_id) < before)
+
         result = await self.session.execute(stmt)
         return result.all()
+
+    async def touch_chats(self, activity: dict[uuid.UUID, datetime]):
+        """Moves the members' copies of last_message_at forward (never back) for each chat."""
+        if not activity:
+            return
+        rows = values(column("chat_id", Uuid), column("last_message_at", DateTime), name="activity").data(
+            sorted(activity.items())
+        )
+        stmt = (
+            update(UserChat)
+            .where(UserChat.chat_id == rows.c.chat_id, UserChat.last_message_at < rows.c.last_message_at)
+            .values(last_message_at=rows.c.last_message_at)
+        )
+        await self.session.execute(stmt)
     
     async def get_chat_users(self, chat_id: uuid.UUID) -> List[uuid.UUID]:
         stmt = select(UserChat.user_id).where(UserChat.chat_id == chat_id)
@@ -1,11 +1,16 @@
 import uuid
 from typing import Any, Optional
-from sqlalchemy import select, update
+from sqlalchemy import select, update, func, not_, union, literal_column, Float, Text, Select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from harmony.app.models import User
 from harmony.app.schemas import UserMetaData
 
+def _username(meta):
+    # The key is rendered as a literal (meta ->> 'username'), like in ix_users_username_trgm:
+    # `meta["username"].astext` binds it as a parameter, which the planner cannot match against the index
+    return meta.op("->>", return_type=Text)(literal_column("'username'"))
+
 class UserDataRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -41,7 +46,40 @@ class UserDataRepository:
         )
         await self.session.execute(stmt)
 
-    async def search_users_by_email(self, email_query: str, limit: int = 10) -> list[User]:
-        stmt = select(User).where(User.email.ilike(f"%{email_query}%")).limit(limit)
-        result = await self.session.execute(stmt)
-        return list(result.scalars().all())
\ No newline at end of file
+    async def search_users(self, query: str, limit: int = 10, candidate_limit: int = 500) -> list[User]:
+        """
+        Active users whose email or username contains `query` (case-insensitive), most similar first.
+
+        Matching and ordering are served by the GiST trigram indexes (ix_users_*_trgm): each column contributes
+        its `candidate_limit` most similar matches (ORDER BY column <-> query), which bounds the cost of very
+        common terms (e.g. "gmail") while always keeping the best matches of either column.
+        """
+        result = await self.session.execute(self.search_users_statement(query, limit, candidate_limit))
+        return list(result.scalars().all())
+
+    @staticmethod
+    def search_users_statement(query: str, limit: int = 10, candidate_limit: int = 500) -> Select:
+        """The query of search_users (also EXPLAINed by tests/tools/bench_user_search.py)."""
+        pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+        # 1. The most similar matches of each column, in index order (trigram distance <-> is 1 - similarity)
+        def nearest(column):
+            return (
+                select(User.user_id)
+                .where(not_(User.tombstone), column.ilike(pattern, escape="\\"))
+                .order_by(column.op("<->", return_type=Float)(query))
+                .limit(candidate_limit)
+            )
+        candidates = union(nearest(User.email), nearest(_username(User.meta))).subquery()
+
+        # 2. Rank them by their best trigram similarity
+        score = func.greatest(
+            func.similarity(User.email, query),
+            func.similarity(_username(User.meta), query)
+        )
+        return (
+            select(User)
+            .where(User.user_id.in_(select(candidates.c.user_id)))
+            .order_by(score.desc(), User.email)
+            .limit(limit)
+        )
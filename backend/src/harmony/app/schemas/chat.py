@@ -8,7 +8,10 @@ from .metadata import ChatMetaData
 class ChatCreateRequest(BaseModel):
     title: str | None = Field(None, min_length=1, max_length=100)
     description: str | None = Field(None, max_length=500)
-    user_id_list: list[uuid.UUID] = Field(..., max_length=10)
+    user_id_list: list[uuid.UUID] # Bounded by CHAT__MAX_USERS_PER_OPERATION in ChatCommands
+
+class ChatHistoryBatchRequest(BaseModel):
+    chat_ids: list[uuid.UUID] = Field(..., min_length=1)
 
 class MessageSendRequest(BaseModel):
     content: str = Field(..., min_length=1)
@@ -27,4 +30,7 @@ class ChatResponse(ChatSchema):
 
 class ChatHistoryResponse(BaseModel):
     messages: list[ChatMessageResponse]
-    next_cursor: str | None = None
\ No newline at end of file
+    next_cursor: str | None = None
+
+class ChatHistoryBatchResponse(BaseModel):
+    histories: dict[uuid.UUID, ChatHistoryResponse]
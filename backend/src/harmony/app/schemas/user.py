@@ -1,4 +1,5 @@
 import uuid
+from datetime import datetime
 from pydantic import BaseModel, EmailStr, ConfigDict
 from .metadata import ChatMetaData, UserMetaData
 
@@ -23,6 +24,8 @@ class UserResponse(UserSchema):
 class UserChatItem(BaseModel):
     chat_id: uuid.UUID
     meta: ChatMetaData  # A different approach may only fetch minimal metadata (e.g. title) and fetch the rest when the user clicks into the chat.
+    last_message_at: datetime
 
 class UserChatsResponse(BaseModel):
-    chats: list[UserChatItem]
\ No newline at end of file
+    chats: list[UserChatItem]
+    next_cursor: str | None = None
\ No newline at end of file
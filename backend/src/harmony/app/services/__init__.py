@@ -3,4 +3,9 @@ from .pubsub import PubSubService
 from .chat import ChatCommands, ChatQueries, ChatEventHandler
 from .user import UserCommands, UserQueries, UserEventHandler
 from .message import MessageCommands, MessageQueries, MessageEventHandler
-from .cache import CacheService
\ No newline at end of file
+from .cache import CacheService
+from .singleflight import SingleFlight
+from .publisher import KafkaBatchPublisher
+from .activity import ChatActivityTracker
+from .outbox import OutboxMaintenance, OutboxMaintenanceStats
+from .tasks import BackgroundTaskQueue
\ No newline at end of file
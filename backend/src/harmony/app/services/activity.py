@@ -0,0 +1,96 @@
+import asyncio
+import uuid
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+import structlog
+
+from harmony.app.repositories import ChatDataRepository, UserChatRepository
+
+logger = structlog.get_logger(__name__)
+
+class ChatActivityTracker:
+    '''
+    Maintains chats.last_message_at (and the per-member copy in user_chats) from the message pipeline.
+
+    Sending a message only records the chat's newest message time in memory. Every flush_interval_ms
+    the pending times are written in one transaction (one UPDATE ... FROM (VALUES ...) per table), so a busy
+    chat costs one update per interval instead of one per message. Updates only ever move the time forward,
+    which keeps concurrent API workers from reordering each other's writes.
+
+    A failed flush is retried with the next one; pending times are lost only if the process dies.
+    '''
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], flush_interval_ms: int = 1000):
+        self.session_factory = session_factory
+        self.flush_interval_ms = flush_interval_ms
+        self._pending: dict[uuid.UUID, datetime] = {}
+        self._task: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+
+        # Counters
+        self.touches = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.chats_flushed = 0
+        self.max_flush_chats = 0
+
+    def touch(self, chat_id: uuid.UUID, at: datetime):
+        """Records a message sent at `at` (naive UTC) in the chat."""
+        self.touches += 1
+        current = self._pending.get(chat_id)
+        if current is None or at > current:
+            self._pending[chat_id] = at
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stops the flush loop and writes whatever is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval_ms / 1000)
+            await self.flush()
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            activity, self._pending = self._pending, {}
+
+            try:
+                async with self.session_factory() as session:
+                    await ChatDataRepository(session).touch_chats(activity)
+                    await UserChatRepository(session).touch_chats(activity)
+                    await session.commit()
+            except Exception as e:
+                self.failed_flushes += 1
+                logger.warning("chat_activity_flush_failed", chat_count=len(activity), error=str(e))
+                # Merge back for the next flush, keeping the newest time per chat
+                for chat_id, at in activity.items():
+                    current = self._pending.get(chat_id)
+                    if current is None or at > current:
+                        self._pending[chat_id] = at
+                return
+
+            self.flushes += 1
+            self.chats_flushed += len(activity)
+            self.max_flush_chats = max(self.max_flush_chats, len(activity))
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "touches": self.touches,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "avg_flush_chats": self.chats_flushed / self.flushes if self.flushes else 0.0,
+            "max_flush_chats": self.max_flush_chats,
+        }
@@ -5,7 +5,9 @@ from harmony.app.core.exceptions import ConflictError, AuthenticationError, NotF
 from harmony.app.core import (
     get_password_hash, 
     verify_password, 
+    PasswordHasher,
     create_access_token, 
+    get_signing_key,
     generate_refresh_token, 
     hash_refresh_token
 )
@@ -24,7 +26,7 @@ class AuthService(Command):
     
     SignUp:
         1. Validates that the email/username is not already taken.
-        2. Hashes the plain-text password using Argon2.
+        2. Hashes the plain-text password using Argon2 (on the bounded PasswordHasher pool).
         3. Delegates user creation to the UserService.
         
     Login (Authenticate):
@@ -50,13 +52,25 @@ class AuthService(Command):
             user_commands: UserCommands,
             user_queries: UserQueries,
             auth_repository: AuthRepository,
-            auth_config: AuthConfig = AuthConfig()
+            auth_config: AuthConfig = AuthConfig(),
+            password_hasher: PasswordHasher | None = None,
     ):
         super().__init__(session, logger)
         self.user_commands = user_commands
         self.user_queries = user_queries
         self.auth_repository = auth_repository
         self.cfg = auth_config
+        self.password_hasher = password_hasher
+
+    async def _hash_password(self, password: str) -> str:
+        if self.password_hasher is None:
+            return get_password_hash(password)
+        return await self.password_hasher.hash(password)
+
+    async def _verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        if self.password_hasher is None:
+            return verify_password(plain_password, hashed_password)
+        return await self.password_hasher.verify(plain_password, hashed_password)
 
     async def sign_up(self, user_create: UserCreateRequest) -> str:
         try:
@@ -68,7 +82,7 @@ class AuthService(Command):
         if existing_user:
             raise ConflictError("A user with this email already exists.")
 
-        hashed_pw = get_password_hash(user_create.password)
+        hashed_pw = await self._hash_password(user_create.password)
 
         user = await self.user_commands.create_user(
             req=user_create,
@@ -84,7 +98,7 @@ class AuthService(Command):
             raise AuthenticationError("Invalid email or password.")
         if not user or user.tombstone:
             raise AuthenticationError("Invalid email or password.")
-        if not verify_password(password, user.hashed_password):
+        if not await self._verify_password(password, user.hashed_password):
             raise AuthenticationError("Invalid email or password.")
 
         # Create tokens
@@ -106,7 +120,7 @@ class AuthService(Command):
         access_token_str = create_access_token(
             data={"sub": str(user_id)}, 
             expires_delta=access_token_expires,
-            secret_key=self.cfg.secret_key.get_secret_value(),
+            secret_key=get_signing_key(self.cfg),
             algorithm=self.cfg.algorithm
         )
         access_token = Token(
@@ -1,26 +1,78 @@
 import json
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 import structlog
-from harmony.app.core import CacheConfig
+from harmony.app.core import CacheConfig, LocalCache
 from redis.asyncio import Redis
 from redis.exceptions import RedisError
 
 logger = structlog.get_logger(__name__)
 
+# Only adds members to a set that is already cached, so a partial set is never created
+ADD_TO_EXISTING_SET_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('SADD', KEYS[1], unpack(ARGV))
+end
+return 0
+"""
+
+class DeferredDeletes:
+    """Keys collected by CacheService.deferred_deletes(); once the block exits, `flushed` tells whether their DEL succeeded."""
+    __slots__ = ("keys", "flushed")
+
+    def __init__(self):
+        self.keys: set[str] = set()
+        self.flushed = False
+
+# The deletes deferred by CacheService.deferred_deletes() in the current context
+_deferred_deletes: ContextVar[DeferredDeletes | None] = ContextVar("deferred_deletes", default=None)
+
 class CacheService:
     '''
     A simple wrapper around Redis to handle caching of JSON-serializable data with TTL support.
     The service provides "best effort" caching on reads. 
     It returns success/failure booleans for writes and deletes, allowing callers to handle failures.
+
+    When a LocalCache is provided it acts as an L1 layer in front of Redis: reads are served from 
+    process memory when possible, and deletes are published on the invalidation channel so every 
+    worker drops its stale copy.
     '''
+
+    # Stored in place of a value to remember that the underlying record does not exist
+    MISSING = {"__missing__": True}
+
+    # Cached sets always contain this member, so an empty set can be cached and a missing key means "not cached"
+    SET_SENTINEL = "__cached__"
     
-    def __init__(self, redis_client: Redis, cache_config: CacheConfig = CacheConfig()):
+    def __init__(self, redis_client: Redis, cache_config: CacheConfig = CacheConfig(), local_cache: LocalCache | None = None):
         self.redis = redis_client
         self.cfg = cache_config
+        self.local = local_cache
+        self._add_to_existing_set = self.redis.register_script(ADD_TO_EXISTING_SET_SCRIPT)
+
+    @classmethod
+    def is_missing(cls, value) -> bool:
+        return value == cls.MISSING
+
+    @staticmethod
+    def _invalidation_message(keys: list[str] | None = None, pattern: str | None = None) -> str:
+        return json.dumps({"keys": keys or [], "pattern": pattern})
+
+    def _local_ttl(self, ttl: int | None = None) -> int:
+        return min(ttl or self.cfg.default_ttl_seconds, self.cfg.local_ttl_seconds)
         
     async def get_json(self, key: str) -> dict | None:
+        if self.local is not None:
+            value = self.local.get(key)
+            if value is not None:
+                return value
+
         try:
             data = await self.redis.get(key)
-            return json.loads(data) if data else None
+            value = json.loads(data) if data else None
+            if self.local is not None:
+                self.local.set(key, value, ttl=self._local_ttl())
+            return value
         except RedisError as e:
             logger.warning("cache_network_error_on_get", key=key, error=str(e))
             return None
@@ -31,6 +83,8 @@ class CacheService:
     async def set_json(self, key: str, value: dict, ttl: int | None = None) -> bool:
         try:
             await self.redis.set(key, json.dumps(value), ex=ttl or self.cfg.default_ttl_seconds)
+            if self.local is not None:
+                self.local.set(key, value, ttl=self._local_ttl(ttl))
             return True
         except RedisError as e:
             logger.warning("cache_network_error_on_set", key=key, error=str(e))
@@ -39,19 +93,79 @@ class CacheService:
             logger.exception("unexpected_error_on_cache_set", key=key)
             return False
         
+    async def publish_invalidation(self, keys: list[str] | None = None, pattern: str | None = None) -> bool:
+        """
+        Tells every worker holding an L1 cache to drop the given keys (or keys matching a pattern).
+        """
+        if not self.cfg.invalidation_channel:
+            return True
+        try:
+            await self.redis.publish(self.cfg.invalidation_channel, self._invalidation_message(keys, pattern))
+            return True
+        except RedisError as e:
+            logger.warning("cache_network_error_on_publish_invalidation", keys=keys, pattern=pattern, error=str(e))
+            return False
+
     async def delete(self, key: str) -> bool:
+        return await self.delete_many([key])
+
+    async def delete_many(self, keys: list[str]) -> bool:
+        """
+        Deletes keys with a single DEL and publishes one invalidation for all of them.
+        Inside deferred_deletes(), the Redis DEL is postponed until the block exits.
+        """
+        if not keys:
+            return True
+        if self.local is not None:
+            for key in keys:
+                self.local.delete(key)
+
+        deferred = _deferred_deletes.get()
+        if deferred is not None:
+            deferred.keys.update(keys)
+            return True
+
         try:
-            await self.redis.delete(key)
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.delete(*keys)
+                if self.cfg.invalidation_channel:
+                    pipe.publish(self.cfg.invalidation_channel, self._invalidation_message(keys=keys))
+                await pipe.execute()
             return True
         except RedisError as e:
-            logger.warning("cache_network_error_on_delete", key=key, error=str(e))
+            logger.warning("cache_network_error_on_delete", keys=keys, error=str(e))
             return False
+
+    @asynccontextmanager
+    async def deferred_deletes(self):
+        """
+        Collects every delete issued in this context (including tasks spawned from it)
+        and flushes them as one pipelined DEL when the block exits, even on error.
+
+        Yields a DeferredDeletes whose `flushed` is False after the block if the DEL failed:
+        callers that must not lose invalidations (e.g. before committing offsets) check it.
+        """
+        outer = _deferred_deletes.get()
+        if outer is not None:
+            # Already collecting: the outer block flushes
+            yield outer
+            return
+
+        deferred = DeferredDeletes()
+        token = _deferred_deletes.set(deferred)
+        try:
+            yield deferred
+        finally:
+            _deferred_deletes.reset(token)
+            deferred.flushed = await self.delete_many(sorted(deferred.keys)) if deferred.keys else True
         
     async def delete_pattern(self, pattern: str, batch_size: int = 100) -> bool:
         """
         Safely deletes keys matching a pattern using SCAN to avoid blocking Redis.
         Deletes in chunks to prevent massive memory usage and command payload limits.
         """
+        if self.local is not None:
+            self.local.delete_pattern(pattern)
         try:
             keys_to_delete = []
             
@@ -68,7 +182,7 @@ class CacheService:
             if keys_to_delete:
                 await self.redis.delete(*keys_to_delete)
                 
-            return True
+            return await self.publish_invalidation(pattern=pattern)
         except RedisError as e:
             logger.warning("cache_network_error_on_delete_pattern", pattern=pattern, error=str(e))
             return False
@@ -80,21 +194,36 @@ class CacheService:
         """
         if not keys:
             return []
+
+        results: list[dict | None] = [None] * len(keys)
+        missing = list(range(len(keys)))
+
+        # 1. Serve what we can from the L1 cache
+        if self.local is not None:
+            missing = []
+            for i, key in enumerate(keys):
+                results[i] = self.local.get(key)
+                if results[i] is None:
+                    missing.append(i)
+            if not missing:
+                return results
             
+        # 2. Fetch the rest from Redis
         try:
-            raw_data = await self.redis.mget(keys)
+            raw_data = await self.redis.mget([keys[i] for i in missing])
             
-            results = []
-            for data in raw_data:
+            for i, data in zip(missing, raw_data):
                 try:
-                    results.append(json.loads(data) if data else None)
+                    results[i] = json.loads(data) if data else None
                 except json.JSONDecodeError:
-                    results.append(None)
+                    results[i] = None
+                if self.local is not None:
+                    self.local.set(keys[i], results[i], ttl=self._local_ttl())
             return results
             
         except RedisError as e:
             logger.warning("cache_network_error_on_mget", keys_count=len(keys), error=str(e))
-            return [None] * len(keys)
+            return results
         
     async def set_many_json(self, mapping: dict[str, dict], ttl: int | None = None) -> bool:
         """
@@ -108,8 +237,193 @@ class CacheService:
                 for key, value in mapping.items():
                     pipe.set(key, json.dumps(value), ex=ttl or self.cfg.default_ttl_seconds)
                 await pipe.execute()
+
+            if self.local is not None:
+                for key, value in mapping.items():
+                    self.local.set(key, value, ttl=self._local_ttl(ttl))
             return True
             
         except RedisError as e:
             logger.warning("cache_network_error_on_pipeline_set", keys_count=len(mapping), error=str(e))
-            return False
\ No newline at end of file
+            return False
+
+    # ------------------------------- Set Helpers ------------------------------ #
+    async def set_members(self, key: str, members: list[str], ttl: int | None = None) -> bool:
+        """
+        Atomically replaces the set stored at key with the given members.
+        """
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.sadd(key, self.SET_SENTINEL, *members)
+                pipe.expire(key, ttl or self.cfg.default_ttl_seconds)
+                await pipe.execute()
+
+            if self.local is not None:
+                self.local.set(key, frozenset(members), ttl=self._local_ttl(ttl))
+            return True
+        except RedisError as e:
+            logger.warning("cache_network_error_on_set_members", key=key, error=str(e))
+            return False
+
+    async def is_member(self, key: str, member: str) -> bool | None:
+        """
+        Checks set membership with SISMEMBER.
+        Returns None if the set is not cached (or Redis is unavailable).
+        """
+        if self.local is not None:
+            members = self.local.get(key)
+            if members is not None:
+                return member in members
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.exists(key)
+                pipe.sismember(key, member)
+                exists, is_member = await pipe.execute()
+            return bool(is_member) if exists else None
+        except RedisError as e:
+            logger.warning("cache_network_error_on_is_member", key=key, error=str(e))
+            return None
+
+    async def are_members(self, checks: list[tuple[str, str]]) -> list[bool | None]:
+        """
+        Pipelined is_member for several (key, member) pairs in one round-trip.
+        Returns a list in the same order, with None where the set is not cached.
+        """
+        results: list[bool | None] = [None] * len(checks)
+        missing = list(range(len(checks)))
+        if self.local is not None:
+            missing = []
+            for i, (key, member) in enumerate(checks):
+                members = self.local.get(key)
+                if members is not None:
+                    results[i] = member in members
+                else:
+                    missing.append(i)
+        if not missing:
+            return results
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for i in missing:
+                    key, member = checks[i]
+                    pipe.exists(key)
+                    pipe.sismember(key, member)
+                replies = await pipe.execute()
+        except RedisError as e:
+            logger.warning("cache_network_error_on_are_members", checks_count=len(checks), error=str(e))
+            return results
+
+        for n, i in enumerate(missing):
+            exists, is_member = replies[2 * n], replies[2 * n + 1]
+            results[i] = bool(is_member) if exists else None
+        return results
+
+    async def get_members(self, key: str) -> frozenset[str] | None:
+        """
+        Returns every member of the set, or None if the set is not cached.
+        """
+        if self.local is not None:
+            members = self.local.get(key)
+            if members is not None:
+                return members
+
+        try:
+            raw_members = await self.redis.smembers(key)
+        except RedisError as e:
+            logger.warning("cache_network_error_on_get_members", key=key, error=str(e))
+            return None
+
+        if not raw_members:
+            return None
+        members = frozenset(m for m in raw_members if m != self.SET_SENTINEL)
+        if self.local is not None:
+            self.local.set(key, members, ttl=self._local_ttl())
+        return members
+
+    async def add_members(self, key: str, members: list[str]) -> bool:
+        """
+        Adds members to the set if (and only if) it is already cached.
+        """
+        if not members:
+            return True
+        if self.local is not None:
+            self.local.delete(key)
+        try:
+            await self._add_to_existing_set(keys=[key], args=members)
+            return await self.publish_invalidation(keys=[key])
+        except RedisError as e:
+            logger.warning("cache_network_error_on_add_members", key=key, error=str(e))
+            return False
+
+    async def remove_members(self, key: str, members: list[str]) -> bool:
+        if not members:
+            return True
+        if self.local is not None:
+            self.local.delete(key)
+        try:
+            await self.redis.srem(key, *members)
+            return await self.publish_invalidation(keys=[key])
+        except RedisError as e:
+            logger.warning("cache_network_error_on_remove_members", key=key, error=str(e))
+            return False
+
+
+    # --------------------------- Sorted Window Helpers ------------------------ #
+    # A window is a capped sorted set plus a "meta" key; the window is only trusted while the meta key exists.
+
+    async def add_to_window(self, key: str, meta_key: str, member: str, score: float, max_size: int, ttl: int | None = None) -> bool:
+        """
+        Adds a member to a capped sorted set, trimming the lowest scores beyond max_size.
+        """
+        ttl = ttl or self.cfg.default_ttl_seconds
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.zadd(key, {member: score})
+                pipe.zremrangebyrank(key, 0, -(max_size + 1))
+                pipe.expire(key, ttl)
+                pipe.expire(meta_key, ttl)
+                await pipe.execute()
+            return True
+        except RedisError as e:
+            logger.warning("cache_network_error_on_add_to_window", key=key, error=str(e))
+            return False
+
+    async def seed_window(self, key: str, meta_key: str, members: dict[str, float], meta: str, max_size: int, ttl: int | None = None) -> bool:
+        """
+        Merges members into the sorted set and marks the window as trusted.
+        Members added concurrently through add_to_window are preserved.
+        """
+        ttl = ttl or self.cfg.default_ttl_seconds
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                if members:
+                    pipe.zadd(key, members)
+                    pipe.zremrangebyrank(key, 0, -(max_size + 1))
+                    pipe.expire(key, ttl)
+                pipe.set(meta_key, meta, ex=ttl)
+                await pipe.execute()
+            return True
+        except RedisError as e:
+            logger.warning("cache_network_error_on_seed_window", key=key, error=str(e))
+            return False
+
+    async def get_window(self, key: str, meta_key: str, count: int) -> tuple[list[str], int, str] | None:
+        """
+        Returns (highest-scored members first, total size, meta) in one round trip,
+        or None if the window is not trusted.
+        """
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.get(meta_key)
+                pipe.zrevrange(key, 0, count - 1)
+                pipe.zcard(key)
+                meta, members, size = await pipe.execute()
+        except RedisError as e:
+            logger.warning("cache_network_error_on_get_window", key=key, error=str(e))
+            return None
+
+        if meta is None:
+            return None
+        return members, size, meta
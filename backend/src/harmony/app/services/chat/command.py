@@ -1,6 +1,5 @@
 import uuid
 from harmony.app.core.exceptions import AuthorizationError, LimitExceededError, ValidationError
-from harmony.app.models.outbox import OutboxEvent
 from sqlalchemy.ext.asyncio import AsyncSession
 import structlog
 
@@ -50,6 +49,14 @@ class ChatCommands(Command):
             chat = await self.chat_data_repo.create_chat(metadata=metadata) 
             await self.session.flush() # Ensure chat.chat_id is populated
             await self.user_chat_repo.add_users_to_chat(chat_id=chat.chat_id, user_id_list=user_id_list)
+
+            # Lets the CDC consumer invalidate the members' cached chat lists
+            self.emit(
+                aggregate_type=self.cfg.topic,
+                aggregate_id=str(chat.chat_id),
+                event_type="USERS_ADDED",
+                payload={"added_by": str(creator_id), "user_id_list": [str(uid) for uid in user_id_list]}
+            )
             
         logger.info("chat_created", chat_id=chat.chat_id, creator_id=creator_id)
         return chat
@@ -70,19 +77,21 @@ class ChatCommands(Command):
             await self._require_membership(user_id=user_id, chat_id=chat_id)
             await self.user_chat_repo.add_users_to_chat(chat_id=chat_id, user_id_list=user_id_list)
 
-            self.session.add(OutboxEvent(
+            self.emit(
                 aggregate_type=self.cfg.topic,
                 aggregate_id=str(chat_id),
                 event_type="USERS_ADDED",
                 payload={"added_by": str(user_id), "user_id_list": [str(uid) for uid in user_id_list]}
-            ))
-            for new_user_id in user_id_list:
-                self.session.add(OutboxEvent(
-                    aggregate_type=self.user_cfg.topic,
-                    aggregate_id=str(new_user_id),
-                    event_type="ADDED_TO_CHAT",
-                    payload={"added_by": str(user_id), "chat_id": str(chat_id)}
-                ))
+            )
+            # Per-user events repeat USERS_ADDED for consumers of the user topic, at one row per added user
+            if self.cfg.per_user_membership_events:
+                for new_user_id in user_id_list:
+                    self.emit(
+                        aggregate_type=self.user_cfg.topic,
+                        aggregate_id=str(new_user_id),
+                        event_type="ADDED_TO_CHAT",
+                        payload={"added_by": str(user_id), "chat_id": str(chat_id)}
+                    )
         logger.info("users_added_to_chat", chat_id=chat_id, added_user_count=len(user_id_list))
 
     async def leave_chat(self, user_id: uuid.UUID, chat_id: uuid.UUID):
@@ -90,30 +99,33 @@ class ChatCommands(Command):
         async with self.transaction_handler("leave_chat", chat_id=chat_id, user_id=user_id):
             await self.user_chat_repo.remove_user_from_chat(chat_id=chat_id, user_id=user_id)
 
-            self.session.add(OutboxEvent(
+            self.emit(
                 aggregate_type=self.cfg.topic,
                 aggregate_id=str(chat_id),
                 event_type="USER_LEFT",
                 payload={"user_id": str(user_id)}
-            ))
-            self.session.add(OutboxEvent(
-                aggregate_type=self.user_cfg.topic,
-                aggregate_id=str(user_id),
-                event_type="LEFT_CHAT",
-                payload={"chat_id": str(chat_id)}
-            ))
+            )
+            if self.cfg.per_user_membership_events:
+                self.emit(
+                    aggregate_type=self.user_cfg.topic,
+                    aggregate_id=str(user_id),
+                    event_type="LEFT_CHAT",
+                    payload={"chat_id": str(chat_id)}
+                )
         logger.info("chat_left", chat_id=chat_id, user_id=user_id)
 
     async def delete_chat(self, user_id: uuid.UUID, chat_id: uuid.UUID):
         # 1. Authorize and Delete
         async with self.transaction_handler("delete_chat", chat_id=chat_id, user_id=user_id):
             await self._require_membership(user_id=user_id, chat_id=chat_id)
+            # Members are gone once the chat is deleted; the CDC consumer needs them to invalidate their chat lists
+            member_ids = await self.user_chat_repo.get_chat_users(chat_id)
             await self.chat_data_repo.delete_chat(chat_id)
 
-            self.session.add(OutboxEvent(
+            self.emit(
                 aggregate_type=self.cfg.topic,
                 aggregate_id=str(chat_id),
                 event_type="CHAT_DELETED",
-                payload={"deleted_by": str(user_id)}
-            ))
+                payload={"deleted_by": str(user_id), "user_id_list": [str(uid) for uid in member_ids]}
+            )
         logger.info("chat_deleted", chat_id=chat_id, deleted_by_user_id=user_id)
\ No newline at end of file
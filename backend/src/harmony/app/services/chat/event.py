@@ -12,9 +12,21 @@ class ChatEventHandler:
     def _membership_key(chat_id: uuid.UUID, user_id: uuid.UUID) -> str:
         return f"chat:{chat_id}:members:{user_id}"
 
+    @staticmethod
+    def _members_key(chat_id: uuid.UUID) -> str:
+        return f"chat:{chat_id}:members"
+
     @staticmethod
     def _metadata_key(chat_id: uuid.UUID) -> str:
         return f"chat:{chat_id}:metadata"
+
+    @staticmethod
+    def _user_chats_key(user_id: uuid.UUID) -> str:
+        return f"user:{user_id}:chats"
+
+    @staticmethod
+    def _recent_keys(chat_id: uuid.UUID) -> list[str]:
+        return [f"chat:{chat_id}:recent", f"chat:{chat_id}:recent:meta"]
     
     def __init__(
         self,
@@ -23,21 +35,35 @@ class ChatEventHandler:
         self.cache_service = cache_service
 
     async def on_users_added_to_chat(self, chat_id: uuid.UUID, user_id_list: list[uuid.UUID]):
-        # Clear the "not a member" cache for the newly added users
         if self.cache_service:
-            for new_user_id in user_id_list:
-                await self.cache_service.delete(self._membership_key(chat_id, new_user_id))
+            # Clear the "not a member" cache and the cached chat lists of the newly added users
+            await self.cache_service.delete_many([
+                *(self._membership_key(chat_id, uid) for uid in user_id_list),
+                *(self._user_chats_key(uid) for uid in user_id_list),
+            ])
+            # Incrementally update the chat's member set (only if it is cached)
+            await self.cache_service.add_members(self._members_key(chat_id), [str(uid) for uid in user_id_list])
             logger.debug("membership_cache_cleared_for_added_users", chat_id=chat_id, user_ids=[str(uid) for uid in user_id_list])
 
     async def on_user_left_chat(self, chat_id: uuid.UUID, user_id: uuid.UUID):
         # Invalidate membership cache
         if self.cache_service:
-            await self.cache_service.delete(self._membership_key(chat_id, user_id))
+            await self.cache_service.delete_many([self._membership_key(chat_id, user_id), self._user_chats_key(user_id)])
+            await self.cache_service.remove_members(self._members_key(chat_id), [str(user_id)])
             logger.debug("membership_cache_cleared_for_user", chat_id=chat_id, user_id=user_id)
 
-    async def on_chat_deleted(self, chat_id: uuid.UUID):
+    async def on_chat_deleted(self, chat_id: uuid.UUID, user_id_list: list[uuid.UUID] | None = None):
         # Invalidate metadata and membership caches
         if self.cache_service:
-            # Delete metadata cache and ALL membership caches for this chat
-            await self.cache_service.delete(self._metadata_key(chat_id))
-            await self.cache_service.delete_pattern(self._membership_key(chat_id, "*"))
+            # Delete metadata cache, the member set, the recent messages window for this chat
+            # and the former members' cached chat lists (single DEL)
+            await self.cache_service.delete_many([
+                self._metadata_key(chat_id),
+                self._members_key(chat_id),
+                *self._recent_keys(chat_id),
+                *(self._user_chats_key(uid) for uid in user_id_list or []),
+            ])
+
+            # Per-user membership keys are only written in "key" mode and need a SCAN to find
+            if self.cache_service.cfg.membership_mode == "key":
+                await self.cache_service.delete_pattern(self._membership_key(chat_id, "*"))
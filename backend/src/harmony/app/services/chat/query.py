@@ -6,9 +6,11 @@ import structlog
 
 from harmony.app.core import CacheConfig
 from harmony.app.core.interfaces import TaskQueue
+from harmony.app.db import release_connection
 from harmony.app.repositories import ChatDataRepository, UserChatRepository
 from harmony.app.schemas import ChatSchema
 from ..cache import CacheService
+from ..singleflight import SingleFlight
 
 logger = structlog.get_logger(__name__)
 
@@ -22,6 +24,10 @@ class ChatQueries:
     def _membership_key(chat_id: uuid.UUID, user_id: uuid.UUID) -> str:
         return f"chat:{chat_id}:members:{user_id}"
 
+    @staticmethod
+    def _members_key(chat_id: uuid.UUID) -> str:
+        return f"chat:{chat_id}:members"
+
     @staticmethod
     def _metadata_key(chat_id: uuid.UUID) -> str:
         return f"chat:{chat_id}:metadata"
@@ -34,6 +40,7 @@ class ChatQueries:
         cache_config: CacheConfig,
         cache_service: Optional[CacheService] = None,
         task_queue: Optional[TaskQueue] = None,
+        single_flight: Optional[SingleFlight] = None,
     ):
         self.session = session
         self.chat_data_repo = chat_data_repository
@@ -41,22 +48,89 @@ class ChatQueries:
         self.cache_service = cache_service
         self.task_queue = task_queue
         self.cache_config = cache_config
+        self.single_flight = single_flight
+
+    async def _coalesce(self, key: str, loader, recheck=None):
+        if self.single_flight is None:
+            return await loader()
+        return await self.single_flight.do(key, loader, recheck if self.cache_service else None)
 
     async def check_user_in_chat(self, user_id: uuid.UUID, chat_id: uuid.UUID) -> bool:
         # 1. Check cache first
-        if self.cache_service:
-            cache_key = self._membership_key(chat_id, user_id)
-            is_member = await self.cache_service.get_json(cache_key)
-            if is_member is not None:
-                logger.debug("membership_cache_hit", chat_id=str(chat_id), user_id=str(user_id), is_member=is_member)
-                return is_member
-            
-            logger.debug("membership_cache_miss", chat_id=str(chat_id), user_id=str(user_id))
+        is_member = await self.get_cached_membership(user_id, chat_id)
+        if is_member is not None:
+            return is_member
 
         # 2. Fallback to database check
+        return await self.fetch_membership(user_id, chat_id)
+
+    async def get_cached_membership(self, user_id: uuid.UUID, chat_id: uuid.UUID) -> bool | None:
+        """Cache-only membership lookup. Returns None if the answer is not cached."""
+        if not self.cache_service:
+            return None
+
+        # Answer from the chat's cached member set (SISMEMBER) or the per-user key
+        if self.cache_config.membership_mode == "set":
+            is_member = await self.cache_service.is_member(self._members_key(chat_id), str(user_id))
+        else:
+            is_member = await self.cache_service.get_json(self._membership_key(chat_id, user_id))
+
+        if is_member is not None:
+            logger.debug("membership_cache_hit", chat_id=str(chat_id), user_id=str(user_id), is_member=is_member)
+            return is_member
+        
+        logger.debug("membership_cache_miss", chat_id=str(chat_id), user_id=str(user_id))
+        return None
+
+    async def fetch_membership(self, user_id: uuid.UUID, chat_id: uuid.UUID) -> bool:
+        """Database membership lookup (coalesced per key) that populates the cache."""
+        if self.cache_service and self.cache_config.membership_mode == "set":
+            # Load the full member set from the database and cache it
+            members = await self._get_member_set(chat_id, cached=False)
+            return str(user_id) in members
+
+        return await self._coalesce(
+            self._membership_key(chat_id, user_id),
+            lambda: self._load_membership(user_id, chat_id),
+            lambda: self.get_cached_membership(user_id, chat_id),
+        )
+
+    async def filter_member_chats(self, user_id: uuid.UUID, chat_ids: list[uuid.UUID]) -> set[uuid.UUID]:
+        """
+        Bulk membership check. Returns the subset of chat_ids the user is a member of.
+        Cached answers are read in one round-trip (MGET or pipelined SISMEMBER) and misses in one query.
+        """
+        cached: list[bool | None] = [None] * len(chat_ids)
+        if self.cache_service:
+            if self.cache_config.membership_mode == "set":
+                cached = await self.cache_service.are_members([(self._members_key(cid), str(user_id)) for cid in chat_ids])
+            else:
+                cached = await self.cache_service.get_many_json([self._membership_key(cid, user_id) for cid in chat_ids])
+
+        members = {cid for cid, is_member in zip(chat_ids, cached) if is_member}
+        misses = [cid for cid, is_member in zip(chat_ids, cached) if is_member is None]
+        logger.debug("bulk_membership_lookup", chat_count=len(chat_ids), cache_misses=len(misses))
+        if not misses:
+            return members
+
+        found = await self.user_chat_repo.get_member_chat_ids(user_id=user_id, chat_ids=misses)
+        await release_connection(self.session)
+        members |= found
+
+        # Populate the per-user keys (set mode caches whole member sets, which a bulk lookup doesn't load)
+        if self.cache_service and self.cache_config.membership_mode != "set":
+            self.task_queue.add_task(
+                self.cache_service.set_many_json,
+                {self._membership_key(cid, user_id): cid in found for cid in misses},
+                ttl=self.cache_config.membership_ttl_seconds
+            )
+        return members
+
+    async def _load_membership(self, user_id: uuid.UUID, chat_id: uuid.UUID) -> bool:
         is_member = await self.user_chat_repo.check_user_in_chat(chat_id=chat_id, user_id=user_id)
+        await release_connection(self.session) # Read-only: free the connection before the rest of the request
         
-        # 3. Populate cache for future checks
+        # Populate cache for future checks
         if self.cache_service:
             cache_key = self._membership_key(chat_id, user_id)
             self.task_queue.add_task(
@@ -64,6 +138,29 @@ class ChatQueries:
                 cache_key, is_member, ttl=self.cache_config.membership_ttl_seconds
             )
         return is_member
+
+    async def _get_member_set(self, chat_id: uuid.UUID, cached: bool = True) -> frozenset[str]:
+        cache_key = self._members_key(chat_id)
+        if cached:
+            members = await self.cache_service.get_members(cache_key)
+            if members is not None:
+                return members
+
+        return await self._coalesce(
+            cache_key,
+            lambda: self._load_member_set(chat_id),
+            lambda: self.cache_service.get_members(cache_key),
+        )
+
+    async def _load_member_set(self, chat_id: uuid.UUID) -> frozenset[str]:
+        users = await self.user_chat_repo.get_chat_users(chat_id=chat_id)
+        await release_connection(self.session)
+        members = frozenset(str(uid) for uid in users)
+        self.task_queue.add_task(
+            self.cache_service.set_members,
+            self._members_key(chat_id), list(members), ttl=self.cache_config.membership_ttl_seconds
+        )
+        return members
     
     async def _require_membership(self, user_id: uuid.UUID, chat_id: uuid.UUID) -> None:
         is_member = await self.check_user_in_chat(user_id, chat_id)
@@ -77,26 +174,49 @@ class ChatQueries:
         await self._require_membership(user_id, chat_id)
 
         # 2. Fetch from cache
-        if self.cache_service:
-            cache_key = self._metadata_key(chat_id)
-            cached_metadata = await self.cache_service.get_json(cache_key)
-            if cached_metadata is not None:
-                logger.debug("chat_metadata_cache_hit", chat_id=str(chat_id), user_id=str(user_id))
-                return ChatSchema(**cached_metadata)
+        chat = await self._get_cached_metadata(chat_id)
+        if chat is not None:
+            return chat
+
+        # 3. Fetch from database if cache miss or cache unavailable (coalesced per key)
+        return await self._coalesce(
+            self._metadata_key(chat_id),
+            lambda: self._load_metadata(chat_id),
+            lambda: self._get_cached_metadata(chat_id),
+        )
 
-        # 3. Fetch from database if cache miss or cache unavailable
+    async def _get_cached_metadata(self, chat_id: uuid.UUID) -> ChatSchema | None:
+        if not self.cache_service:
+            return None
+
+        cached_metadata = await self.cache_service.get_json(self._metadata_key(chat_id))
+        if cached_metadata is None:
+            return None
+        if self.cache_service.is_missing(cached_metadata):
+            raise NotFoundError("Chat does not exist.")
+
+        logger.debug("chat_metadata_cache_hit", chat_id=str(chat_id))
+        return ChatSchema(**cached_metadata)
+
+    async def _load_metadata(self, chat_id: uuid.UUID) -> ChatSchema:
         chat = await self.chat_data_repo.get_chat(chat_id)
+        await release_connection(self.session)
         if not chat:
-            logger.warning("get_chat_not_found", chat_id=str(chat_id), user_id=str(user_id))
+            logger.warning("get_chat_not_found", chat_id=str(chat_id))
+            # Remember the miss briefly so repeated lookups don't reach the database
+            if self.cache_service:
+                self.task_queue.add_task(
+                    self.cache_service.set_json,
+                    self._metadata_key(chat_id), self.cache_service.MISSING, ttl=self.cache_config.negative_ttl_seconds
+                )
             raise NotFoundError("Chat does not exist.")
         chat = ChatSchema.model_validate(chat) # Convert from SQLAlchemy model to Pydantic schema
         
-        # 4. Populate cache for future requests
+        # Populate cache for future requests
         if self.cache_service:
-            cache_key = self._metadata_key(chat_id)
             self.task_queue.add_task(
                 self.cache_service.set_json,
-                cache_key, chat.model_dump(mode="json"), ttl=self.cache_config.chat_metadata_ttl_seconds
+                self._metadata_key(chat_id), chat.model_dump(mode="json"), ttl=self.cache_config.chat_metadata_ttl_seconds
             )
         
         return chat
@@ -105,8 +225,13 @@ class ChatQueries:
         # 1. Authorize
         await self._require_membership(user_id, chat_id)
         
-        # 2. Fetch from database (membership list is not cached due to potential size and volatility, but could be optimized in the future if needed)
-        users = await self.user_chat_repo.get_chat_users(chat_id=chat_id)
+        # 2. Serve from the cached member set when available (set mode), else fetch from database
+        if self.cache_service and self.cache_config.membership_mode == "set":
+            members = await self._get_member_set(chat_id)
+            users = [uuid.UUID(uid) for uid in members]
+        else:
+            users = await self.user_chat_repo.get_chat_users(chat_id=chat_id)
+            await release_connection(self.session)
         if not users:
             logger.warning("get_chat_members_not_found", chat_id=str(chat_id), user_id=str(user_id))
             raise NotFoundError("Chat does not exist.")
@@ -3,6 +3,8 @@ from sqlalchemy.exc import IntegrityError
 import structlog
 
 from harmony.app.core.exceptions import ConflictError, InternalServerError, HarmonyError
+from harmony.app.db import WRITE_DEPTH
+from harmony.app.repositories import OutboxRepository
 from sqlalchemy.ext.asyncio import AsyncSession
 
 class Command:
@@ -10,23 +12,54 @@ class Command:
         self.session = session
         self.logger = logger
 
+    @property
+    def _outbox(self) -> list[dict]:
+        # Queued on the session rather than the service, which is shared by concurrent requests
+        return self.session.info.setdefault("outbox", [])
+
+    def emit(self, aggregate_type: str, aggregate_id: str, event_type: str, payload: dict):
+        """
+        Queues an outbox event. Queued events are written together, with one multi-row INSERT,
+        right before the transaction_handler block commits (and discarded if it fails).
+        """
+        self._outbox.append({
+            "aggregate_type": aggregate_type,
+            "aggregate_id": aggregate_id,
+            "event_type": event_type,
+            "payload": payload,
+        })
+
+    async def _flush_outbox(self):
+        events = self.session.info.pop("outbox", None)
+        if events:
+            await OutboxRepository(self.session).insert_events(events)
+
     @asynccontextmanager
     async def transaction_handler(self, action_name: str, **log_context):
         """
         A context manager to handle commits, rollbacks, and exception translation.
         With an action_name and kwargs to maintain logs.
+        Read-only queries run inside the block keep their connection (see release_connection).
         """
+        info = self.session.info
+        info[WRITE_DEPTH] = info.get(WRITE_DEPTH, 0) + 1
         try:
             yield
+            await self._flush_outbox()
             await self.session.commit()
         except IntegrityError as e:
+            self._outbox.clear()
             await self.session.rollback()
             self.logger.warning(f"{action_name}_integrity_error", detail=str(e.orig), **log_context)
             raise ConflictError("Operation failed: One or more provided records do not exist or violate system constraints.")
         except HarmonyError:
+            self._outbox.clear()
             await self.session.rollback()
             raise
         except Exception as e:
+            self._outbox.clear()
             await self.session.rollback()
             self.logger.exception(f"{action_name}_failed", **log_context)
-            raise InternalServerError(f"An unexpected error occurred while trying to {action_name.replace('_', ' ')}.")
\ No newline at end of file
+            raise InternalServerError(f"An unexpected error occurred while trying to {action_name.replace('_', ' ')}.")
+        finally:
+            info[WRITE_DEPTH] -= 1
@@ -1,40 +1,76 @@
 import uuid
-from aiokafka import AIOKafkaProducer
-from harmony.app.core.settings import ChatConfig
+import asyncio
+import time
+from harmony.app.core.settings import ChatConfig, CacheConfig
 from ulid import ULID
 from typing import Optional
 from datetime import datetime, timezone
 from harmony.app.core.exceptions import AuthorizationError, InternalServerError
 import structlog
 
-from harmony.app.schemas import ChatMessage, ChatMessageResponse
+from harmony.app.schemas import ChatMessage, ChatMessageResponse, UserSchema
 from harmony.app.repositories import ChatHistoryRepository
 
+from ..cache import CacheService
+from ..publisher import KafkaBatchPublisher
+from ..activity import ChatActivityTracker
 from ..chat import ChatQueries
 from ..user import UserQueries
 
 logger = structlog.get_logger(__name__)
 
 class MessageCommands:
+    @staticmethod
+    def _membership_key(chat_id: uuid.UUID, user_id: uuid.UUID) -> str:
+        return f"chat:{chat_id}:members:{user_id}"
+
+    @staticmethod
+    def _user_key(user_id: uuid.UUID) -> str:
+        return f"user:{user_id}"
+
+    @staticmethod
+    def _recent_key(chat_id: uuid.UUID) -> str:
+        return f"chat:{chat_id}:recent"
+
+    @staticmethod
+    def _recent_meta_key(chat_id: uuid.UUID) -> str:
+        return f"chat:{chat_id}:recent:meta"
+
     def __init__(
         self, 
         chat_history_repository: ChatHistoryRepository,
         chat_queries: ChatQueries,
         user_queries: UserQueries,
-        publisher: AIOKafkaProducer,
+        publisher: KafkaBatchPublisher,
         chat_config: ChatConfig,
+        cache_config: CacheConfig = CacheConfig(),
+        cache_service: Optional[CacheService] = None,
+        activity_tracker: Optional[ChatActivityTracker] = None,
     ):
         self.chat_history_repo = chat_history_repository
         self.chat_queries = chat_queries
         self.user_queries = user_queries
         self.publisher = publisher
         self.cfg = chat_config
+        self.cache_config = cache_config
+        self.cache_service = cache_service
+        self.activity_tracker = activity_tracker
 
     async def send_message(self, chat_id: uuid.UUID, user_id: uuid.UUID, content: str, client_uuid: str | None = None) -> ChatMessage:
-        # 1. Authorize
-        is_member = await self.chat_queries.check_user_in_chat(user_id=user_id, chat_id=chat_id)
+        started = time.perf_counter()
+        timings = {}
+
+        # 1. Authorize and resolve the sender (cache lookups run together, database fallbacks run in order)
+        is_member, sender = await self._get_cached_member_and_sender(chat_id, user_id)
+        timings["cache_lookup_ms"] = (time.perf_counter() - started) * 1000
+
+        if is_member is None:
+            is_member = await self.chat_queries.fetch_membership(user_id, chat_id)
         if not is_member:
             raise AuthorizationError("User is not a member of this chat.")
+        if sender is None:
+            sender = await self.user_queries.fetch_user(user_id)
+        timings["authorize_ms"] = (time.perf_counter() - started) * 1000
 
         # 2. Construct Message Data
         ulid_val = ULID()
@@ -50,11 +86,11 @@ class MessageCommands:
             client_uuid=client_uuid
         )
 
-        sender = await self.user_queries.get_user_by_id(user_id)
         msg_resp = ChatMessageResponse(**msg.model_dump(), author_metadata=sender.meta)
 
         try:
-            await self.publisher.send_and_wait(
+            publish_started = time.perf_counter()
+            await self.publisher.publish(
                 topic=self.cfg.message_topic,
                 key=str(chat_id).encode("utf-8"),
                 value=msg_resp.model_dump_json().encode("utf-8"),
@@ -63,9 +99,62 @@ class MessageCommands:
                 ]
             )
 
-            logger.info("message_sent", chat_id=str(chat_id), user_id=str(user_id), message_id=ulid_str)
-            return msg_resp
+            timings["publish_ms"] = (time.perf_counter() - publish_started) * 1000
             
         except Exception as e:
             logger.exception("message_send_failed", chat_id=str(chat_id), user_id=str(user_id))
-            raise InternalServerError("Failed to send message.")
\ No newline at end of file
+            raise InternalServerError("Failed to send message.")
+
+        # 3. Record the chat's activity (written to Postgres in batches)
+        if self.activity_tracker:
+            self.activity_tracker.touch(chat_id, datetime.fromtimestamp(ulid_val.timestamp, timezone.utc).replace(tzinfo=None))
+
+        # 4. Write through to the recent messages window (read-your-writes for the next history request)
+        if self.cache_service and self.cache_config.recent_messages_window > 0:
+            window_started = time.perf_counter()
+            await self.cache_service.add_to_window(
+                self._recent_key(chat_id),
+                self._recent_meta_key(chat_id),
+                member=msg.model_dump_json(),
+                score=ulid_val.timestamp * 1000,
+                max_size=self.cache_config.recent_messages_window,
+                ttl=self.cache_config.recent_messages_ttl_seconds,
+            )
+            timings["window_ms"] = (time.perf_counter() - window_started) * 1000
+
+        timings["total_ms"] = (time.perf_counter() - started) * 1000
+        logger.info(
+            "message_sent", chat_id=str(chat_id), user_id=str(user_id), message_id=ulid_str,
+            **{stage: round(ms, 2) for stage, ms in timings.items()}
+        )
+        return msg_resp
+
+    async def _get_cached_member_and_sender(self, chat_id: uuid.UUID, user_id: uuid.UUID) -> tuple[bool | None, UserSchema | None]:
+        """
+        Cache-only membership and sender lookups. Either result is None when it is not cached.
+        Raises AuthorizationError as soon as the cache says the user is not a member.
+        """
+        if not self.cache_service:
+            return None, None
+
+        # One MGET round trip when both answers live in plain keys
+        if self.cache_config.pipeline_send_lookups and self.cache_config.membership_mode == "key":
+            is_member, cached_user = await self.cache_service.get_many_json(
+                [self._membership_key(chat_id, user_id), self._user_key(user_id)]
+            )
+            if is_member is False:
+                raise AuthorizationError("User is not a member of this chat.")
+            return is_member, self.user_queries.parse_cached_user(user_id, cached_user)
+
+        # Otherwise run both lookups concurrently, failing fast on a cached non-member
+        sender_task = asyncio.create_task(self.user_queries.get_cached_user(user_id))
+        try:
+            is_member = await self.chat_queries.get_cached_membership(user_id, chat_id)
+            if is_member is False:
+                raise AuthorizationError("User is not a member of this chat.")
+        except BaseException:
+            sender_task.cancel()
+            # Retrieve its outcome (it may already have failed) so asyncio doesn't log it as never retrieved
+            await asyncio.gather(sender_task, return_exceptions=True)
+            raise
+        return is_member, await sender_task
\ No newline at end of file
@@ -1,21 +1,42 @@
 import uuid
+from typing import Optional
 from harmony.app.repositories import ChatHistoryRepository
 import structlog
 
+from ..cache import CacheService
+
 logger = structlog.get_logger(__name__)
 
 
 class MessageEventHandler:
+    # Purge checkpoints outlive any realistic retry/redelivery delay
+    PURGE_CHECKPOINT_TTL_SECONDS = 7 * 24 * 3600
+
+    @staticmethod
+    def _purge_checkpoint_key(chat_id: uuid.UUID) -> str:
+        return f"purge:chat:{chat_id}"
+
     def __init__(
             self,
             chat_history_repository: ChatHistoryRepository,
+            cache_service: Optional[CacheService] = None,
     ):
         self.chat_history_repo = chat_history_repository
+        self.cache_service = cache_service
 
     async def on_chat_deleted(self, chat_id: uuid.UUID):
+        # Checkpoint the purge in Redis so a redelivered event resumes instead of restarting
+        load_checkpoint = save_checkpoint = None
+        if self.cache_service:
+            key = self._purge_checkpoint_key(chat_id)
+            load_checkpoint = lambda: self.cache_service.get_json(key)
+            save_checkpoint = lambda checkpoint: self.cache_service.set_json(key, checkpoint, ttl=self.PURGE_CHECKPOINT_TTL_SECONDS)
+
         try:
-            await self.chat_history_repo.delete_chat_history(chat_id)
-            logger.info("chat_history_deleted", chat_id=str(chat_id))
+            stats = await self.chat_history_repo.delete_chat_history(chat_id, load_checkpoint, save_checkpoint)
+            if self.cache_service:
+                await self.cache_service.delete(self._purge_checkpoint_key(chat_id))
+            logger.info("chat_history_deleted", chat_id=str(chat_id), deleted=stats.deleted, items_per_second=round(stats.items_per_second, 1))
         except Exception as e:
             logger.exception("chat_history_delete_failed", chat_id=str(chat_id))
             raise e
\ No newline at end of file
@@ -1,25 +1,99 @@
 import uuid
-from harmony.app.core.exceptions import AuthorizationError, InternalServerError
+import asyncio
+from typing import Optional
+from harmony.app.core.exceptions import AuthorizationError, InternalServerError, ValidationError
+from harmony.app.core.interfaces import TaskQueue
 import structlog
 
+from harmony.app.core import CacheConfig
+from harmony.app.db import HistoryCursor
 from harmony.app.repositories import ChatHistoryRepository
-from harmony.app.schemas import ChatMessage, ChatMessageResponse
+from harmony.app.schemas import ChatMessage, ChatMessageResponse, UserSchema
 
+from ..cache import CacheService
 from ..chat import ChatQueries
 from ..user import UserQueries
 
 logger = structlog.get_logger(__name__)
 
 class MessageQueries:
+    '''
+    Recent Messages Window (optional, cache_config.recent_messages_window > 0):
+        A capped Redis sorted set per chat holds the newest messages (scored by ULID timestamp).
+        It is written through by MessageCommands.send_message and seeded from DynamoDB on a miss.
+        A "meta" key marks the window as trusted and records whether it reaches the start of the chat ("head").
+        Cursor-less history requests are served entirely from the window when it is trusted.
+
+    Cursors:
+        next_cursor is an opaque HistoryCursor (last ULID served + page size). Internally pages are addressed by ULID;
+        the page size is the default of requests that pass a cursor without a limit (see cursor_page_size).
+
+    Read-ahead (optional, cache_config.history_prefetch):
+        After a page is served, the following page is fetched in the background and cached briefly under
+        (chat, cursor ULID, page size), so scrolling back usually hits Redis instead of DynamoDB. After the newest
+        page this only happens with cache_config.history_prefetch_first_page, and never for the batch preload.
+        Older pages never change, so the only staleness is a purged chat's page outliving it by the TTL.
+    '''
+
+    WINDOW_HEAD = "head"
+    WINDOW_PARTIAL = "partial"
+
+    @staticmethod
+    def _recent_key(chat_id: uuid.UUID) -> str:
+        return f"chat:{chat_id}:recent"
+
+    @staticmethod
+    def _recent_meta_key(chat_id: uuid.UUID) -> str:
+        return f"chat:{chat_id}:recent:meta"
+
+    @staticmethod
+    def _page_key(chat_id: uuid.UUID, before: str, limit: int) -> str:
+        return f"chat:{chat_id}:page:{before}:{limit}"
+
     def __init__(
-        self, 
+        self,
         chat_history_repository: ChatHistoryRepository,
         chat_queries: ChatQueries,
         user_queries: UserQueries,
+        cache_config: CacheConfig = CacheConfig(),
+        cache_service: Optional[CacheService] = None,
+        task_queue: Optional[TaskQueue] = None,
     ):
         self.chat_history_repo = chat_history_repository
         self.chat_queries = chat_queries
         self.user_queries = user_queries
+        self.cache_config = cache_config
+        self.cache_service = cache_service
+        self.task_queue = task_queue
+
+    @property
+    def _window_enabled(self) -> bool:
+        return self.cache_service is not None and self.cache_config.recent_messages_window > 0
+
+    @property
+    def _prefetch_enabled(self) -> bool:
+        return self.cache_service is not None and self.cache_config.history_prefetch
+
+    @staticmethod
+    def _decode_cursor(cursor: str | None) -> str | None:
+        if cursor is None:
+            return None
+        try:
+            return HistoryCursor.decode(cursor).ulid
+        except ValueError:
+            raise ValidationError("Invalid history cursor.")
+
+    @classmethod
+    def cursor_page_size(cls, cursor: str) -> int | None:
+        """The page size a cursor was issued for (None for bare ULID cursors)."""
+        try:
+            return HistoryCursor.decode(cursor).limit
+        except ValueError:
+            raise ValidationError("Invalid history cursor.")
+
+    @staticmethod
+    def _encode_cursor(before: str | None, limit: int) -> str | None:
+        return HistoryCursor(ulid=before, limit=limit).encode() if before else None
 
     async def get_chat_history(self, user_id: uuid.UUID, chat_id: uuid.UUID, limit: int = 50, cursor: str | None = None) -> tuple[list[ChatMessageResponse], str | None]:
         # 1. Authorize
@@ -28,19 +102,102 @@ class MessageQueries:
             logger.warning("history_access_denied", chat_id=chat_id, user_id=user_id)
             raise AuthorizationError("You must be a member of the chat to view history.")
 
-        # 2. Fetch from DynamoDB
+        # 2. Fetch the page (recent messages window, read-ahead cache or DynamoDB)
+        messages, next_before = await self._get_page(chat_id, limit, self._decode_cursor(cursor))
+
+        # 3. Hydrate messages with user metadata
+        return await self._hydrate(messages), self._encode_cursor(next_before, limit)
+
+    async def get_chat_histories(self, user_id: uuid.UUID, chat_ids: list[uuid.UUID], limit: int = 50, concurrency: int = 8) -> dict[uuid.UUID, tuple[list[ChatMessageResponse], str | None]]:
+        """
+        Newest page of several chats at once (e.g. to preload the sidebar).
+        Chats the user is not a member of are left out of the result.
+        """
+        # 1. Authorize every chat with one bulk lookup
+        chat_ids = list(dict.fromkeys(chat_ids))
+        allowed = await self.chat_queries.filter_member_chats(user_id=user_id, chat_ids=chat_ids)
+        if len(allowed) < len(chat_ids):
+            logger.warning("history_batch_access_denied", user_id=str(user_id), denied_count=len(chat_ids) - len(allowed))
+        chat_ids = [cid for cid in chat_ids if cid in allowed]
+
+        # 2. Fetch the pages concurrently (capped)
+        semaphore = asyncio.Semaphore(concurrency)
+        async def fetch(chat_id: uuid.UUID):
+            async with semaphore:
+                return await self._get_page(chat_id, limit, read_ahead=False) # Most preloaded chats are never scrolled
+        pages = await asyncio.gather(*(fetch(cid) for cid in chat_ids))
+
+        # 3. Hydrate every page with a single user lookup
+        users_dict = await self._get_authors([msg for messages, _ in pages for msg in messages])
+        return {
+            chat_id: (self._hydrate_with(messages, users_dict), self._encode_cursor(next_before, limit))
+            for chat_id, (messages, next_before) in zip(chat_ids, pages)
+        }
+
+    async def _get_page(self, chat_id: uuid.UUID, limit: int, before: str | None = None, read_ahead: bool = True) -> tuple[list[ChatMessage], str | None]:
+        """Returns a page of messages older than the `before` ULID (newest first) and the ULID to continue from."""
+        # 1. Serve the first page from the recent messages window when possible
+        use_window = before is None and self._window_enabled and limit <= self.cache_config.recent_messages_window
+        page = await self._get_recent_window(chat_id, limit) if use_window else None
+
+        # 2. Serve older pages from the read-ahead cache when possible
+        if page is None and before is not None and self._prefetch_enabled:
+            page = await self._get_prefetched_page(chat_id, before, limit)
+
+        # 3. Fetch from DynamoDB
+        if page is None:
+            page = await self._fetch_page(chat_id, limit, before)
+            if use_window:
+                self.task_queue.add_task(self._seed_recent_window, chat_id, *page)
+
+        # 4. Read the next page ahead (after the newest page too, unless disabled)
+        next_before = page[1]
+        read_ahead = read_ahead and (before is not None or self.cache_config.history_prefetch_first_page)
+        if read_ahead and next_before is not None and self._prefetch_enabled:
+            self.task_queue.add_task(self._prefetch_page, chat_id, next_before, limit)
+        return page
+
+    async def _fetch_page(self, chat_id: uuid.UUID, limit: int, before: str | None) -> tuple[list[ChatMessage], str | None]:
         try:
-            messages, next_cursor = await self.chat_history_repo.get_chat_history(str(chat_id), limit, cursor)
-            logger.debug("chat_history_retrieved", chat_id=str(chat_id), message_count=len(messages))
+            page = await self.chat_history_repo.get_chat_history(str(chat_id), limit, before)
+            logger.debug("chat_history_retrieved", chat_id=str(chat_id), message_count=len(page[0]))
+            return page
         except Exception as e:
             logger.exception("chat_history_fetch_failed", chat_id=str(chat_id))
             raise InternalServerError("Failed to retrieve chat history.")
-        
-        # 3. Get user metadata
+
+    async def _get_prefetched_page(self, chat_id: uuid.UUID, before: str, limit: int) -> tuple[list[ChatMessage], str | None] | None:
+        cached = await self.cache_service.get_json(self._page_key(chat_id, before, limit))
+        if cached is None:
+            logger.debug("history_prefetch_miss", chat_id=str(chat_id))
+            return None
+
+        logger.debug("history_prefetch_hit", chat_id=str(chat_id))
+        return [ChatMessage.model_validate(m) for m in cached["messages"]], cached["next"]
+
+    async def _prefetch_page(self, chat_id: uuid.UUID, before: str, limit: int):
+        key = self._page_key(chat_id, before, limit)
+        try:
+            messages, next_before = await self.chat_history_repo.get_chat_history(str(chat_id), limit, before)
+        except Exception as e:
+            logger.warning("history_prefetch_failed", chat_id=str(chat_id), error=str(e))
+            return
+
+        await self.cache_service.set_json(
+            key,
+            {"messages": [m.model_dump(mode="json") for m in messages], "next": next_before},
+            ttl=self.cache_config.history_prefetch_ttl_seconds,
+        )
+
+    async def _get_authors(self, messages: list[ChatMessage]) -> dict[uuid.UUID, UserSchema]:
         user_ids = list(set(m.user_id for m in messages))
-        users_dict = await self.user_queries.get_users_dict(user_ids)
-        
-        # 4. Hydrate messages with user metadata
+        return await self.user_queries.get_users_dict(user_ids)
+
+    async def _hydrate(self, messages: list[ChatMessage]) -> list[ChatMessageResponse]:
+        return self._hydrate_with(messages, await self._get_authors(messages))
+
+    @staticmethod
+    def _hydrate_with(messages: list[ChatMessage], users_dict: dict[uuid.UUID, UserSchema]) -> list[ChatMessageResponse]:
         hydrated_messages = []
         for msg in messages:
             user = users_dict.get(msg.user_id)
@@ -50,5 +207,36 @@ class MessageQueries:
                     author_metadata=user.meta if user else None
                 )
             )
-            
-        return hydrated_messages, next_cursor
\ No newline at end of file
+        return hydrated_messages
+
+    async def _get_recent_window(self, chat_id: uuid.UUID, limit: int) -> tuple[list[ChatMessage], str | None] | None:
+        window = await self.cache_service.get_window(self._recent_key(chat_id), self._recent_meta_key(chat_id), limit)
+        if window is None:
+            logger.debug("recent_window_cache_miss", chat_id=str(chat_id))
+            return None
+
+        members, size, meta = window
+        reaches_head = meta == self.WINDOW_HEAD
+
+        # A short window is only complete if it reaches the start of the chat
+        if len(members) < limit and not reaches_head:
+            logger.debug("recent_window_too_short", chat_id=str(chat_id), size=size)
+            return None
+
+        messages = [ChatMessage.model_validate_json(member) for member in members]
+        trimmed = size >= self.cache_config.recent_messages_window
+        has_more = size > limit or trimmed or not reaches_head
+        next_before = messages[-1].ulid if messages and has_more else None
+
+        logger.debug("recent_window_cache_hit", chat_id=str(chat_id), message_count=len(messages))
+        return messages, next_before
+
+    async def _seed_recent_window(self, chat_id: uuid.UUID, messages: list[ChatMessage], next_before: str | None):
+        await self.cache_service.seed_window(
+            self._recent_key(chat_id),
+            self._recent_meta_key(chat_id),
+            members={msg.model_dump_json(): msg.timestamp.timestamp() * 1000 for msg in messages},
+            meta=self.WINDOW_PARTIAL if next_before else self.WINDOW_HEAD,
+            max_size=self.cache_config.recent_messages_window,
+            ttl=self.cache_config.recent_messages_ttl_seconds,
+        )
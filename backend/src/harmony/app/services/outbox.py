@@ -0,0 +1,126 @@
+from dataclasses import dataclass, field, asdict
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+import structlog
+
+from harmony.app.core import OutboxConfig
+from harmony.app.repositories import OutboxRepository
+
+logger = structlog.get_logger(__name__)
+
+@dataclass
+class OutboxMaintenanceStats:
+    created: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list) # Not created: the default partition already holds rows of that day
+    sealed: list[str] = field(default_factory=list)
+    dropped: list[str] = field(default_factory=list)
+    waiting_for_cdc: list[str] = field(default_factory=list)
+    reclaimed_bytes: int = 0
+    default_partition_rows: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+class OutboxMaintenance:
+    '''
+    Keeps outbox_events bounded: creates the daily partitions ahead of time and drops the ones
+    that expired (retention_days after their day ended) once the CDC replication slot has consumed them.
+
+    Each DDL statement runs in its own short transaction, since creating or dropping a partition
+    briefly locks the parent table against the outbox inserts of membership writes.
+
+    If maintenance falls more than partition_days_ahead days behind, the rows of the missing days land in the
+    default partition, and Postgres refuses to create a partition for a day the default partition has rows of.
+    Such days are skipped (their rows stay in the default partition) and reported, and partition creation and
+    dropping are separate steps, so a failing creation never stops retention.
+    '''
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], outbox_config: OutboxConfig = OutboxConfig()):
+        self.session_factory = session_factory
+        self.cfg = outbox_config
+
+    async def prepare(self, today: date | None = None, stats: OutboxMaintenanceStats | None = None) -> OutboxMaintenanceStats:
+        """Creates the default partition, the partitions from today on and the CDC publication."""
+        today = today or datetime.now(timezone.utc).date()
+        stats = stats or OutboxMaintenanceStats()
+        async with self.session_factory() as session:
+            repo = OutboxRepository(session)
+            await repo.create_default_partition()
+            await repo.ensure_publication(self.cfg.publication)
+            await session.commit()
+        await self._create_ahead(today, stats)
+        return stats
+
+    async def run(self, today: date | None = None, force: bool = False) -> OutboxMaintenanceStats:
+        """
+        One maintenance pass. With `force`, expired partitions are dropped without waiting
+        for the replication slot (e.g. when CDC is not deployed).
+        """
+        today = today or datetime.now(timezone.utc).date()
+        stats = OutboxMaintenanceStats()
+
+        # 1. Create the upcoming partitions
+        try:
+            await self.prepare(today, stats)
+        except Exception:
+            logger.exception("outbox_partition_creation_failed", created=stats.created, skipped=stats.skipped)
+
+        # 2. Drop the expired partitions
+        expired_before = today - timedelta(days=self.cfg.retention_days)
+
+        async with self.session_factory() as session:
+            repo = OutboxRepository(session)
+            partitions = await repo.list_partitions()
+            stats.default_partition_rows = await repo.count_default_rows()
+
+        for partition in partitions:
+            # The partition's range ends at day + 1
+            if partition.is_default or partition.day + timedelta(days=1) > expired_before:
+                continue
+
+            async with self.session_factory() as session:
+                repo = OutboxRepository(session)
+                lsn = partition.sealed_lsn
+                if lsn is None:
+                    lsn = await repo.seal_partition(partition.name)
+                    await session.commit()
+                    stats.sealed.append(partition.name)
+
+                if not force:
+                    consumed = await repo.slot_confirmed(self.cfg.replication_slot, lsn)
+                    if consumed is None:
+                        logger.warning("outbox_replication_slot_missing", slot=self.cfg.replication_slot, partition=partition.name)
+                    if not consumed:
+                        stats.waiting_for_cdc.append(partition.name)
+                        continue
+
+                await repo.drop_partition(partition.name)
+                await session.commit()
+                stats.dropped.append(partition.name)
+                stats.reclaimed_bytes += partition.size_bytes
+
+        if stats.default_partition_rows:
+            logger.warning("outbox_default_partition_not_empty", rows=stats.default_partition_rows)
+        logger.info("outbox_maintenance_finished", **stats.as_dict())
+        return stats
+
+    async def _create_ahead(self, today: date, stats: OutboxMaintenanceStats):
+        async with self.session_factory() as session:
+            existing = {p.day for p in await OutboxRepository(session).list_partitions()}
+
+        for offset in range(self.cfg.partition_days_ahead + 1):
+            day = today + timedelta(days=offset)
+            if day in existing:
+                continue
+
+            name = OutboxRepository._partition_name(day)
+            async with self.session_factory() as session:
+                repo = OutboxRepository(session)
+                rows = await repo.count_default_rows(day)
+                if rows:
+                    logger.warning("outbox_partition_skipped", partition=name, default_partition_rows=rows)
+                    stats.skipped.append(name)
+                    continue
+                await repo.create_partition(day)
+                await session.commit()
+            stats.created.append(name)
@@ -0,0 +1,183 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from aiokafka import AIOKafkaProducer
+from aiokafka.partitioner import DefaultPartitioner
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+@dataclass
+class _PendingMessage:
+    key: bytes | None
+    value: bytes
+    headers: list[tuple[str, bytes]]
+    future: asyncio.Future
+    enqueued_at: float
+
+@dataclass
+class _PartitionBuffer:
+    messages: list[_PendingMessage] = field(default_factory=list)
+    size: int = 0
+
+class KafkaBatchPublisher:
+    '''
+    Micro-batches messages in front of an AIOKafkaProducer.
+
+    Messages are buffered per (topic, partition) until linger_ms elapses or batch_size bytes accumulate,
+    then sent as one record batch. Each `publish` call resolves only once its batch is acked by the
+    broker (the producer runs with acks=all), so callers keep the same durability guarantee as send_and_wait.
+
+    Ordering:
+        Batches for the same partition are enqueued on the producer in flush order, and at most
+        max_in_flight batches await their ack at once. If a batch cannot be enqueued, the rest of
+        its flush fails with it rather than being sent after the gap.
+    '''
+
+    def __init__(
+        self,
+        producer: AIOKafkaProducer,
+        linger_ms: int = 0,
+        batch_size: int = 16384,
+        max_in_flight: int = 5,
+    ):
+        self.producer = producer
+        self.linger_ms = linger_ms
+        self.batch_size = batch_size
+        self._partitioner = DefaultPartitioner()
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._buffers: dict[tuple[str, int], _PartitionBuffer] = {}
+        self._partition_locks: dict[tuple[str, int], asyncio.Lock] = {}
+        self._flush_tasks: set[asyncio.Task] = set()
+
+        # Counters
+        self.messages = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.max_batch_messages = 0
+        self.total_flush_latency_ms = 0.0
+        self.max_flush_latency_ms = 0.0
+
+    async def publish(self, topic: str, key: bytes | None, value: bytes, headers: list[tuple[str, bytes]] | None = None):
+        """
+        Buffers a message and waits until the batch containing it is acked.
+        Raises the producer's exception if the batch fails.
+        """
+        partition = await self._partition(topic, key)
+        buffer_key = (topic, partition)
+
+        buffer = self._buffers.get(buffer_key)
+        if buffer is None:
+            buffer = self._buffers[buffer_key] = _PartitionBuffer()
+            self._schedule(self._flush_after_linger(buffer_key))
+
+        future = asyncio.get_running_loop().create_future()
+        buffer.messages.append(_PendingMessage(key, value, headers or [], future, time.perf_counter()))
+        buffer.size += len(value) + (len(key) if key else 0)
+
+        # Flush early once the byte budget is reached
+        if buffer.size >= self.batch_size:
+            self._schedule(self._flush(buffer_key))
+
+        return await future
+
+    async def flush(self):
+        """Flushes every buffer and waits for all outstanding batches."""
+        for buffer_key in list(self._buffers):
+            self._schedule(self._flush(buffer_key))
+        while self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+
+    async def _partition(self, topic: str, key: bytes | None) -> int:
+        partitions = sorted(await self.producer.partitions_for(topic))
+        return self._partitioner(key, partitions, partitions)
+
+    def _schedule(self, coro):
+        task = asyncio.create_task(coro)
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush_after_linger(self, buffer_key: tuple[str, int]):
+        await asyncio.sleep(self.linger_ms / 1000)
+        await self._flush(buffer_key)
+
+    async def _flush(self, buffer_key: tuple[str, int]):
+        buffer = self._buffers.pop(buffer_key, None)
+        if buffer is None or not buffer.messages:
+            return
+
+        topic, partition = buffer_key
+        lock = self._partition_locks.setdefault(buffer_key, asyncio.Lock())
+
+        # 1. Enqueue record batches in order (the lock keeps batches for a partition ordered)
+        sent: list[tuple[asyncio.Future, list[_PendingMessage]]] = []
+        async with lock:
+            chunks = self._build_batches(buffer.messages)
+            for batch, messages in chunks:
+                await self._in_flight.acquire()
+                try:
+                    ack = await self.producer.send_batch(batch, topic, partition=partition)
+                except Exception as e:
+                    self._in_flight.release()
+                    # Sending the later chunks would reorder the partition: fail them with this one
+                    self._fail(messages, e)
+                    for _, later in chunks:
+                        self._fail(later, e)
+                    break
+                # Free the slot as soon as this batch settles: later chunks (and other partitions) wait on it
+                ack.add_done_callback(lambda _: self._in_flight.release())
+                sent.append((ack, messages))
+
+        # 2. Wait for the acks and resolve the callers
+        for ack, messages in sent:
+            try:
+                metadata = await ack
+            except Exception as e:
+                self._fail(messages, e)
+            else:
+                self._resolve(messages, metadata)
+
+    def _build_batches(self, messages: list[_PendingMessage]):
+        batch, in_batch = self.producer.create_batch(), []
+        for msg in messages:
+            appended = batch.append(timestamp=None, key=msg.key, value=msg.value, headers=msg.headers)
+            if appended is None:
+                # Batch is full: close it and start a new one
+                yield batch, in_batch
+                batch, in_batch = self.producer.create_batch(), []
+                batch.append(timestamp=None, key=msg.key, value=msg.value, headers=msg.headers)
+            in_batch.append(msg)
+        if in_batch:
+            yield batch, in_batch
+
+    def _resolve(self, messages: list[_PendingMessage], metadata):
+        now = time.perf_counter()
+        for msg in messages:
+            latency_ms = (now - msg.enqueued_at) * 1000
+            self.total_flush_latency_ms += latency_ms
+            self.max_flush_latency_ms = max(self.max_flush_latency_ms, latency_ms)
+            if not msg.future.done():
+                msg.future.set_result(metadata)
+
+        self.messages += len(messages)
+        self.batches += 1
+        self.max_batch_messages = max(self.max_batch_messages, len(messages))
+
+    def _fail(self, messages: list[_PendingMessage], error: Exception):
+        self.failed_batches += 1
+        logger.warning("kafka_batch_failed", message_count=len(messages), error=str(error))
+        for msg in messages:
+            if not msg.future.done():
+                msg.future.set_exception(error)
+
+    def stats(self) -> dict:
+        return {
+            "buffered": sum(len(b.messages) for b in self._buffers.values()),
+            "messages": self.messages,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "avg_batch_messages": self.messages / self.batches if self.batches else 0.0,
+            "max_batch_messages": self.max_batch_messages,
+            "avg_flush_latency_ms": self.total_flush_latency_ms / self.messages if self.messages else 0.0,
+            "max_flush_latency_ms": self.max_flush_latency_ms,
+        }
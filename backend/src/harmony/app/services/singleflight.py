@@ -0,0 +1,128 @@
+import asyncio
+from typing import Awaitable, Callable, Optional, TypeVar
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+class SingleFlight:
+    '''
+    Coalesces concurrent cache-miss loads of the same key, so only one loader per key runs
+    while every other caller awaits its result (or its exception).
+
+    In-process:
+        Calls for a key that already has a loader in flight wait on that loader instead of starting their own.
+
+    Cross-process (optional, lock_ttl_ms > 0):
+        The in-process leader also takes a short Redis lease (SET NX PX) on the key.
+        If another process holds it, the leader polls `recheck` (usually a cache read) until the lease
+        holder has populated the cache or lock_wait_ms elapses, and only then falls back to the loader.
+    '''
+
+    def __init__(
+        self,
+        redis_client: Optional[Redis] = None,
+        lock_ttl_ms: int = 0,
+        lock_wait_ms: int = 200,
+        lock_poll_ms: int = 10,
+    ):
+        self.redis = redis_client
+        self.lock_ttl_ms = lock_ttl_ms
+        self.lock_wait_ms = lock_wait_ms
+        self.lock_poll_ms = lock_poll_ms
+        self._inflight: dict[str, asyncio.Future] = {}
+
+        # Counters
+        self.leaders = 0
+        self.coalesced = 0
+        self.locks_acquired = 0
+        self.locks_contended = 0
+        self.lock_wait_hits = 0
+
+    @staticmethod
+    def _lock_key(key: str) -> str:
+        return f"lock:{key}"
+
+    async def do(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[T]],
+        recheck: Optional[Callable[[], Awaitable[T | None]]] = None,
+    ) -> T:
+        # 1. Join a loader already in flight for this key
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # The leader was cancelled (e.g. client disconnected); retry unless we were cancelled ourselves
+                if not inflight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                return await self.do(key, loader, recheck)
+
+        # 2. Become the leader for this key
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.leaders += 1
+        try:
+            result = await self._lead(key, loader, recheck)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception() # Mark as retrieved in case nobody else is waiting
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _lead(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[T]],
+        recheck: Optional[Callable[[], Awaitable[T | None]]],
+    ) -> T:
+        if not self.redis or self.lock_ttl_ms <= 0 or recheck is None:
+            return await loader()
+
+        # Take a short lease so only one process loads the key. It is not released explicitly:
+        # it expires on its own, which also covers the window before the cache is populated.
+        try:
+            acquired = await self.redis.set(self._lock_key(key), "1", nx=True, px=self.lock_ttl_ms)
+        except RedisError as e:
+            logger.warning("single_flight_lock_error", key=key, error=str(e))
+            return await loader()
+
+        if acquired:
+            self.locks_acquired += 1
+            return await loader()
+
+        # Another process is loading: wait for it to populate the cache
+        self.locks_contended += 1
+        deadline = asyncio.get_running_loop().time() + self.lock_wait_ms / 1000
+        while asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(self.lock_poll_ms / 1000)
+            value = await recheck()
+            if value is not None:
+                self.lock_wait_hits += 1
+                return value
+
+        logger.debug("single_flight_lock_wait_timeout", key=key)
+        return await loader()
+
+    def stats(self) -> dict:
+        return {
+            "inflight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "locks_acquired": self.locks_acquired,
+            "locks_contended": self.locks_contended,
+            "lock_wait_hits": self.lock_wait_hits,
+        }
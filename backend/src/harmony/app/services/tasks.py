@@ -0,0 +1,61 @@
+import asyncio
+import inspect
+from typing import Callable, Any
+import structlog
+
+from harmony.app.db import ScopedSession
+
+logger = structlog.get_logger(__name__)
+
+class BackgroundTaskQueue:
+    '''
+    App-scoped TaskQueue: runs each task as its own asyncio task, right away instead of after the response
+    (as Starlette's per-request BackgroundTasks did), so it can be shared by app-scoped services.
+
+    Each task runs in its own database session scope, since the request that scheduled it may have
+    ended (and closed its session) by the time the task touches Postgres.
+    Pending tasks are awaited on shutdown.
+    '''
+
+    def __init__(self, db: ScopedSession | None = None):
+        self.db = db
+        self._tasks: set[asyncio.Task] = set()
+
+        # Counters
+        self.scheduled = 0
+        self.failed = 0
+
+    def add_task(self, func: Callable, *args: Any, **kwargs: Any) -> None:
+        self.scheduled += 1
+        task = asyncio.create_task(self._run(func, *args, **kwargs))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, func: Callable, *args: Any, **kwargs: Any):
+        try:
+            if self.db is None:
+                await self._call(func, *args, **kwargs)
+            else:
+                async with self.db.scope():
+                    await self._call(func, *args, **kwargs)
+        except Exception:
+            self.failed += 1
+            logger.exception("background_task_failed", task=getattr(func, "__qualname__", repr(func)))
+
+    @staticmethod
+    async def _call(func: Callable, *args: Any, **kwargs: Any):
+        result = func(*args, **kwargs)
+        if inspect.isawaitable(result):
+            await result
+
+    async def drain(self):
+        """Waits for the pending tasks."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._tasks),
+            "scheduled": self.scheduled,
+            "failed": self.failed,
+        }
@@ -1,6 +1,5 @@
 import uuid
 from harmony.app.core.settings import UserConfig
-from harmony.app.models.outbox import OutboxEvent
 from sqlalchemy.ext.asyncio import AsyncSession
 import structlog
 
@@ -46,11 +45,11 @@ class UserCommands(Command):
         async with self.transaction_handler("delete_user", user_id=user_id):
             await self.user_data_repo.make_user_tombstone(user_id=user_id)
 
-            self.session.add(OutboxEvent(
+            self.emit(
                 aggregate_type=self.cfg.topic,
                 aggregate_id=str(user_id),
                 event_type="TOMBSTONED",
                 payload={}
-            ))
+            )
             
         logger.info("user_tombstoned", user_id=str(user_id))
\ No newline at end of file
@@ -10,6 +10,10 @@ class UserEventHandler:
     @staticmethod
     def _user_cache_key(user_id: uuid.UUID) -> str:
         return f"user:{user_id}"
+
+    @staticmethod
+    def _user_chats_key(user_id: uuid.UUID) -> str:
+        return f"user:{user_id}:chats"
     
     def __init__(
         self,
@@ -19,6 +23,5 @@ class UserEventHandler:
 
     async def on_delete_user(self, user_id: uuid.UUID):
         if self.cache_service:
-            # Invalidate any cached user data to prevent stale reads of deleted user
-            cache_key = self._user_cache_key(user_id)
-            await self.cache_service.delete(cache_key)
\ No newline at end of file
+            # Invalidate any cached user data (profile, chat list) to prevent stale reads of deleted user
+            await self.cache_service.delete_many([self._user_cache_key(user_id), self._user_chats_key(user_id)])
\ No newline at end of file
@@ -1,17 +1,23 @@
 import uuid
+import json
+import base64
+import binascii
 import asyncio
+from datetime import datetime
 from typing import Optional, List
 from harmony.app.core.exceptions import NotFoundError, ValidationError, InternalServerError
 from sqlalchemy.ext.asyncio import AsyncSession
 import structlog
 
-from harmony.app.core import CacheConfig
+from harmony.app.core import CacheConfig, UserConfig
 from harmony.app.repositories import UserDataRepository, UserChatRepository
 from harmony.app.schemas import UserChatItem, UserSchema
 from harmony.app.models import User
 from harmony.app.core.interfaces import TaskQueue
+from harmony.app.db import release_connection
 from pydantic import EmailStr, TypeAdapter
 from ..cache import CacheService
+from ..singleflight import SingleFlight
 
 email_adapter = TypeAdapter(EmailStr)
 
@@ -26,6 +32,29 @@ class UserQueries:
     def _user_cache_key(user_id: uuid.UUID) -> str:
         return f"user:{user_id}"
 
+    @staticmethod
+    def _user_chats_key(user_id: uuid.UUID) -> str:
+        return f"user:{user_id}:chats"
+
+    @staticmethod
+    def _search_key(query: str, limit: int) -> str:
+        return f"user-search:{limit}:{query}"
+
+    @staticmethod
+    def _encode_chats_cursor(last_message_at: datetime, chat_id: uuid.UUID) -> str:
+        payload = json.dumps({"t": last_message_at.isoformat(), "c": str(chat_id)}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).rstrip(b"=").decode()
+
+    @staticmethod
+    def _decode_chats_cursor(cursor: str | None) -> tuple[datetime, uuid.UUID] | None:
+        if cursor is None:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            return datetime.fromisoformat(payload["t"]), uuid.UUID(payload["c"])
+        except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+            raise ValidationError("Invalid chats cursor.")
+
     def __init__(
         self, 
         session: AsyncSession,
@@ -34,6 +63,9 @@ class UserQueries:
         cache_config: CacheConfig,
         cache_service: Optional[CacheService] = None,
         task_queue: Optional[TaskQueue] = None,
+        single_flight: Optional[SingleFlight] = None,
+        default_chats_limit: int = 50,
+        user_config: UserConfig = UserConfig(),
     ):
         self.session = session
         self.user_data_repo = user_data_repository
@@ -41,25 +73,65 @@ class UserQueries:
         self.cache_service = cache_service
         self.task_queue = task_queue
         self.cache_config = cache_config
+        self.single_flight = single_flight
+        self.default_chats_limit = default_chats_limit
+        self.user_config = user_config
+
+    async def _coalesce(self, key: str, loader, recheck=None):
+        if self.single_flight is None:
+            return await loader()
+        return await self.single_flight.do(key, loader, recheck if self.cache_service else None)
         
     async def get_user_by_id(self, user_id: uuid.UUID) -> UserSchema:
         # 1. Try to fetch from cache first
-        if self.cache_service:
-            cache_key = self._user_cache_key(user_id)
-            cached_user = await self.cache_service.get_json(cache_key)
-            if cached_user:
-                logger.debug("get_user_by_id_cache_hit", user_id=str(user_id))
-                return UserSchema.model_validate(cached_user)
-            logger.debug("get_user_by_id_cache_miss", user_id=str(user_id))
+        user = await self.get_cached_user(user_id)
+        if user is not None:
+            return user
 
         # 2. Fetch from database
+        return await self.fetch_user(user_id)
+
+    async def get_cached_user(self, user_id: uuid.UUID) -> UserSchema | None:
+        """Cache-only user lookup. Returns None if the user is not cached."""
+        if not self.cache_service:
+            return None
+
+        cached_user = await self.cache_service.get_json(self._user_cache_key(user_id))
+        return self.parse_cached_user(user_id, cached_user)
+
+    def parse_cached_user(self, user_id: uuid.UUID, cached_user: dict | None) -> UserSchema | None:
+        if not cached_user:
+            logger.debug("get_user_by_id_cache_miss", user_id=str(user_id))
+            return None
+        if self.cache_service.is_missing(cached_user):
+            raise NotFoundError("User does not exist.")
+
+        logger.debug("get_user_by_id_cache_hit", user_id=str(user_id))
+        return UserSchema.model_validate(cached_user)
+
+    async def fetch_user(self, user_id: uuid.UUID) -> UserSchema:
+        """Database user lookup (coalesced per key) that populates the cache."""
+        return await self._coalesce(
+            self._user_cache_key(user_id),
+            lambda: self._load_user(user_id),
+            lambda: self.get_cached_user(user_id),
+        )
+
+    async def _load_user(self, user_id: uuid.UUID) -> UserSchema:
         user = await self.user_data_repo.get_user_by_id(user_id)
+        await release_connection(self.session) # Read-only: free the connection before the rest of the request
         if not user:
             logger.warning("get_user_not_found", user_id=str(user_id))
+            # Remember the miss briefly so repeated lookups don't reach the database
+            if self.cache_service:
+                self.task_queue.add_task(
+                    self.cache_service.set_json,
+                    self._user_cache_key(user_id), self.cache_service.MISSING, ttl=self.cache_config.negative_ttl_seconds
+                )
             raise NotFoundError("User does not exist.")
         user = UserSchema.model_validate(user)
         
-        # 3. Cache the result for future lookups
+        # Cache the result for future lookups
         if self.cache_service:
             cache_key = self._user_cache_key(user_id)
             self.task_queue.add_task(
@@ -78,6 +150,7 @@ class UserQueries:
             raise ValidationError("Invalid email format.")
         
         user = await self.user_data_repo.get_user_by_email(email)
+        await release_connection(self.session)
         if not user:
             logger.warning("get_user_by_email_not_found", email=email)
             raise NotFoundError("User does not exist.")
@@ -85,11 +158,37 @@ class UserQueries:
             return user
         return UserSchema.model_validate(user)
     
-    async def search_users_by_email(self, email_query: str, limit: int = 10) -> list[UserSchema]:
-        if not email_query or len(email_query) < 2:
+    async def search_users(self, query: str, limit: int = 10) -> list[UserSchema]:
+        """
+        Active users whose email or username contains the query, most similar first.
+        Results are cached briefly per (query, limit), so popular prefixes typed by many users hit Redis.
+        """
+        query = query.strip().lower() if query else ""
+        if len(query) < self.user_config.search_min_query_length:
             return []
-        users = await self.user_data_repo.search_users_by_email(email_query, limit=limit)
-        return [UserSchema.model_validate(user) for user in users]
+
+        # 1. Try the cache
+        use_cache = self.cache_service is not None and self.cache_config.user_search_ttl_seconds > 0
+        if use_cache:
+            cached = await self.cache_service.get_json(self._search_key(query, limit))
+            if cached:
+                logger.debug("search_users_cache_hit", query=query)
+                return [UserSchema.model_validate(user) for user in cached["users"]]
+
+        # 2. Search the trigram indexes
+        users = await self.user_data_repo.search_users(query, limit=limit, candidate_limit=self.user_config.search_candidate_limit)
+        await release_connection(self.session)
+        users = [UserSchema.model_validate(user) for user in users]
+
+        # 3. Cache the result
+        if use_cache:
+            self.task_queue.add_task(
+                self.cache_service.set_json,
+                self._search_key(query, limit),
+                {"users": [user.model_dump(mode="json") for user in users]},
+                ttl=self.cache_config.user_search_ttl_seconds
+            )
+        return users
 
     async def check_user_exists(self, user_id: uuid.UUID) -> bool:
         """
@@ -101,13 +200,45 @@ class UserQueries:
             return False
         return user is not None
 
-    async def get_user_chats(self, user_id: uuid.UUID) -> List[UserChatItem]:
+    async def get_user_chats(self, user_id: uuid.UUID, limit: int | None = 50, cursor: str | None = None) -> tuple[List[UserChatItem], str | None]:
+        """
+        One page of the user's chats, most recently active first, and the cursor of the next page (None on the last one).
+        A limit of None returns every chat (after the cursor, if any) in one page.
+        The first page of the default size is cached per user and invalidated by membership CDC events;
+        its activity order may lag by up to user_chats_ttl_seconds.
+        """
+        before = self._decode_chats_cursor(cursor)
+        cacheable = self.cache_service is not None and before is None and limit == self.default_chats_limit
+
+        # 1. Try the cached first page
+        if cacheable:
+            cached = await self.cache_service.get_json(self._user_chats_key(user_id))
+            if cached:
+                logger.debug("get_user_chats_cache_hit", user_id=str(user_id))
+                return [UserChatItem.model_validate(chat) for chat in cached["chats"]], cached["next_cursor"]
+
+        # 2. Fetch one extra row to know whether there is a next page
         try:
-            rows = await self.user_chat_repo.get_user_chats(user_id=user_id)
-            return [UserChatItem(chat_id=row.chat_id, meta=row.meta) for row in rows]
+            rows = await self.user_chat_repo.get_user_chats(user_id=user_id, limit=limit + 1 if limit is not None else None, before=before)
+            await release_connection(self.session)
         except Exception as e:
             logger.exception("get_user_chats_failed", user_id=str(user_id))
             raise InternalServerError("An unexpected error occurred while fetching user chats.")
+
+        chats = [UserChatItem(chat_id=row.chat_id, meta=row.meta, last_message_at=row.last_message_at) for row in rows[:limit]]
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            next_cursor = self._encode_chats_cursor(chats[-1].last_message_at, chats[-1].chat_id)
+
+        # 3. Cache the first page
+        if cacheable:
+            self.task_queue.add_task(
+                self.cache_service.set_json,
+                self._user_chats_key(user_id),
+                {"chats": [chat.model_dump(mode="json") for chat in chats], "next_cursor": next_cursor},
+                ttl=self.cache_config.user_chats_ttl_seconds
+            )
+        return chats, next_cursor
         
     async def get_users_dict(self, user_ids: list[uuid.UUID]) -> dict[uuid.UUID, UserSchema]:
         if not user_ids: 
@@ -123,6 +254,8 @@ class UserQueries:
 
             # Sort out hits vs misses
             for uid, cached_data in zip(user_ids, cache_results):
+                if self.cache_service.is_missing(cached_data):
+                    continue # Known not to exist
                 if isinstance(cached_data, dict):
                     result_dict[uid] = UserSchema.model_validate(cached_data)
                 else:
@@ -133,6 +266,7 @@ class UserQueries:
         # 2. Bulk Database Fetch for Misses
         if uncached_ids:
             db_users = await self.user_data_repo.get_users_by_ids(uncached_ids)
+            await release_connection(self.session)
             cache_mapping = {}
 
             for uid, user in db_users.items():
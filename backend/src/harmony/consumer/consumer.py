@@ -1,23 +1,55 @@
 import json
 import asyncio
-from aiokafka import AIOKafkaConsumer
+import contextlib
+from aiokafka import AIOKafkaConsumer, ConsumerRebalanceListener, TopicPartition
 from aiokafka.errors import KafkaError
 from harmony.app.core.settings import KafkaConsumerConfig
 import structlog
 
-from .router import EventRouter
+from .router import EventRouter, MAX_ATTEMPTS
 from .context import ConsumerContext
+from .partition import PartitionWorker
 
 logger = structlog.get_logger(__name__)
 
+class _DrainOnRevoke(ConsumerRebalanceListener):
+    """Finishes and commits in-flight work of revoked partitions before they are reassigned."""
+    def __init__(self, consumer: "CDCConsumer"):
+        self.consumer = consumer
+
+    async def on_partitions_revoked(self, revoked):
+        await self.consumer._release_partitions(revoked)
+
+    async def on_partitions_assigned(self, assigned):
+        pass
+
 class CDCConsumer:
+    '''
+    Consumes CDC events and routes them to the event handlers.
+
+    Processing modes (KafkaConsumerConfig.processing_mode):
+        sequential: One message at a time, committing after each message.
+        concurrent: Each assigned partition gets a PartitionWorker. Events for different aggregates run in parallel,
+                    events for the same aggregate keep their order, and offsets are committed as a watermark
+                    of contiguously completed messages.
+        batch:      Each poll batch is decoded and routed in order while the cache deletes it produces are merged
+                    into one pipelined DEL. Offsets are committed once commit_batch_size messages or
+                    commit_interval_ms have accumulated (always after the batch's invalidations are flushed).
+                    If the DEL fails, the batch is not committed: its partitions are rewound and it is processed again.
+
+    Failures:
+        With a dead-letter topic configured, events that still fail after the router's retries (and malformed
+        messages) are published to the DLQ and the partition moves on. Without one, or if the DLQ publish fails,
+        the worker stops without committing past the failed message.
+    '''
+
     def __init__(self, config: KafkaConsumerConfig, router: EventRouter, context: ConsumerContext):
         self.cfg = config
         self.router = router
         self.context = context
         self.topics = list(self.context.settings.topics.model_dump().values())
+        self._workers: dict[TopicPartition, PartitionWorker] = {}
         self.consumer = AIOKafkaConsumer(
-            *self.topics,
             bootstrap_servers=self.cfg.bootstrap_servers,
             group_id=self.cfg.group_id,
             enable_auto_commit=False,
@@ -29,26 +61,21 @@ class CDCConsumer:
         )
 
     async def start(self, stop_event: asyncio.Event):
+        if self.cfg.processing_mode == "concurrent":
+            self.consumer.subscribe(self.topics, listener=_DrainOnRevoke(self))
+        else:
+            self.consumer.subscribe(self.topics)
+
         await self.consumer.start()
-        logger.info("cdc_consumer_started", topics=self.topics)
+        logger.info("cdc_consumer_started", topics=self.topics, processing_mode=self.cfg.processing_mode)
         
         try:
-            while not stop_event.is_set():
-                msg_batch = await self.consumer.getmany(timeout_ms=self.cfg.poll_timeout_ms)
-                
-                for tp, messages in msg_batch.items():
-                    for msg in messages:
-                        if stop_event.is_set():
-                            break
-
-                        success = await self.process_message(msg)
-                        
-                        if success:
-                            await self.consumer.commit({tp: msg.offset + 1})
-                        else:
-                            # TODO: Implement a proper DLQ mechanism. For now, we log and skip the message to prevent blocking.
-                            logger.critical("fatal_processing_error", offset=msg.offset)
-                            raise Exception(f"Failed to process message {msg.offset}. Crashing consumer to prevent data loss.")
+            if self.cfg.processing_mode == "concurrent":
+                await self._run_concurrent(stop_event)
+            elif self.cfg.processing_mode == "batch":
+                await self._run_batched(stop_event)
+            else:
+                await self._run_sequential(stop_event)
         except KafkaError as ke:
             logger.exception("kafka_consumer_error")
         except Exception as e:
@@ -57,43 +84,189 @@ class CDCConsumer:
             # await self.consumer.stop() # doesn't seem to be working reliably
             logger.info("cdc_consumer_stopped")
 
-    async def process_message(self, msg) -> bool:
+    async def _run_sequential(self, stop_event: asyncio.Event):
+        while not stop_event.is_set():
+            msg_batch = await self.consumer.getmany(timeout_ms=self.cfg.poll_timeout_ms)
+            
+            for tp, messages in msg_batch.items():
+                for msg in messages:
+                    if stop_event.is_set():
+                        break
+
+                    success = await self.process_message(msg)
+                    
+                    if success:
+                        await self.consumer.commit({tp: msg.offset + 1})
+                    else:
+                        # Only reached when the DLQ is disabled or could not be written
+                        logger.critical("fatal_processing_error", offset=msg.offset)
+                        raise Exception(f"Failed to process message {msg.offset}. Crashing consumer to prevent data loss.")
+
+    async def _run_batched(self, stop_event: asyncio.Event):
+        loop = asyncio.get_running_loop()
+        offsets: dict[TopicPartition, int] = {}
+        uncommitted = 0
+        last_commit = loop.time()
+
+        try:
+            while not stop_event.is_set():
+                msg_batch = await self.consumer.getmany(timeout_ms=self.cfg.poll_timeout_ms)
+                batch_offsets: dict[TopicPartition, int] = {}
+                processed = 0
+                deferred = None
+
+                # Invalidations are flushed when the block exits, before any offset is committed
+                try:
+                    async with self._deferred_deletes() as deferred:
+                        for tp, messages in msg_batch.items():
+                            for msg in messages:
+                                if not await self.process_message(msg):
+                                    logger.critical("fatal_processing_error", offset=msg.offset)
+                                    raise Exception(f"Failed to process message {msg.offset}. Crashing consumer to prevent data loss.")
+                                batch_offsets[tp] = msg.offset + 1
+                                processed += 1
+                finally:
+                    # Only what was processed and invalidated counts (also on error, for the final commit)
+                    flushed = deferred is None or deferred.flushed
+                    if flushed:
+                        offsets.update(batch_offsets)
+                        uncommitted += processed
+
+                if not flushed:
+                    # The batch's invalidations were lost: rewind its partitions and process it again
+                    logger.warning("cdc_batch_invalidations_failed", partitions=[str(tp) for tp in msg_batch])
+                    for tp, messages in msg_batch.items():
+                        self.consumer.seek(tp, messages[0].offset)
+                    await asyncio.sleep(self.cfg.poll_timeout_ms / 1000)
+                    continue
+
+                due = (loop.time() - last_commit) * 1000 >= self.cfg.commit_interval_ms
+                if offsets and (uncommitted >= self.cfg.commit_batch_size or due):
+                    await self.consumer.commit(offsets)
+                    logger.debug("cdc_batch_committed", message_count=uncommitted)
+                    offsets, uncommitted, last_commit = {}, 0, loop.time()
+        finally:
+            # Commit everything processed so far (up to, not including, a failed message)
+            if offsets:
+                await self.consumer.commit(offsets)
+
+    def _deferred_deletes(self):
+        if self.context.cache_service is None:
+            return contextlib.nullcontext()
+        return self.context.cache_service.deferred_deletes()
+
+    async def _run_concurrent(self, stop_event: asyncio.Event):
+        try:
+            while not stop_event.is_set():
+                # Poll briefly while partitions are paused so they resume as soon as they drain
+                paused = self.consumer.paused()
+                timeout_ms = min(self.cfg.poll_timeout_ms, 50) if paused else self.cfg.poll_timeout_ms
+                msg_batch = await self.consumer.getmany(timeout_ms=timeout_ms)
+
+                for tp, messages in msg_batch.items():
+                    worker = self._workers.get(tp)
+                    if worker is None:
+                        worker = self._workers[tp] = PartitionWorker(tp, self.process_event, self.cfg.max_concurrency_per_partition)
+                    for msg in messages:
+                        worker.submit(msg, self.decode_message(msg))
+
+                await self._commit_watermarks(list(self._workers))
+                self._apply_backpressure()
+
+                failed = {tp: w.failed_offset for tp, w in self._workers.items() if w.failed_offset is not None}
+                if failed:
+                    logger.critical("fatal_processing_error", failed_offsets={str(tp): o for tp, o in failed.items()})
+                    raise Exception(f"Failed to process messages {failed}. Crashing consumer to prevent data loss.")
+        finally:
+            # Let in-flight work finish and commit how far each partition got
+            await self._release_partitions(list(self._workers))
+
+    def _apply_backpressure(self):
+        paused = self.consumer.paused()
+        for tp, worker in self._workers.items():
+            if worker.in_flight >= self.cfg.max_in_flight_per_partition and tp not in paused:
+                self.consumer.pause(tp)
+            elif worker.in_flight < self.cfg.max_in_flight_per_partition // 2 and tp in paused:
+                self.consumer.resume(tp)
+
+    async def _commit_watermarks(self, partitions: list[TopicPartition]):
+        offsets = {}
+        for tp in partitions:
+            worker = self._workers.get(tp)
+            offset = worker.tracker.to_commit() if worker else None
+            if offset is not None:
+                offsets[tp] = offset
+
+        if not offsets:
+            return
+        await self.consumer.commit(offsets)
+        for tp, offset in offsets.items():
+            self._workers[tp].tracker.committed(offset)
+
+    async def _release_partitions(self, partitions: list[TopicPartition]):
+        partitions = [tp for tp in partitions if tp in self._workers]
+        await asyncio.gather(*(self._workers[tp].drain() for tp in partitions))
+        try:
+            await self._commit_watermarks(partitions)
+        except KafkaError:
+            logger.exception("watermark_commit_failed", partitions=[str(tp) for tp in partitions])
+        for tp in partitions:
+            self._workers.pop(tp, None)
+
+    @staticmethod
+    def decode_message(msg) -> dict | None:
+        """Decodes a CDC message. Returns None (and logs) if it is malformed and should be skipped."""
         try:
             body = json.loads(msg.value.decode("utf-8")) if msg.value else {}
 
             if isinstance(body, str):
                 body = json.loads(body)
-            
-            event_type = body.get("event_type")
-            aggregate_id = body.get("aggregate_id")
-            event_id = body.get("event_id")
-            payload = body.get("payload", {})
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            logger.error("poison_pill_invalid_json", offset=msg.offset)
+            return None
+
+        if not isinstance(body, dict) or not body.get("event_type") or not body.get("aggregate_id") or not body.get("event_id"):
+            logger.warning("skipping_invalid_message", topic=msg.topic, offset=msg.offset)
+            return None
+        return body
+
+    async def process_message(self, msg) -> bool:
+        return await self.process_event(msg, self.decode_message(msg))
+
+    async def process_event(self, msg, event: dict | None) -> bool:
+        if event is None:
+            # Quarantine malformed messages for manual inspection (skipped either way)
+            if self.context.dlq:
+                await self._dead_letter(msg, "Malformed CDC message", attempts=1)
+            return True
 
-            topic = msg.topic
-            offset = msg.offset
+        topic = msg.topic
+        offset = msg.offset
+        event_type = event["event_type"]
+        aggregate_id = event["aggregate_id"]
+        event_id = event["event_id"]
+        payload = event.get("payload", {})
 
-            if not event_type or not aggregate_id or not event_id:
-                logger.warning("skipping_invalid_message", topic=topic, offset=offset)
+        # Bind context variables so all logs in this trace have the ID
+        with structlog.contextvars.bound_contextvars(
+            topic=topic, event_type=event_type, aggregate_id=aggregate_id, event_id=event_id, offset=offset
+        ):
+            logger.info("processing_cdc_event")
+            
+            try:
+                await self.router.route_event(topic, event_type, aggregate_id, payload, self.context)
+                logger.info("cdc_event_processed_successfully")
                 return True
+            except Exception as e:
+                logger.exception("fatal_processing_error")
+                if self.context.dlq:
+                    return await self._dead_letter(msg, f"{type(e).__name__}: {e}", attempts=MAX_ATTEMPTS)
+                return False
 
-            # Bind context variables so all logs in this trace have the ID
-            with structlog.contextvars.bound_contextvars(
-                topic=topic, event_type=event_type, aggregate_id=aggregate_id, event_id=event_id, offset=offset
-            ):
-                logger.info("processing_cdc_event")
-                
-                try:
-                    await self.router.route_event(topic, event_type, aggregate_id, payload, self.context)
-                    logger.info("cdc_event_processed_successfully")
-                    return True
-                except Exception as e:
-                    logger.exception("fatal_processing_error")
-                    return False
-
-        except json.JSONDecodeError:
-            logger.error("poison_pill_invalid_json", offset=offset)
-            # TODO: Send to a Dead Letter Queue for manual inspection
-            return True 
-        except Exception as e:
-            logger.exception("unexpected_consumer_error", offset=offset)
+    async def _dead_letter(self, msg, error: str, attempts: int) -> bool:
+        try:
+            await self.context.dlq.send(msg, error=error, attempts=attempts)
+            return True
+        except Exception:
+            logger.exception("dead_letter_publish_failed", topic=msg.topic, offset=msg.offset)
             return False
\ No newline at end of file
@@ -1,10 +1,14 @@
 from dataclasses import dataclass
-from harmony.app.services import ChatEventHandler, UserEventHandler, MessageEventHandler
+from typing import Optional
+from harmony.app.services import ChatEventHandler, UserEventHandler, MessageEventHandler, CacheService
 from harmony.app.core import get_consumer_settings, ConsumerSettings
+from .dlq import DeadLetterQueue
 
 @dataclass
 class ConsumerContext:
     chat_handler: ChatEventHandler
     user_handler: UserEventHandler
     msg_handler: MessageEventHandler
-    settings: ConsumerSettings
\ No newline at end of file
+    settings: ConsumerSettings
+    cache_service: Optional[CacheService] = None
+    dlq: Optional[DeadLetterQueue] = None
\ No newline at end of file
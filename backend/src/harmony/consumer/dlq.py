@@ -0,0 +1,50 @@
+from datetime import datetime, timezone
+from aiokafka import AIOKafkaProducer
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Headers attached to every dead-lettered message
+ERROR_HEADER = "x-dlq-error"
+ATTEMPTS_HEADER = "x-dlq-attempts"
+SOURCE_TOPIC_HEADER = "x-dlq-source-topic"
+SOURCE_PARTITION_HEADER = "x-dlq-source-partition"
+SOURCE_OFFSET_HEADER = "x-dlq-source-offset"
+FAILED_AT_HEADER = "x-dlq-failed-at"
+
+class DeadLetterQueue:
+    '''
+    Publishes events that could not be processed to a dead-letter topic, so the source partition keeps moving.
+
+    The original key and value are kept as-is. The error, the total attempt count and the source
+    topic/partition/offset travel in headers, which is what `harmony.consumer.replay` reads to re-drive them.
+    '''
+
+    def __init__(self, producer: AIOKafkaProducer, topic: str):
+        self.producer = producer
+        self.topic = topic
+
+    @staticmethod
+    def headers_of(msg) -> dict[str, str]:
+        return {key: value.decode("utf-8") for key, value in (msg.headers or [])}
+
+    async def send(self, msg, error: str, attempts: int, source_topic: str | None = None, source_partition: int | None = None, source_offset: int | None = None):
+        """
+        Dead-letters a message and waits for the broker to ack it.
+        The source defaults to the message itself (pass it explicitly when re-dead-lettering a replayed message).
+        """
+        headers = {
+            ERROR_HEADER: error[:1000],
+            ATTEMPTS_HEADER: str(attempts),
+            SOURCE_TOPIC_HEADER: source_topic or msg.topic,
+            SOURCE_PARTITION_HEADER: str(msg.partition if source_partition is None else source_partition),
+            SOURCE_OFFSET_HEADER: str(msg.offset if source_offset is None else source_offset),
+            FAILED_AT_HEADER: datetime.now(timezone.utc).isoformat(),
+        }
+        await self.producer.send_and_wait(
+            self.topic,
+            key=msg.key,
+            value=msg.value,
+            headers=[(key, value.encode("utf-8")) for key, value in headers.items()],
+        )
+        logger.warning("event_dead_lettered", dlq_topic=self.topic, **headers)
@@ -23,7 +23,8 @@ async def handle_user_left(aggregate_id: str, payload: dict, ctx: ConsumerContex
 @router.register(topic, "CHAT_DELETED")
 async def handle_chat_deleted(aggregate_id: str, payload: dict, ctx: ConsumerContext):
     chat_id = uuid.UUID(aggregate_id)
+    user_ids = [uuid.UUID(uid) for uid in payload.get("user_id_list", [])]
     await asyncio.gather(
-        ctx.chat_handler.on_chat_deleted(chat_id),
+        ctx.chat_handler.on_chat_deleted(chat_id, user_ids),
         ctx.msg_handler.on_chat_deleted(chat_id)
     )
\ No newline at end of file
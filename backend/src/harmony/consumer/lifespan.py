@@ -1,10 +1,12 @@
 from contextlib import asynccontextmanager, AsyncExitStack
 from harmony.app.core import get_consumer_settings
-from harmony.app.init import cache_connector, dynamodb_connector
+from harmony.app.init import cache_connector, dynamodb_connector, kafka_connector
+from harmony.app.db import DynamoWriteScheduler
 from harmony.app.repositories import ChatHistoryRepository
 from harmony.app.services import ChatEventHandler, UserEventHandler, MessageEventHandler
 from harmony.app.services.cache import CacheService
 from .context import ConsumerContext
+from .dlq import DeadLetterQueue
 
 @asynccontextmanager
 async def lifespan():
@@ -14,17 +16,25 @@ async def lifespan():
         # 1. Init Connections
         redis_client = await stack.enter_async_context(cache_connector(settings.redis))
         dynamo_client = await stack.enter_async_context(dynamodb_connector(settings.dynamodb, settings.aws))
+
+        dlq = None
+        if settings.kafka_consumer.dlq_topic:
+            producer = await stack.enter_async_context(kafka_connector(settings.kafka_producer))
+            dlq = DeadLetterQueue(producer, settings.kafka_consumer.dlq_topic)
         
         # 2. Init Repositories & Services
         cache_service = CacheService(redis_client, settings.cache)
-        chat_history_repo = ChatHistoryRepository(dynamo_client, settings.dynamodb)
+        write_scheduler = DynamoWriteScheduler(dynamo_client, settings.dynamodb)
+        chat_history_repo = ChatHistoryRepository(dynamo_client, settings.dynamodb, write_scheduler)
 
         # 3. Create Handlers & Context
         context = ConsumerContext(
             chat_handler=ChatEventHandler(cache_service),
             user_handler=UserEventHandler(cache_service),
-            msg_handler=MessageEventHandler(chat_history_repo),
-            settings=settings
+            msg_handler=MessageEventHandler(chat_history_repo, cache_service),
+            settings=settings,
+            cache_service=cache_service,
+            dlq=dlq
         )
         
         yield context
\ No newline at end of file
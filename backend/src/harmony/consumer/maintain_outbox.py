@@ -0,0 +1,56 @@
+"""
+Outbox retention: creates the upcoming daily partitions of outbox_events and drops expired ones
+once the CDC pipeline has consumed them (see OutboxMaintenance), logging the space reclaimed.
+
+Runs every OUTBOX__MAINTENANCE_INTERVAL_SECONDS until stopped, or once with --once (e.g. from a cron job).
+
+Usage:
+    python -m harmony.consumer.maintain_outbox [--once] [--force]
+"""
+import argparse
+import asyncio
+import signal
+import structlog
+
+from harmony.app.core import get_consumer_settings, setup_logging
+from harmony.app.init import postgres_connector
+from harmony.app.services import OutboxMaintenance
+
+logger = structlog.get_logger(__name__)
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Create and drop outbox_events partitions.")
+    parser.add_argument("--once", action="store_true", help="Run a single maintenance pass and exit")
+    parser.add_argument("--force", action="store_true", help="Drop expired partitions without waiting for the CDC replication slot")
+    return parser.parse_args()
+
+async def main():
+    args = parse_args()
+    settings = get_consumer_settings()
+    setup_logging(is_local_dev=(settings.app_env == "development"))
+    interval = settings.outbox.maintenance_interval_seconds
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    async with postgres_connector(False, settings.postgres) as session_factory:
+        maintenance = OutboxMaintenance(session_factory, settings.outbox)
+        while not stop_event.is_set():
+            try:
+                await maintenance.run(force=args.force)
+            except Exception:
+                if args.once:
+                    raise
+                logger.exception("outbox_maintenance_failed")
+
+            if args.once or interval == 0:
+                break
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+
+if __name__ == "__main__":
+    asyncio.run(main())
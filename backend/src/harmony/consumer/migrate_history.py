@@ -0,0 +1,90 @@
+"""
+Rewrites ChatHistory items into another item format (see ChatHistoryCodec), e.g. plain -> compact.
+
+The table is scanned in parallel segments and only items not already in the target format are rewritten.
+Each rewrite is a conditional PutItem on the existing key, so messages purged while the migration runs are
+skipped instead of being recreated. The puts go through a DynamoWriteScheduler, so the migration backs off
+on throttling like every other history write (--rate caps its adaptive write rate). Readers handle both formats, so the migration can run (and be stopped)
+at any time; switch DYNAMODB__CHAT_HISTORY_ITEM_FORMAT first so new messages are written in the target format.
+
+Usage:
+    python -m harmony.consumer.migrate_history [--to {compact,plain}] [--segments N] [--rate ITEMS_PER_SECOND] [--dry-run]
+"""
+import argparse
+import asyncio
+import signal
+from botocore.exceptions import ClientError
+import structlog
+
+from harmony.app.core import get_consumer_settings, setup_logging
+from harmony.app.db import ChatHistoryCodec, DynamoWriteScheduler
+from harmony.app.init import dynamodb_connector
+
+logger = structlog.get_logger(__name__)
+
+def parse_args() -> argparse.Namespace:
+    settings = get_consumer_settings()
+    parser = argparse.ArgumentParser(description="Migrate ChatHistory items between item formats.")
+    parser.add_argument("--to", choices=["compact", "plain"], default="compact", help="Target item format")
+    parser.add_argument("--segments", type=int, default=4, help="Parallel scan segments")
+    parser.add_argument("--rate", type=int, default=settings.dynamodb.write_max_capacity_per_second, help="Max items rewritten per second")
+    parser.add_argument("--dry-run", action="store_true", help="Count the items that would be rewritten without writing them")
+    return parser.parse_args()
+
+async def migrate_segment(client, scheduler: DynamoWriteScheduler, table_name: str, codec: ChatHistoryCodec, segment: int, total_segments: int,
+                          stop_event: asyncio.Event, counts: dict, dry_run: bool):
+    # Only fetch items that are not in the target format yet
+    condition = "attribute_not_exists(#v)" if codec.item_format == "compact" else "attribute_exists(#v)"
+    paginator = client.get_paginator("scan")
+    async for page in paginator.paginate(
+        TableName=table_name, Segment=segment, TotalSegments=total_segments, FilterExpression=condition,
+        ExpressionAttributeNames={"#v": "v"}
+    ):
+        for item in page.get("Items", []):
+            if stop_event.is_set():
+                return
+            counts["scanned"] += 1
+            if dry_run:
+                continue
+
+            # Keep the partition key as is (it carries the shard suffix in sharded tables)
+            chat_id = item["chat_id"]["S"].split("#", 1)[0]
+            new_item = codec.encode(ChatHistoryCodec.decode(item, chat_id=chat_id))
+            new_item["chat_id"] = item["chat_id"]
+            try:
+                await scheduler.put(table_name, new_item, ConditionExpression="attribute_exists(ulid)")
+                counts["migrated"] += 1
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    raise
+                counts["skipped"] += 1 # Deleted since it was scanned
+
+async def main():
+    args = parse_args()
+    settings = get_consumer_settings()
+    setup_logging(is_local_dev=(settings.app_env == "development"))
+    cfg = settings.dynamodb
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    codec = ChatHistoryCodec(
+        item_format=args.to,
+        compression=cfg.chat_history_compression,
+        compression_threshold_bytes=cfg.chat_history_compression_threshold_bytes,
+    )
+    counts = {"scanned": 0, "migrated": 0, "skipped": 0}
+
+    async with dynamodb_connector(cfg, settings.aws) as client:
+        scheduler = DynamoWriteScheduler(client, cfg.model_copy(update={"write_max_capacity_per_second": args.rate}))
+        logger.info("history_migration_started", table=cfg.chat_history_table_name, to=args.to, segments=args.segments, dry_run=args.dry_run)
+        await asyncio.gather(*(
+            migrate_segment(client, scheduler, cfg.chat_history_table_name, codec, segment, args.segments, stop_event, counts, args.dry_run)
+            for segment in range(args.segments)
+        ))
+        logger.info("history_migration_finished", interrupted=stop_event.is_set(), **counts, writes=scheduler.stats())
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable
+from aiokafka import TopicPartition
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+class OffsetTracker:
+    '''
+    Tracks in-flight offsets of one partition and computes the commit watermark:
+    the offset after the longest run of contiguously completed messages.
+    '''
+
+    def __init__(self):
+        self._pending: deque[int] = deque()
+        self._done: set[int] = set()
+        self._watermark: int | None = None
+        self._committed: int | None = None
+
+    def add(self, offset: int):
+        self._pending.append(offset)
+
+    def done(self, offset: int):
+        self._done.add(offset)
+        while self._pending and self._pending[0] in self._done:
+            completed = self._pending.popleft()
+            self._done.discard(completed)
+            self._watermark = completed + 1
+
+    def to_commit(self) -> int | None:
+        """Returns the watermark if it advanced since the last commit."""
+        if self._watermark is None or self._watermark == self._committed:
+            return None
+        return self._watermark
+
+    def committed(self, offset: int):
+        self._committed = offset
+
+
+class PartitionWorker:
+    '''
+    Processes the messages of one partition concurrently while keeping per-aggregate order.
+
+    Each message runs in its own task chained behind the previous message of the same aggregate,
+    so events of one aggregate run in offset order and events of different aggregates run in parallel
+    (at most max_concurrency at once). Once a message fails, later messages are left unprocessed
+    (and uncommitted) so the partition can be stopped without skipping anything.
+    '''
+
+    def __init__(
+        self,
+        tp: TopicPartition,
+        process: Callable[[object, dict | None], Awaitable[bool]],
+        max_concurrency: int,
+    ):
+        self.tp = tp
+        self.process = process
+        self.tracker = OffsetTracker()
+        self.failed_offset: int | None = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._chains: dict[str, asyncio.Task] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    def submit(self, msg, event: dict | None):
+        self.tracker.add(msg.offset)
+
+        # Messages without an aggregate have no ordering constraint
+        key = event.get("aggregate_id") if event else None
+        previous = self._chains.get(key) if key else None
+
+        task = asyncio.create_task(self._run(msg, event, previous))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        if key:
+            self._chains[key] = task
+            task.add_done_callback(lambda t: self._chains.pop(key) if self._chains.get(key) is t else None)
+
+    async def _run(self, msg, event: dict | None, previous: asyncio.Task | None):
+        if previous is not None:
+            await asyncio.wait([previous])
+
+        if self.failed_offset is not None:
+            return
+
+        async with self._semaphore:
+            success = await self.process(msg, event)
+
+        if success:
+            self.tracker.done(msg.offset)
+        elif self.failed_offset is None or msg.offset < self.failed_offset:
+            self.failed_offset = msg.offset
+
+    async def drain(self):
+        """Waits for every submitted message to finish."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
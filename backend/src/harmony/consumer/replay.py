@@ -0,0 +1,122 @@
+"""
+Re-drives dead-lettered CDC events through main_router at a controlled rate.
+
+Only the messages present in the DLQ when the replay starts are processed. Events that fail again are
+dead-lettered anew (with their attempt count increased and the original source kept), so a replay always ends.
+
+Usage:
+    python -m harmony.consumer.replay [--rate EVENTS_PER_SECOND] [--limit N] [--dry-run]
+"""
+import argparse
+import asyncio
+import signal
+from aiokafka import AIOKafkaConsumer, TopicPartition
+from aiolimiter import AsyncLimiter
+import structlog
+
+from harmony.app.core import get_consumer_settings, setup_logging
+
+from .consumer import CDCConsumer
+from .context import ConsumerContext
+from .dlq import DeadLetterQueue, ATTEMPTS_HEADER, SOURCE_TOPIC_HEADER, SOURCE_PARTITION_HEADER, SOURCE_OFFSET_HEADER
+from .handlers import main_router
+from .lifespan import lifespan
+from .router import MAX_ATTEMPTS
+
+logger = structlog.get_logger(__name__)
+
+def parse_args() -> argparse.Namespace:
+    settings = get_consumer_settings()
+    parser = argparse.ArgumentParser(description="Replay dead-lettered CDC events.")
+    parser.add_argument("--rate", type=float, default=settings.kafka_consumer.replay_rate_per_second, help="Events replayed per second")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after replaying this many events")
+    parser.add_argument("--dry-run", action="store_true", help="Log the events that would be replayed without routing or committing them")
+    return parser.parse_args()
+
+async def replay_message(msg, context: ConsumerContext) -> bool:
+    """Routes one dead-lettered message to its original handler. Returns False if it was dead-lettered again."""
+    headers = DeadLetterQueue.headers_of(msg)
+    event = CDCConsumer.decode_message(msg)
+    if event is None:
+        logger.warning("replay_skipped_malformed_event", offset=msg.offset)
+        return True
+
+    source_topic = headers[SOURCE_TOPIC_HEADER]
+    with structlog.contextvars.bound_contextvars(
+        source_topic=source_topic, event_type=event["event_type"], aggregate_id=event["aggregate_id"], event_id=event["event_id"]
+    ):
+        try:
+            await main_router.route_event(source_topic, event["event_type"], event["aggregate_id"], event.get("payload", {}), context)
+            logger.info("replayed_event")
+            return True
+        except Exception as e:
+            logger.exception("replay_failed")
+            await context.dlq.send(
+                msg,
+                error=f"{type(e).__name__}: {e}",
+                attempts=int(headers.get(ATTEMPTS_HEADER, 0)) + MAX_ATTEMPTS,
+                source_topic=source_topic,
+                source_partition=int(headers[SOURCE_PARTITION_HEADER]),
+                source_offset=int(headers[SOURCE_OFFSET_HEADER]),
+            )
+            return False
+
+async def main():
+    args = parse_args()
+    settings = get_consumer_settings()
+    setup_logging(is_local_dev=(settings.app_env == "development"))
+    cfg = settings.kafka_consumer
+
+    if not cfg.dlq_topic:
+        logger.error("replay_requires_dlq_topic")
+        return
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    async with lifespan() as context:
+        consumer = AIOKafkaConsumer(
+            bootstrap_servers=cfg.bootstrap_servers,
+            group_id=f"{cfg.group_id}-replay",
+            enable_auto_commit=False,
+            auto_offset_reset="earliest",
+        )
+        await consumer.start()
+        try:
+            # Pin the replay to what is in the DLQ right now
+            await consumer.topics()
+            partitions = [TopicPartition(cfg.dlq_topic, p) for p in consumer.partitions_for_topic(cfg.dlq_topic) or []]
+            consumer.assign(partitions)
+            end_offsets = await consumer.end_offsets(partitions)
+            remaining = {tp for tp in partitions if await consumer.position(tp) < end_offsets[tp]}
+
+            limiter = AsyncLimiter(args.rate, 1)
+            replayed = failed = 0
+            logger.info("replay_started", dlq_topic=cfg.dlq_topic, rate=args.rate, dry_run=args.dry_run)
+
+            while remaining and not stop_event.is_set() and (args.limit is None or replayed < args.limit):
+                msg_batch = await consumer.getmany(*remaining, timeout_ms=cfg.poll_timeout_ms)
+                for tp, messages in msg_batch.items():
+                    for msg in messages:
+                        if msg.offset >= end_offsets[tp] or stop_event.is_set() or (args.limit is not None and replayed >= args.limit):
+                            break
+
+                        if args.dry_run:
+                            logger.info("replay_dry_run_event", offset=msg.offset, **DeadLetterQueue.headers_of(msg))
+                        else:
+                            async with limiter:
+                                failed += not await replay_message(msg, context)
+                            await consumer.commit({tp: msg.offset + 1})
+                        replayed += 1
+
+                    if await consumer.position(tp) >= end_offsets[tp]:
+                        remaining.discard(tp)
+
+            logger.info("replay_finished", replayed=replayed, failed_again=failed)
+        finally:
+            await consumer.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
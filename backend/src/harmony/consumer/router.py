@@ -8,6 +8,9 @@ logger = structlog.get_logger(__name__)
 
 EventHandler = Callable[[str, dict, ConsumerContext], Awaitable[None]]
 
+# Attempts made by route_event before an event is considered failed
+MAX_ATTEMPTS = 3
+
 class EventRouter:
     def __init__(self):
         self._routes: Dict[Tuple[str, str], EventHandler] = {}
@@ -30,7 +33,7 @@ class EventRouter:
         await handler(aggregate_id, payload, ctx)
 
     @retry(
-        stop=stop_after_attempt(3),
+        stop=stop_after_attempt(MAX_ATTEMPTS),
         wait=wait_exponential(multiplier=1),
         before_sleep=before_sleep_log(logger, logging.WARNING),
         reraise=True
@@ -17,4 +17,5 @@ def app_client(raw_client):
 
 def pytest_configure(config):
     config.addinivalue_line("markers", "stress: Marks tests as stress tests")
-    config.addinivalue_line("markers", "integration: Marks tests as integration tests")
\ No newline at end of file
+    config.addinivalue_line("markers", "integration: Marks tests as integration tests")
+    config.addinivalue_line("markers", "unit: Marks tests that need no running services")
\ No newline at end of file
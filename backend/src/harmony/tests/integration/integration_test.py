@@ -23,6 +23,7 @@ Run with:  task test:integration
 Marker:    @pytest.mark.integration
 """
 import uuid
+import asyncio
 
 import pytest
 from httpx import HTTPStatusError
@@ -155,6 +156,52 @@ async def test_delete_chat_removes_from_all_members(app_client: AppClient):
         await assert_chat_not_in_list(ctx.actor(i), chat_id)
 
 
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_my_chats_pages_return_every_chat_once_by_activity(app_client: AppClient):
+    """
+    Actor 0 is in 7 chats; some get messages so last_message_at differs.
+    Paging 3 at a time through next_cursor must return each chat exactly once,
+    most recently active first, and match the un-paginated response.
+    """
+    ctx = DeterministicContext(app_client, SimConfig(MAX_USERS=5))
+    await run("create_user", ctx)
+    await run("create_user", ctx)
+
+    chat_ids = []
+    for _ in range(7):
+        ctx.focus(0)
+        chat_ids.append(await run("create_chat", ctx))
+    for chat_id in chat_ids[::2]:
+        await ctx.actor(0).send_message(chat_id, "bump")
+    # Let the activity tracker write last_message_at (every second by default), so no chat moves while paging
+    await asyncio.sleep(2)
+
+    actor = ctx.actor(0)
+    token = actor.tokens["access_token"]
+    pages, cursor = [], None
+    while True:
+        page = await app_client.get_my_chats_page(token, limit=3, cursor=cursor)
+        assert len(page.chats) <= 3
+        pages.append(page)
+        if not page.next_cursor:
+            break
+        cursor = page.next_cursor
+
+    chats = [chat for page in pages for chat in page.chats]
+    paged_ids = [chat.chat_id for chat in chats]
+    assert len(paged_ids) == len(set(paged_ids)), "A chat was returned on more than one page"
+    assert set(paged_ids) == set(chat_ids)
+    assert len(pages) == 3
+
+    keys = [(chat.last_message_at, chat.chat_id.bytes) for chat in chats]
+    assert keys == sorted(keys, reverse=True), "Chats are not ordered by last_message_at"
+
+    unpaginated = await app_client.get_my_chats_page(token)
+    assert unpaginated.next_cursor is None
+    assert [chat.chat_id for chat in unpaginated.chats] == paged_ids
+
+
 # ============================================================================
 # MESSAGING
 # ============================================================================
@@ -205,6 +252,33 @@ async def test_multiple_messages_accumulate_in_history(app_client: AppClient):
     await run("verify_history_not_empty", ctx)
 
 
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_batch_history_returns_only_member_chats(app_client: AppClient):
+    """
+    Chat A has [0,1] only; chat B is created by [2] after A exists, so [2]
+    is never in A. The batch preload by [2] must return B (with its
+    message) and omit A.
+    """
+    ctx = DeterministicContext(app_client, SimConfig(MAX_USERS=5))
+    await run("create_user", ctx)   # 0
+    await run("create_user", ctx)   # 1
+
+    ctx.focus(0)
+    await run("create_chat", ctx)   # A = [0,1]
+
+    await run("create_user", ctx)   # 2
+    await run("create_user", ctx)   # 3
+
+    ctx.focus(2)
+    await run("create_chat", ctx)   # B = [2,3,...]
+    ctx.focus(2)
+    await run("send_and_verify_message", ctx)
+
+    ctx.focus(2)
+    await run("verify_history_batch", ctx)
+
+
 # ============================================================================
 # AUTHORIZATION / SECURITY BOUNDARIES
 # ============================================================================
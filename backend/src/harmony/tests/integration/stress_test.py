@@ -6,6 +6,7 @@ DeterministicContext.  The same ACTION_REGISTRY functions run in both test
 suites; only the selection strategy changes.
 """
 import asyncio
+import json
 import random
 import time
 from typing import Optional
@@ -224,6 +225,12 @@ async def test_stress_simulation(app_client: AppClient):
 
     await metrics.final_report()
 
+    # Server-side counters (e.g. coalesced cache misses) for the API instance we hit (needs FEATURES__STATS_ENDPOINT)
+    try:
+        print(json.dumps(await app_client.get_server_stats(), indent=2))
+    except Exception as exc:
+        print(f"Server stats unavailable: {exc}")
+
     # Hard assertions — this is what makes the test pass or fail
     await metrics.assert_thresholds(
         max_error_rate=settings.max_error_rate,
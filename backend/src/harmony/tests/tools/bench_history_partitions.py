@@ -0,0 +1,138 @@
+import os
+import time
+import uuid
+import asyncio
+import statistics
+from datetime import datetime, timezone
+from ulid import ULID
+
+from harmony.app.core import DynamoDBConfig, AWSConfig
+from harmony.app.init import dynamodb_connector
+from harmony.app.repositories import ChatHistoryRepository
+from harmony.app.schemas import ChatMessage
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+DYNAMODB_URL = os.getenv("DYNAMODB_URL", "http://localhost:8080")
+SHARD_COUNTS = [1, 4, 16]
+MESSAGES = 5000
+WRITE_CONCURRENCY = 64
+PAGE_SIZE = 50
+
+'''
+Load benchmark of the ChatHistory partition schemes against DynamoDB Local.
+
+For each shard count, one chat receives MESSAGES concurrent writes, then its whole history is paged
+newest-first through the cursor (checking order and completeness) and finally purged.
+
+DynamoDB Local does not enforce per-partition throughput, so this measures the client-side cost of
+sharding (scatter-gather reads, merge) rather than the throttling it avoids on real DynamoDB.
+Items read per page (what read capacity is billed on) are counted from the query responses.
+
+Usage: python -m harmony.tests.tools.bench_history_partitions   (requires DynamoDB Local, e.g. `task up`)
+'''
+
+class CountingClient:
+    """Counts the queries and items read through the client."""
+    def __init__(self, client):
+        self.client = client
+        self.queries = 0
+        self.items_read = 0
+
+    async def query(self, **kwargs):
+        response = await self.client.query(**kwargs)
+        self.queries += 1
+        self.items_read += len(response.get("Items", []))
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+async def create_table(client, table_name: str):
+    await client.create_table(
+        TableName=table_name,
+        BillingMode="PAY_PER_REQUEST",
+        KeySchema=[
+            {"AttributeName": "chat_id", "KeyType": "HASH"},
+            {"AttributeName": "ulid", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "chat_id", "AttributeType": "S"},
+            {"AttributeName": "ulid", "AttributeType": "S"},
+        ],
+    )
+    await client.get_waiter("table_exists").wait(TableName=table_name)
+
+def make_message(chat_id: uuid.UUID, user_id: uuid.UUID, i: int) -> ChatMessage:
+    ulid = ULID()
+    return ChatMessage(
+        chat_id=chat_id,
+        ulid=str(ulid),
+        timestamp=datetime.fromtimestamp(ulid.timestamp, timezone.utc),
+        user_id=user_id,
+        content=f"message {i}",
+    )
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[max(0, int(len(values) * p) - 1)]
+
+async def bench(client, shards: int):
+    table_name = f"bench_history_{uuid.uuid4().hex[:8]}"
+    cfg = DynamoDBConfig(url=DYNAMODB_URL, chat_history_table_name=table_name, chat_history_partition_shards=shards)
+    counting_client = CountingClient(client)
+    repo = ChatHistoryRepository(counting_client, cfg)
+    chat_id, user_id = uuid.uuid4(), uuid.uuid4()
+
+    await create_table(client, table_name)
+    try:
+        # 1. Concurrent writes to one chat
+        semaphore = asyncio.Semaphore(WRITE_CONCURRENCY)
+        async def write(i: int):
+            async with semaphore:
+                await repo.create_message(make_message(chat_id, user_id, i))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(write(i) for i in range(MESSAGES)))
+        write_seconds = time.perf_counter() - start
+
+        # 2. Page through the whole history
+        page_ms, seen, cursor, previous = [], 0, None, None
+        while True:
+            start = time.perf_counter()
+            messages, cursor = await repo.get_chat_history(chat_id, PAGE_SIZE, cursor)
+            page_ms.append((time.perf_counter() - start) * 1000)
+
+            for msg in messages:
+                assert previous is None or msg.ulid < previous, "history is not newest-first"
+                previous = msg.ulid
+            seen += len(messages)
+            if cursor is None:
+                break
+        assert seen == MESSAGES, f"paged {seen} of {MESSAGES} messages"
+        pages, queries, items_read = len(page_ms), counting_client.queries, counting_client.items_read
+
+        # 3. Purge every partition
+        start = time.perf_counter()
+        stats = await repo.delete_chat_history(chat_id)
+        purge_seconds = time.perf_counter() - start
+        assert stats.deleted == MESSAGES, f"purged {stats.deleted} of {MESSAGES} messages"
+
+        print(
+            f"shards={shards:<3} writes {MESSAGES / write_seconds:8.0f}/s   "
+            f"page p50 {statistics.median(page_ms):6.1f} ms  p99 {percentile(page_ms, 0.99):6.1f} ms   "
+            f"queries/page {queries / pages:5.1f}  items read/page {items_read / pages:6.1f}   "
+            f"purge {MESSAGES / purge_seconds:8.0f}/s"
+        )
+    finally:
+        await client.delete_table(TableName=table_name)
+
+async def main():
+    print(f"{MESSAGES} messages in one chat, pages of {PAGE_SIZE}, DynamoDB at {DYNAMODB_URL}")
+    async with dynamodb_connector(DynamoDBConfig(url=DYNAMODB_URL), AWSConfig()) as client:
+        for shards in SHARD_COUNTS:
+            await bench(client, shards)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,119 @@
+import time
+import uuid
+import random
+import statistics
+from datetime import datetime, timezone
+from ulid import ULID
+
+from harmony.app.schemas import ChatMessage
+from harmony.app.db import to_dynamo_json, from_dynamo_json, ChatHistoryCodec
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+PAGE_SIZE = 50
+ROUNDS = 2000
+CONTENT_LENGTH = 120
+LARGE_CONTENT_LENGTH = 4000 # Every LARGE_CONTENT_EVERY-th message (pastes, code snippets...)
+LARGE_CONTENT_EVERY = 10
+WORDS = "the quick brown fox jumps over lazy dog chat message hello world harmony deploy build fix".split()
+
+'''
+Compares the generic TypeSerializer/TypeDeserializer + model_validate path against ChatHistoryCodec
+on a page of ChatHistory items (the shape returned by get_chat_history), and the plain item format
+against the compact one (item size and decode time).
+
+Usage: python -m harmony.tests.tools.bench_marshalling
+'''
+
+def make_text(length: int) -> str:
+    text = ""
+    while len(text) < length:
+        text += random.choice(WORDS) + " "
+    return text[:length]
+
+def make_messages() -> list[ChatMessage]:
+    chat_id = uuid.uuid4()
+    user_ids = [uuid.uuid4() for _ in range(5)]
+    messages = []
+    for i in range(PAGE_SIZE):
+        ulid = ULID()
+        length = LARGE_CONTENT_LENGTH if i % LARGE_CONTENT_EVERY == 0 else CONTENT_LENGTH
+        messages.append(ChatMessage(
+            chat_id=chat_id,
+            ulid=str(ulid),
+            client_uuid=uuid.uuid4() if i % 2 else None,
+            timestamp=datetime.fromtimestamp(ulid.timestamp, timezone.utc),
+            user_id=user_ids[i % len(user_ids)],
+            content=make_text(length),
+        ))
+    return messages
+
+def make_page() -> list[dict]:
+    return [to_dynamo_json(msg.model_dump(mode="json")) for msg in make_messages()]
+
+def item_size(item: dict) -> int:
+    """Approximate DynamoDB item size: attribute names plus values."""
+    size = 0
+    for name, attr in item.items():
+        (kind, value), = attr.items()
+        size += len(name) + (len(value) if kind == "B" else len(str(value).encode("utf-8")))
+    return size
+
+def generic_decode(page: list[dict]) -> list[ChatMessage]:
+    return [ChatMessage.model_validate(from_dynamo_json(item)) for item in page]
+
+def generic_encode(messages: list[ChatMessage]) -> list[dict]:
+    return [to_dynamo_json(msg.model_dump(mode="json")) for msg in messages]
+
+def codec_encode(messages: list[ChatMessage]) -> list[dict]:
+    return [ChatHistoryCodec.encode_plain(msg) for msg in messages]
+
+def compact_encode(messages: list[ChatMessage]) -> list[dict]:
+    codec = ChatHistoryCodec(item_format="compact")
+    return [codec.encode(msg) for msg in messages]
+
+def bench(fn, arg) -> list[float]:
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn(arg)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return timings
+
+def report(name: str, timings: list[float]):
+    timings = sorted(timings)
+    p99 = timings[int(len(timings) * 0.99) - 1]
+    print(f"{name:<18} median {statistics.median(timings):8.1f} us/page   p99 {p99:8.1f} us/page")
+
+def main():
+    page = make_page()
+    messages = generic_decode(page)
+    compact_page = compact_encode(messages)
+
+    # Every path must produce the same items and models
+    assert ChatHistoryCodec.decode_many(page) == messages
+    assert ChatHistoryCodec.decode_many(compact_page) == messages
+    assert codec_encode(messages) == generic_encode(messages)
+
+    print(f"{PAGE_SIZE} items/page, {ROUNDS} rounds")
+    results = {
+        "generic decode": bench(generic_decode, page),
+        "codec decode": bench(ChatHistoryCodec.decode_many, page),
+        "generic encode": bench(generic_encode, messages),
+        "codec encode": bench(codec_encode, messages),
+        "compact decode": bench(ChatHistoryCodec.decode_many, compact_page),
+        "compact encode": bench(compact_encode, messages),
+    }
+    for name, timings in results.items():
+        report(name, timings)
+
+    speedup = statistics.median(results["generic decode"]) / statistics.median(results["codec decode"])
+    print(f"decode speedup: {speedup:.1f}x")
+
+    plain_size = sum(item_size(item) for item in page)
+    compact_size = sum(item_size(item) for item in compact_page)
+    print(f"page size: plain {plain_size} B, compact {compact_size} B ({compact_size / plain_size:.0%})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import os
+import time
+import uuid
+import asyncio
+import statistics
+from sqlalchemy import text, insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from harmony.app.core import PostgresConfig, ChatConfig, UserConfig
+from harmony.app.models import Base, User, OutboxEvent
+from harmony.app.repositories import ChatDataRepository, UserChatRepository, OutboxRepository
+from harmony.app.schemas import ChatCreateRequest
+from harmony.app.services import ChatCommands
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+POSTGRES_URL = os.getenv("POSTGRES_URL", PostgresConfig().url)
+SCHEMA = "bench_outbox_emission"
+USER_COUNTS = [10, 100, 1000]
+REPEATS = 20
+
+'''
+Transaction duration of ChatCommands.add_users_to_chat for 10, 100 and 1000 added users
+(max_users_per_operation raised accordingly), by outbox emission strategy:
+
+    per-row:    one ORM object per outbox event, flushed by the unit of work (the previous behaviour)
+    multi-row:  Command.emit, one multi-row INSERT before commit
+    bulk-only:  multi-row, without the per-user ADDED_TO_CHAT events (CHAT__PER_USER_MEMBERSHIP_EVENTS=false)
+
+The transaction holds the requester's user_chats row lock (taken by _require_membership) from the start,
+so its duration is the lock hold time concurrent membership writes to the chat wait on.
+Everything runs in its own schema, dropped at the end.
+
+Usage: python -m harmony.tests.tools.bench_outbox_emission   (requires Postgres, e.g. `task up`)
+'''
+
+class PerRowChatCommands(ChatCommands):
+    async def _flush_outbox(self):
+        for event in self.session.info.pop("outbox", []):
+            self.session.add(OutboxEvent(**event))
+        await self.session.flush()
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[max(0, int(len(values) * p) - 1)]
+
+async def create_users(session_factory, count: int) -> list[uuid.UUID]:
+    user_ids = [uuid.uuid4() for _ in range(count)]
+    async with session_factory() as session:
+        await session.execute(insert(User).values([
+            {"user_id": uid, "email": f"{uid}@bench.local", "hashed_password": "x", "meta": {"username": str(uid)[:8]}}
+            for uid in user_ids
+        ]))
+        await session.commit()
+    return user_ids
+
+async def add_users(session_factory, command_cls, chat_config: ChatConfig, users: int) -> float:
+    creator_id, *user_ids = await create_users(session_factory, users + 1)
+    async with session_factory() as session:
+        commands = command_cls(session, ChatDataRepository(session), UserChatRepository(session), chat_config, UserConfig())
+        chat = await commands.create_chat(creator_id, ChatCreateRequest(user_id_list=[], title="bench"))
+
+        start = time.perf_counter()
+        await commands.add_users_to_chat(chat.chat_id, creator_id, user_ids)
+        return (time.perf_counter() - start) * 1000
+
+async def main():
+    # Tables are created in the benchmark schema; pg_trgm (user search indexes) is looked up in public
+    engine = create_async_engine(POSTGRES_URL, connect_args={"server_settings": {"search_path": f"{SCHEMA},public"}})
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm SCHEMA public"))
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+            await conn.run_sync(Base.metadata.create_all)
+        async with session_factory() as session:
+            await OutboxRepository(session).create_default_partition()
+            await session.commit()
+
+        strategies = [
+            ("per-row", PerRowChatCommands, True),
+            ("multi-row", ChatCommands, True),
+            ("bulk-only", ChatCommands, False),
+        ]
+        print(f"add_users_to_chat transaction duration, {REPEATS} runs each")
+        for users in USER_COUNTS:
+            for name, command_cls, per_user_events in strategies:
+                chat_config = ChatConfig(max_users_per_operation=users, per_user_membership_events=per_user_events)
+                durations = [await add_users(session_factory, command_cls, chat_config, users) for _ in range(REPEATS)]
+                print(
+                    f"users={users:<5} {name:<10} p50 {statistics.median(durations):8.2f} ms   "
+                    f"p99 {percentile(durations, 0.99):8.2f} ms   outbox rows {1 + users if per_user_events else 1}"
+                )
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
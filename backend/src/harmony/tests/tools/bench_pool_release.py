@@ -0,0 +1,121 @@
+import os
+import time
+import uuid
+import asyncio
+import statistics
+from sqlalchemy import text, insert
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from harmony.app.core import PostgresConfig, CacheConfig
+from harmony.app.db import ScopedSession
+from harmony.app.models import Base, User
+from harmony.app.repositories import UserDataRepository, UserChatRepository
+from harmony.app.services import UserQueries
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+POSTGRES_URL = os.getenv("POSTGRES_URL", PostgresConfig().url)
+SCHEMA = "bench_pool_release"
+POOL_SIZE = 5
+POOL_TIMEOUT_SECONDS = 0.5
+REQUESTS = 2000
+CONCURRENCY = 100
+DOWNSTREAM_MS = 20 # Work after the query (Kafka ack, DynamoDB write, cache writes)
+
+'''
+Pool saturation of requests that read from Postgres and then spend DOWNSTREAM_MS on other backends
+(e.g. send_message on a membership cache miss: the lookup, then the Kafka publish), with a pool of
+POOL_SIZE connections and no overflow:
+
+    hold:     the connection stays checked out until the request ends (the previous behaviour)
+    release:  read-only queries return it right away (release_connection)
+
+Reported: throughput, latency, and requests that failed waiting POOL_TIMEOUT_SECONDS for a connection.
+Everything runs in its own schema, dropped at the end.
+
+Usage: python -m harmony.tests.tools.bench_pool_release   (requires Postgres, e.g. `task up`)
+'''
+
+class HoldingScopedSession(ScopedSession):
+    async def release(self) -> bool:
+        return False
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[max(0, int(len(values) * p) - 1)]
+
+async def seed(session_factory) -> list[uuid.UUID]:
+    user_ids = [uuid.uuid4() for _ in range(100)]
+    async with session_factory() as session:
+        await session.execute(insert(User).values([
+            {"user_id": uid, "email": f"{uid}@bench.local", "hashed_password": "x", "meta": {"username": str(uid)[:8]}}
+            for uid in user_ids
+        ]))
+        await session.commit()
+    return user_ids
+
+async def run(name: str, db: ScopedSession, user_ids: list[uuid.UUID]):
+    user_queries = UserQueries(
+        session=db,
+        user_data_repository=UserDataRepository(db),
+        user_chat_repository=UserChatRepository(db),
+        cache_config=CacheConfig(),
+    )
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    latencies = []
+    timeouts = 0
+
+    async def one(i: int):
+        nonlocal timeouts
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                async with db.scope():
+                    await user_queries.fetch_user(user_ids[i % len(user_ids)])
+                    await asyncio.sleep(DOWNSTREAM_MS / 1000)
+            except PoolTimeoutError:
+                timeouts += 1
+                return
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(REQUESTS)))
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{name:<8} {len(latencies) / elapsed:8.0f} req/s   "
+        f"p50 {statistics.median(latencies) if latencies else 0:8.2f} ms   "
+        f"p99 {percentile(latencies, 0.99) if latencies else 0:8.2f} ms   "
+        f"pool timeouts {timeouts:5} ({timeouts / REQUESTS:.1%})"
+    )
+
+async def main():
+    engine = create_async_engine(
+        POSTGRES_URL,
+        pool_size=POOL_SIZE,
+        max_overflow=0,
+        pool_timeout=POOL_TIMEOUT_SECONDS,
+        connect_args={"server_settings": {"search_path": f"{SCHEMA},public"}},
+    )
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm SCHEMA public"))
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+            await conn.run_sync(Base.metadata.create_all)
+        user_ids = await seed(session_factory)
+
+        print(f"{REQUESTS} requests, {CONCURRENCY} concurrent, pool of {POOL_SIZE}, {DOWNSTREAM_MS} ms downstream work")
+        await run("hold", HoldingScopedSession(session_factory), user_ids)
+        await run("release", ScopedSession(session_factory), user_ids)
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,174 @@
+import os
+import time
+import uuid
+import asyncio
+import statistics
+from redis.asyncio import Redis
+from sqlalchemy import event, text, insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from harmony.app.core import PostgresConfig, RedisConfig, CacheConfig, ChatConfig, UserConfig
+from harmony.app.db import ScopedSession
+from harmony.app.models import Base, User, Chat, UserChat
+from harmony.app.repositories import ChatDataRepository, UserChatRepository, UserDataRepository
+from harmony.app.services import CacheService, ChatQueries, UserQueries, MessageCommands, BackgroundTaskQueue
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+POSTGRES_URL = os.getenv("POSTGRES_URL", PostgresConfig().url)
+REDIS_URL = os.getenv("REDIS_URL", RedisConfig().url)
+SCHEMA = "bench_service_graph"
+REQUESTS = 5000
+CONCURRENCY = 50
+
+'''
+Per-request cost of the service graph behind the send-message path (membership check), before and after
+building it once at startup:
+
+    per-request:  a session from the factory, the repositories, CacheService, UserQueries, ChatQueries and
+                  MessageCommands built for every request (the previous dependencies.py)
+    app-scoped:   the same graph built once, over a ScopedSession opened per request
+
+Each is run with a warm Redis cache (membership served from Redis) and without a cache (Postgres every request).
+Reported per request: graph construction time, latency, AsyncSessions created and connection pool checkouts.
+Everything runs in its own schema, dropped at the end; the Redis keys expire with the membership TTL.
+
+Usage: python -m harmony.tests.tools.bench_service_graph   (requires Postgres and Redis, e.g. `task up`)
+'''
+
+CACHE_CONFIG = CacheConfig()
+
+class Counters:
+    def __init__(self):
+        self.sessions = 0
+        self.build_seconds = 0.0
+
+def build_graph(session, cache_service, task_queue) -> ChatQueries:
+    user_chat_repository = UserChatRepository(session)
+    user_queries = UserQueries(
+        session=session,
+        user_data_repository=UserDataRepository(session),
+        user_chat_repository=user_chat_repository,
+        cache_service=cache_service,
+        task_queue=task_queue,
+        cache_config=CACHE_CONFIG,
+        user_config=UserConfig(),
+    )
+    chat_queries = ChatQueries(
+        session=session,
+        chat_data_repository=ChatDataRepository(session),
+        user_chat_repository=user_chat_repository,
+        cache_service=cache_service,
+        task_queue=task_queue,
+        cache_config=CACHE_CONFIG,
+    )
+    MessageCommands(
+        chat_history_repository=None,
+        chat_queries=chat_queries,
+        user_queries=user_queries,
+        publisher=None,
+        chat_config=ChatConfig(),
+        cache_config=CACHE_CONFIG,
+        cache_service=cache_service,
+    )
+    return chat_queries
+
+def counting(session_factory, counters: Counters):
+    def factory():
+        counters.sessions += 1
+        return session_factory()
+    return factory
+
+def per_request(session_factory, redis_client, counters: Counters):
+    session_factory = counting(session_factory, counters)
+    task_queue = BackgroundTaskQueue()
+
+    async def handle(user_id, chat_id):
+        async with session_factory() as session:
+            start = time.perf_counter()
+            cache_service = CacheService(redis_client, CACHE_CONFIG) if redis_client else None
+            chat_queries = build_graph(session, cache_service, task_queue)
+            counters.build_seconds += time.perf_counter() - start
+            return await chat_queries.check_user_in_chat(user_id=user_id, chat_id=chat_id)
+    return handle, task_queue
+
+def app_scoped(session_factory, redis_client, counters: Counters):
+    db = ScopedSession(counting(session_factory, counters))
+    task_queue = BackgroundTaskQueue(db)
+    cache_service = CacheService(redis_client, CACHE_CONFIG) if redis_client else None
+    chat_queries = build_graph(db, cache_service, task_queue)
+
+    async def handle(user_id, chat_id):
+        async with db.scope():
+            return await chat_queries.check_user_in_chat(user_id=user_id, chat_id=chat_id)
+    return handle, task_queue
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[max(0, int(len(values) * p) - 1)]
+
+async def seed(session_factory) -> tuple[uuid.UUID, uuid.UUID]:
+    user_id, chat_id = uuid.uuid4(), uuid.uuid4()
+    async with session_factory() as session:
+        await session.execute(insert(User).values(user_id=user_id, email=f"{user_id}@bench.local", hashed_password="x", meta={"username": "bench"}))
+        await session.execute(insert(Chat).values(chat_id=chat_id, meta={"title": "bench"}))
+        await session.execute(insert(UserChat).values(user_id=user_id, chat_id=chat_id))
+        await session.commit()
+    return user_id, chat_id
+
+async def run(name: str, handle, counters: Counters, checkouts: list[int], user_id, chat_id):
+    await handle(user_id, chat_id) # Warm up (fills the cache)
+    await asyncio.sleep(0.1)
+    counters.sessions, counters.build_seconds = 0, 0.0
+    checkouts[0] = 0
+
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            assert await handle(user_id, chat_id)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(one() for _ in range(REQUESTS)))
+    print(
+        f"{name:<22} build {counters.build_seconds / REQUESTS * 1e6:7.1f} us   "
+        f"p50 {statistics.median(latencies):7.3f} ms   p99 {percentile(latencies, 0.99):7.3f} ms   "
+        f"sessions/req {counters.sessions / REQUESTS:5.2f}   checkouts/req {checkouts[0] / REQUESTS:5.2f}"
+    )
+
+async def main():
+    engine = create_async_engine(POSTGRES_URL, connect_args={"server_settings": {"search_path": f"{SCHEMA},public"}})
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+    redis_client = Redis.from_url(REDIS_URL, decode_responses=True)
+
+    checkouts = [0]
+    def on_checkout(*_):
+        checkouts[0] += 1
+    event.listen(engine.sync_engine.pool, "checkout", on_checkout)
+
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm SCHEMA public"))
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+            await conn.run_sync(Base.metadata.create_all)
+        user_id, chat_id = await seed(session_factory)
+
+        print(f"check_user_in_chat, {REQUESTS} requests, {CONCURRENCY} concurrent")
+        for cache_name, client in [("cache hit", redis_client), ("no cache", None)]:
+            for graph_name, graph in [("per-request", per_request), ("app-scoped", app_scoped)]:
+                counters = Counters()
+                handle, task_queue = graph(session_factory, client, counters)
+                await run(f"{cache_name}, {graph_name}", handle, counters, checkouts, user_id, chat_id)
+                await task_queue.drain()
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await redis_client.aclose()
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,151 @@
+import os
+import time
+import random
+import asyncio
+import statistics
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from harmony.app.core import PostgresConfig
+from harmony.app.models import User
+from harmony.app.repositories import UserDataRepository
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+POSTGRES_URL = os.getenv("POSTGRES_URL", PostgresConfig().url)
+SCHEMA = "bench_user_search"
+USERS = 1_000_000
+TOMBSTONED_EVERY = 50
+QUERIES = 200
+LIMIT = 10
+CANDIDATE_LIMIT = 500
+
+'''
+Latency of user search over USERS synthetic users, before and after the trigram indexes.
+
+    baseline: the previous query, `email ILIKE '%q%'` (a sequential scan of users)
+    trigram:  UserDataRepository.search_users (email and username, pg_trgm GiST indexes, nearest matches ranked by similarity)
+
+Before each timed run, the trigram query is EXPLAINed with its actual bind parameters and the indexes
+its plan uses are printed: after the indexes are built, both ix_users_email_trgm and ix_users_username_trgm must appear.
+
+Search terms are substrings of generated emails and usernames of 3 to 8 characters, plus a few common terms
+(domains) that match a large share of the table. Everything runs in its own schema, dropped at the end.
+
+Usage: python -m harmony.tests.tools.bench_user_search   (requires Postgres with pg_trgm, e.g. `task up`)
+'''
+
+FIRST_NAMES = ["alice", "bob", "carol", "dave", "erin", "frank", "grace", "heidi", "ivan", "judy", "mallory", "oscar", "peggy", "trent", "victor", "walter"]
+DOMAINS = ["gmail.com", "example.com", "mail.org", "harmony.chat"]
+COMMON_TERMS = ["gmail", "example", "alice"]
+
+SEED_SQL = f"""
+INSERT INTO {SCHEMA}.users (email, hashed_password, tombstone, meta)
+SELECT
+    (ARRAY{FIRST_NAMES})[1 + i % {len(FIRST_NAMES)}] || '.' || substr(md5(i::text), 1, 8) || i || '@' || (ARRAY{DOMAINS})[1 + i % {len(DOMAINS)}],
+    'x',
+    i % {TOMBSTONED_EVERY} = 0,
+    jsonb_build_object('username', (ARRAY{FIRST_NAMES})[1 + (i / 7) % {len(FIRST_NAMES)}] || '_' || substr(md5((i * 31)::text), 1, 6))
+FROM generate_series(1, {USERS}) AS i
+"""
+
+TRGM_INDEXES = ["ix_users_email_trgm", "ix_users_username_trgm"]
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[max(0, int(len(values) * p) - 1)]
+
+async def sample_terms(session: AsyncSession) -> list[str]:
+    rows = (await session.execute(
+        text(f"SELECT email, meta ->> 'username' FROM {SCHEMA}.users TABLESAMPLE SYSTEM (1) LIMIT :n"),
+        {"n": QUERIES}
+    )).all()
+    terms = []
+    for email, username in rows:
+        value = random.choice([email, username])
+        size = random.randint(3, 8)
+        start = random.randint(0, max(0, len(value) - size))
+        terms.append(value[start:start + size].lower())
+    return terms + COMMON_TERMS
+
+async def baseline_search(session: AsyncSession, term: str):
+    stmt = select(User).where(User.email.ilike(f"%{term}%")).limit(LIMIT)
+    return (await session.execute(stmt)).scalars().all()
+
+async def trigram_search(session: AsyncSession, term: str):
+    return await UserDataRepository(session).search_users(term, limit=LIMIT, candidate_limit=CANDIDATE_LIMIT)
+
+async def explain_search(session: AsyncSession, term: str) -> list[str]:
+    """The trigram indexes used by the plan of search_users, EXPLAINed with the statement's own bind parameters."""
+    stmt = UserDataRepository.search_users_statement(term, limit=LIMIT, candidate_limit=CANDIDATE_LIMIT)
+    conn = await session.connection()
+    compiled = stmt.compile(dialect=conn.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    await conn.exec_driver_sql(f"SET LOCAL search_path TO {SCHEMA}, public")
+    plan = "\n".join(row[0] for row in (await conn.exec_driver_sql(f"EXPLAIN {compiled}", params)).all())
+    await session.rollback()
+    return [index for index in TRGM_INDEXES if index in plan]
+
+async def run(session_factory, name: str, search, terms: list[str]):
+    latencies = []
+    async with session_factory() as session:
+        for term in terms:
+            start = time.perf_counter()
+            await search(session, term)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    common = latencies[-len(COMMON_TERMS):]
+    print(
+        f"{name:<9} p50 {statistics.median(latencies):8.2f} ms   p99 {percentile(latencies, 0.99):8.2f} ms   "
+        f"max {max(latencies):8.2f} ms   common terms avg {statistics.mean(common):8.2f} ms"
+    )
+
+async def main():
+    engine = create_async_engine(POSTGRES_URL)
+    # Run the application's models and queries against the benchmark schema
+    bench_engine = engine.execution_options(schema_translate_map={None: SCHEMA})
+    session_factory = async_sessionmaker(bench_engine, class_=AsyncSession, expire_on_commit=False)
+
+    try:
+        async with bench_engine.begin() as conn:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+            await conn.run_sync(lambda sync_conn: User.__table__.create(sync_conn))
+            for index in TRGM_INDEXES:
+                await conn.execute(text(f"DROP INDEX {SCHEMA}.{index}"))
+
+        print(f"Seeding {USERS} users...")
+        start = time.perf_counter()
+        async with bench_engine.begin() as conn:
+            await conn.execute(text(SEED_SQL))
+            await conn.execute(text(f"ANALYZE {SCHEMA}.users"))
+        print(f"Seeded in {time.perf_counter() - start:.1f} s")
+
+        async with session_factory() as session:
+            terms = await sample_terms(session)
+        print(f"{len(terms)} searches, limit {LIMIT}")
+
+        # 1. Without trigram indexes
+        await run(session_factory, "baseline", baseline_search, terms)
+
+        # 2. With trigram indexes
+        start = time.perf_counter()
+        async with bench_engine.begin() as conn:
+            for index in User.__table__.indexes:
+                if index.name in TRGM_INDEXES:
+                    await conn.run_sync(lambda sync_conn, index=index: index.create(sync_conn))
+            await conn.execute(text(f"ANALYZE {SCHEMA}.users"))
+        print(f"Trigram indexes built in {time.perf_counter() - start:.1f} s")
+
+        async with session_factory() as session:
+            print(f"Indexes used by search_users: {', '.join(await explain_search(session, terms[0])) or 'none'}")
+        await run(session_factory, "trigram", trigram_search, terms)
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,142 @@
+"""
+ChatHistoryRepository paging over sharded partitions, against an in-memory DynamoDB query client.
+
+Run with:  task test:unit
+Marker:    @pytest.mark.unit
+"""
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from ulid import ULID
+
+from harmony.app.core import DynamoDBConfig
+from harmony.app.repositories import ChatHistoryRepository
+from harmony.app.schemas import ChatMessage
+
+
+class FakeDynamoClient:
+    """Serves put_item and the history queries (newest first, optional `ulid < :cursor`) from memory."""
+
+    def __init__(self):
+        self.partitions: dict[str, dict[str, dict]] = {}
+        self.queried: list[str] = [] # Partition key of every query
+        self.items_read = 0
+
+    async def put_item(self, TableName, Item, ConditionExpression=None):
+        self.partitions.setdefault(Item["chat_id"]["S"], {})[Item["ulid"]["S"]] = Item
+
+    async def query(self, TableName, KeyConditionExpression, ExpressionAttributeValues, Limit, ScanIndexForward):
+        assert ScanIndexForward is False
+        self.queried.append(ExpressionAttributeValues[":cid"]["S"])
+        items = self.partitions.get(self.queried[-1], {})
+        cursor = ExpressionAttributeValues.get(":cursor", {}).get("S")
+        ulids = sorted((u for u in items if cursor is None or u < cursor), reverse=True)
+
+        response = {"Items": [items[u] for u in ulids[:Limit]]}
+        self.items_read += len(response["Items"])
+        if len(ulids) > Limit:
+            response["LastEvaluatedKey"] = {"ulid": {"S": ulids[Limit - 1]}}
+        return response
+
+
+def make_message(chat_id: uuid.UUID, timestamp: float, repo: ChatHistoryRepository | None = None, shard: int | None = None) -> ChatMessage:
+    ulid = ULID.from_timestamp(timestamp)
+    while shard is not None and repo._shard_of(str(ulid)) != shard:
+        ulid = ULID.from_timestamp(timestamp)
+    return ChatMessage(
+        chat_id=chat_id,
+        ulid=str(ulid),
+        timestamp=datetime.fromtimestamp(ulid.timestamp, timezone.utc),
+        user_id=uuid.uuid4(),
+        content="hello",
+    )
+
+
+async def seed(shards: int, sharded: int, unsharded: int = 0, burst: int = 0) -> tuple[FakeDynamoClient, uuid.UUID, list[str], str | None]:
+    """
+    Writes `unsharded` messages before sharding is enabled and `sharded` after, then `burst` more that all land
+    in shard 0 (uneven shards make the merge read some shards further than others). Returns every ULID and the cutoff.
+    """
+    client, chat_id = FakeDynamoClient(), uuid.uuid4()
+    start = 1_700_000_000.0
+    unsharded_before = None
+
+    if unsharded:
+        legacy_repo = ChatHistoryRepository(client, DynamoDBConfig(chat_history_partition_shards=1))
+        for i in range(unsharded):
+            await legacy_repo.create_message(make_message(chat_id, start + i))
+        unsharded_before = str(ULID.from_timestamp(start + unsharded))
+
+    repo = ChatHistoryRepository(client, DynamoDBConfig(chat_history_partition_shards=shards))
+    for i in range(sharded):
+        # Several messages per millisecond, so shard order and time order interleave
+        await repo.create_message(make_message(chat_id, start + unsharded + 1 + i // 3 / 1000))
+    for i in range(burst):
+        await repo.create_message(make_message(chat_id, start + unsharded + 2 + i / 1000, repo=repo, shard=0))
+
+    ulids = [ulid for items in client.partitions.values() for ulid in items]
+    return client, chat_id, ulids, unsharded_before
+
+
+async def page_through(repo: ChatHistoryRepository, chat_id: uuid.UUID, limit: int) -> list[list[str]]:
+    pages, cursor = [], None
+    while True:
+        messages, cursor = await repo.get_chat_history(chat_id, limit, cursor)
+        pages.append([msg.ulid for msg in messages])
+        if cursor is None:
+            return pages
+        assert len(pages) <= 1000, "paging does not terminate"
+
+
+def assert_pages_complete(pages: list[list[str]], ulids: list[str], limit: int):
+    served = [ulid for page in pages for ulid in page]
+    assert len(served) == len(set(served)), "a message was served twice"
+    assert set(served) == set(ulids), f"{len(set(ulids) - set(served))} messages were skipped"
+    assert served == sorted(served, reverse=True), "history is not newest-first"
+    # Every page but the last is full
+    assert all(len(page) == limit for page in pages[:-1])
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_sharded_pages_serve_every_message_once_newest_first():
+    for shards in (2, 4, 8):
+        for limit in (1, 7, 50):
+            client, chat_id, ulids, _ = await seed(shards, sharded=157, burst=40)
+            repo = ChatHistoryRepository(client, DynamoDBConfig(chat_history_partition_shards=shards))
+
+            pages = await page_through(repo, chat_id, limit)
+
+            assert_pages_complete(pages, ulids, limit)
+            # The unsharded partition is never queried without a cutoff
+            assert str(chat_id) not in client.queried
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_sharded_pages_continue_into_the_unsharded_partition():
+    for shards in (2, 4, 8):
+        for limit in (1, 7, 50):
+            client, chat_id, ulids, unsharded_before = await seed(shards, sharded=83, unsharded=61, burst=40)
+            repo = ChatHistoryRepository(
+                client, DynamoDBConfig(chat_history_partition_shards=shards, chat_history_unsharded_before=unsharded_before)
+            )
+
+            pages = await page_through(repo, chat_id, limit)
+
+            assert_pages_complete(pages, ulids, limit)
+            assert str(chat_id) in client.queried
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_sharded_page_reads_a_share_per_shard():
+    client, chat_id, _, _ = await seed(8, sharded=400)
+    repo = ChatHistoryRepository(client, DynamoDBConfig(chat_history_partition_shards=8))
+
+    messages, cursor = await repo.get_chat_history(chat_id, 50)
+
+    assert len(messages) == 50 and cursor == messages[-1].ulid
+    # Rounds of 8 x ceil(50 * 1.5 / 8) = 80 items (a second one when the shards are uneven), not 8 x 50
+    assert client.items_read <= 2 * 80
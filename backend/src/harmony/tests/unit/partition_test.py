@@ -0,0 +1,118 @@
+"""
+OffsetTracker watermarks and PartitionWorker per-aggregate ordering (no broker needed).
+
+Run with:  task test:unit
+Marker:    @pytest.mark.unit
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiokafka import TopicPartition
+
+from harmony.consumer.partition import OffsetTracker, PartitionWorker
+
+
+TP = TopicPartition("topic", 0)
+
+
+def message(offset: int, aggregate_id: str | None):
+    return SimpleNamespace(offset=offset), {"aggregate_id": aggregate_id} if aggregate_id else None
+
+
+@pytest.mark.unit
+def test_watermark_waits_for_out_of_order_completions():
+    tracker = OffsetTracker()
+    for offset in range(5):
+        tracker.add(offset)
+
+    tracker.done(2)
+    tracker.done(1)
+    assert tracker.to_commit() is None # 0 is still in flight
+
+    tracker.done(0)
+    assert tracker.to_commit() == 3
+    tracker.committed(3)
+    assert tracker.to_commit() is None # Nothing new since the commit
+
+    tracker.done(4)
+    assert tracker.to_commit() is None
+    tracker.done(3)
+    assert tracker.to_commit() == 5
+
+
+@pytest.mark.unit
+def test_watermark_does_not_pass_an_unfinished_offset():
+    tracker = OffsetTracker()
+    for offset in range(10, 15):
+        tracker.add(offset)
+    for offset in (10, 11, 13, 14):
+        tracker.done(offset)
+
+    assert tracker.to_commit() == 12
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_same_aggregate_runs_in_offset_order():
+    processed = []
+
+    async def process(msg, event):
+        # Earlier offsets take longer, so unchained tasks would finish in reverse order
+        await asyncio.sleep((10 - msg.offset) / 1000)
+        processed.append((event["aggregate_id"], msg.offset))
+        return True
+
+    worker = PartitionWorker(TP, process, max_concurrency=16)
+    for offset in range(10):
+        worker.submit(*message(offset, "a" if offset % 2 == 0 else "b"))
+    await worker.drain()
+
+    assert [offset for aggregate, offset in processed if aggregate == "a"] == [0, 2, 4, 6, 8]
+    assert [offset for aggregate, offset in processed if aggregate == "b"] == [1, 3, 5, 7, 9]
+    assert worker.tracker.to_commit() == 10
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_different_aggregates_run_concurrently_up_to_the_limit():
+    running, max_running = 0, 0
+
+    async def process(msg, event):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.005)
+        running -= 1
+        return True
+
+    worker = PartitionWorker(TP, process, max_concurrency=3)
+    for offset in range(8):
+        worker.submit(*message(offset, f"aggregate-{offset}"))
+    await worker.drain()
+
+    assert max_running == 3
+    assert worker.tracker.to_commit() == 8
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failed_offset_stops_its_aggregate_and_holds_the_watermark():
+    processed = []
+
+    async def process(msg, event):
+        await asyncio.sleep(0.001)
+        processed.append(msg.offset)
+        return msg.offset != 2
+
+    worker = PartitionWorker(TP, process, max_concurrency=16)
+    aggregates = ["a", "b", "a", "b", "a", "c"]
+    for offset, aggregate in enumerate(aggregates):
+        worker.submit(*message(offset, aggregate))
+    await worker.drain()
+
+    assert worker.failed_offset == 2
+    # Offset 4 follows the failed event of aggregate "a" and is never processed
+    assert 4 not in processed
+    # Completed later offsets (3, 5) do not move the watermark past the failure
+    assert worker.tracker.to_commit() == 2
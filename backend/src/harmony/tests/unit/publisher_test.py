@@ -0,0 +1,116 @@
+"""
+KafkaBatchPublisher against an in-memory producer (no broker needed).
+
+Run with:  task test:unit
+Marker:    @pytest.mark.unit
+"""
+import asyncio
+
+import pytest
+
+from harmony.app.services import KafkaBatchPublisher
+
+
+class FakeBatch:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.records = []
+
+    def append(self, timestamp, key, value, headers):
+        if len(self.records) >= self.capacity:
+            return None
+        self.records.append(value)
+        return object()
+
+
+class FakeProducer:
+    """Holds a fixed number of records per batch and acks each batch on the next loop iterations."""
+
+    def __init__(self, partitions: int = 1, records_per_batch: int = 2, ack_delay: float = 0.001, fail_send_at: int | None = None):
+        self._partitions = set(range(partitions))
+        self.records_per_batch = records_per_batch
+        self.ack_delay = ack_delay
+        self.fail_send_at = fail_send_at # Index of the send_batch call that raises
+        self.send_calls = 0
+        self.sent: list[tuple[int, list[bytes]]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def partitions_for(self, topic):
+        return self._partitions
+
+    def create_batch(self):
+        return FakeBatch(self.records_per_batch)
+
+    async def send_batch(self, batch, topic, partition):
+        self.send_calls += 1
+        if self.send_calls - 1 == self.fail_send_at:
+            raise RuntimeError("send_batch failed")
+        self.sent.append((partition, batch.records))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        ack = asyncio.get_running_loop().create_future()
+        asyncio.get_running_loop().call_later(self.ack_delay, self._ack, ack, partition)
+        return ack
+
+    def _ack(self, ack, partition):
+        self.in_flight -= 1
+        ack.set_result(partition)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_flush_larger_than_max_in_flight_does_not_deadlock():
+    producer = FakeProducer(partitions=1, records_per_batch=2)
+    publisher = KafkaBatchPublisher(producer, linger_ms=5, max_in_flight=2)
+
+    # 20 messages in one buffer: a single flush of 10 record batches, 5x the in-flight limit
+    results = await asyncio.wait_for(
+        asyncio.gather(*(publisher.publish("topic", None, f"m{i}".encode()) for i in range(20))),
+        timeout=5,
+    )
+
+    assert results == [0] * 20
+    assert len(producer.sent) == 10
+    assert producer.max_in_flight <= 2
+    # Batches of the partition keep the publish order
+    assert [value for _, records in producer.sent for value in records] == [f"m{i}".encode() for i in range(20)]
+    assert publisher.stats()["batches"] == 10
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_concurrent_partition_flushes_share_in_flight_permits():
+    producer = FakeProducer(partitions=4, records_per_batch=2)
+    publisher = KafkaBatchPublisher(producer, linger_ms=5)
+
+    keys = [f"key-{i}".encode() for i in range(40)]
+    await asyncio.wait_for(
+        asyncio.gather(*(publisher.publish("topic", key, b"value") for key in keys)),
+        timeout=5,
+    )
+
+    assert sum(len(records) for _, records in producer.sent) == 40
+    assert producer.max_in_flight <= 5
+    assert publisher._in_flight._value == 5 # Every permit returned
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failed_send_fails_the_rest_of_the_flush():
+    producer = FakeProducer(partitions=1, records_per_batch=2, fail_send_at=1)
+    publisher = KafkaBatchPublisher(producer, linger_ms=5, max_in_flight=2)
+
+    # One flush of 4 record batches: the second cannot be enqueued
+    results = await asyncio.wait_for(
+        asyncio.gather(*(publisher.publish("topic", None, f"m{i}".encode()) for i in range(8)), return_exceptions=True),
+        timeout=5,
+    )
+
+    assert results[:2] == [0, 0]
+    assert all(isinstance(result, RuntimeError) for result in results[2:])
+    # Nothing was sent after the failed batch
+    assert producer.send_calls == 2
+    assert producer.sent == [(0, [b"m0", b"m1"])]
+    assert publisher._in_flight._value == 2
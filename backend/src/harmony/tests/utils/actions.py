@@ -253,6 +253,42 @@ async def action_verify_history_not_empty(ctx: SimulationContext) -> None:
     await poll_until(_check_not_empty, label="verify_history_not_empty")
 
 
+@simulation_action("verify_history_batch", weight=5)
+async def action_verify_history_batch(ctx: SimulationContext) -> None:
+    """
+    Preload all of the actor's chats (plus one they are NOT in) through the
+    batch history endpoint.
+
+    Every chat the actor belongs to must be returned (non-empty if it is
+    known to have messages), and the foreign chat must be omitted — that
+    part is a security check and is asserted on every attempt.
+    """
+    actor = ctx.pick_actor()
+    if not actor:
+        return None
+    my_chats = ctx.state.get_known_chats_for_user(actor.user_id)
+    if not my_chats:
+        return None
+    foreign_chat_id = ctx.pick_chat_excluding(actor)
+    requested = list(my_chats) + ([foreign_chat_id] if foreign_chat_id else [])
+
+    async def _check_batch():
+        histories = await actor.get_histories(requested)
+        if foreign_chat_id in histories:
+            raise AssertionError(
+                f"SECURITY VIOLATION: '{actor.username}' preloaded chat "
+                f"{foreign_chat_id} without being a member"
+            )
+        assert set(histories) == my_chats, (
+            f"[verify_history_batch] Expected {len(my_chats)} chats for "
+            f"'{actor.username}', got {len(histories)}"
+        )
+        empty = [cid for cid in my_chats if ctx.state.is_chat_active(cid) and not histories[cid]]
+        assert not empty, f"[verify_history_batch] Active chats returned no messages: {empty}"
+
+    await poll_until(_check_batch, label="verify_history_batch")
+
+
 # ===========================================================================
 # SAD PATH / AUTHORIZATION — correctness violations become AssertionError
 # NOT retried — a security check must pass on the first request.
@@ -2,7 +2,7 @@ import uuid
 import time
 from httpx import AsyncClient, Response, HTTPStatusError
 from typing import List, Optional, Any, Callable, Coroutine
-from harmony.app.schemas import ChatMessage, ChatHistoryResponse
+from harmony.app.schemas import ChatMessage, ChatHistoryResponse, ChatHistoryBatchResponse, UserChatsResponse
 from .data_gen import generate_user_data, generate_chat_metadata
 
 class AppClient:
@@ -94,14 +94,40 @@ class AppClient:
         )
         return ChatHistoryResponse(**res.json())
 
-    async def get_my_chats(self, token: str) -> List[uuid.UUID]:
+    async def get_chat_histories(self, chat_ids: List[uuid.UUID], token: str) -> ChatHistoryBatchResponse:
+        res = await self._record_call(
+            "POST /chats/history/batch",
+            self.client.post,
+            f"{self.prefix}/chats/history/batch",
+            json={"chat_ids": [str(cid) for cid in chat_ids]},
+            headers=self._headers(token)
+        )
+        return ChatHistoryBatchResponse(**res.json())
+
+    async def get_my_chats_page(self, token: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> UserChatsResponse:
+        params = {}
+        if limit is not None:
+            params["limit"] = limit
+        if cursor is not None:
+            params["cursor"] = cursor
         res = await self._record_call(
             "GET /users/me/chats",
             self.client.get,
             f"{self.prefix}/users/me/chats",
+            params=params,
             headers=self._headers(token)
         )
-        return [uuid.UUID(chat["chat_id"]) for chat in res.json()["chats"]]
+        return UserChatsResponse(**res.json())
+
+    async def get_my_chats(self, token: str, limit: Optional[int] = None) -> List[uuid.UUID]:
+        """All of the user's chats: one response without a limit, otherwise follows next_cursor page by page."""
+        chat_ids, cursor = [], None
+        while True:
+            page = await self.get_my_chats_page(token, limit=limit, cursor=cursor)
+            chat_ids.extend(chat.chat_id for chat in page.chats)
+            if not page.next_cursor:
+                return chat_ids
+            cursor = page.next_cursor
     
     async def delete_chat(self, chat_id: uuid.UUID, token: str):
         await self._record_call(
@@ -111,6 +137,15 @@ class AppClient:
             headers=self._headers(token)
         )
 
+    async def get_server_stats(self) -> dict:
+        """
+        Fetches the API's internal counters (cache hit ratios, coalesced loads, ...).
+        Not recorded in metrics since it is not part of the simulated workload.
+        """
+        res = await self.client.get("/stats")
+        res.raise_for_status()
+        return res.json()
+
 class SimulationActor:
     """
     Represents a specific user in the test environment.
@@ -139,6 +174,10 @@ class SimulationActor:
         resp = await self.client.get_chat_history(chat_id, token=self.tokens["access_token"])
         return resp.messages
 
+    async def get_histories(self, chat_ids: List[uuid.UUID]):
+        resp = await self.client.get_chat_histories(chat_ids, token=self.tokens["access_token"])
+        return {chat_id: history.messages for chat_id, history in resp.histories.items()}
+
     async def get_my_chats(self):
         return await self.client.get_my_chats(token=self.tokens["access_token"])
     
@@ -77,6 +77,10 @@ class SimState:
         candidates = list(my_chats & self._active_chats)
         return random.choice(candidates) if candidates else None
 
+    def is_chat_active(self, chat_id: uuid.UUID) -> bool:
+        """Whether the chat is known to have messages."""
+        return chat_id in self._active_chats
+
     def get_known_chats_for_user(self, user_id: uuid.UUID) -> Set[uuid.UUID]:
         """Return the set of chat IDs the simulation thinks this user has."""
         return set(self._user_memberships.get(user_id, []))